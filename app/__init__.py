@@ -1,41 +1,46 @@
-import logging
-from logging.handlers import RotatingFileHandler
-import os
 from flask import Flask
 from .config import Config
+from .log_pipeline import configure_logging
 
 def create_app():
     """
     Factory para inicialização da aplicação Flask.
-    Configura logs rotativos e registra os blueprints do sistema.
+    Configura o pipeline de logs e registra os blueprints do sistema.
     """
     app = Flask(__name__)
     app.config.from_object(Config)
+    # No perfil fast os diretórios são criados no primeiro uso (cache, logs)
+    if Config.STARTUP_PROFILE != 'fast':
+        Config.init_app()
 
-    # Garantia da existência do diretório de logs
-    if not os.path.exists(app.config['LOG_DIR']):
-        os.makedirs(app.config['LOG_DIR'])
-
-    # Configuração do log em arquivo (Máximo 1MB por arquivo, mantém 5 backups)
-    file_handler = RotatingFileHandler(
-        app.config['LOG_FILE'], 
-        maxBytes=1024 * 1024, 
-        backupCount=5
-    )
-    file_handler.setFormatter(logging.Formatter(
-        '[%(asctime)s] %(levelname)s - %(module)s: %(message)s'
-    ))
-    file_handler.setLevel(logging.INFO)
-    app.logger.addHandler(file_handler)
-    
-    # Log simultâneo no terminal para monitoramento em tempo real
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(logging.Formatter('[%(levelname)s] %(message)s'))
-    app.logger.addHandler(console_handler)
+    # Logs em fila: as requisições só enfileiram; um ouvinte por processo grava
+    # em arquivo rotativo (1MB, 5 backups) e no terminal, ou encaminha ao master do Gunicorn
+    configure_logging(app.logger)
 
     app.logger.info("Ensembl Dashboard Backend - Inicializado com Sucesso")
 
     from .routes import main_bp
     app.register_blueprint(main_bp)
 
+    # Instrumentação das requisições (/metrics) e profiler por amostragem opcional
+    if Config.METRICS_ENABLED:
+        from . import metrics
+        metrics.install(app)
+    if Config.PROFILER_ENABLED:
+        from . import profiler
+        profiler.install(app)
+
+    # Cliente Ensembl: preparado agora (padrão, ou no master com preload_app) ou em segundo plano (fast).
+    # O warm-up do cache roda em segundo plano, sem bloquear a inicialização nem o /health;
+    # com preload_app, ele é disparado nos workers (post_fork em gunicorn.conf.py).
+    from . import startup
+    warmup = Config.WARMUP_ENABLED and not Config.PRELOAD_APP
+    if Config.STARTUP_PROFILE == 'fast' and not Config.PRELOAD_APP:
+        startup.start_priming(warmup)
+    else:
+        client = startup.prepare()
+        if warmup:
+            from .warmup import start_warmup
+            start_warmup(client)
+
     return app
\ No newline at end of file
@@ -0,0 +1,164 @@
+import asyncio
+import functools
+import logging
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .config import Config
+from .core import EnsemblClient, HEADERS, TIMEOUTS
+from .effects import Call, Flight, Gather, Http, Sleep, drive_async
+from .models import VariantData
+from .session import get_session
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncEnsemblClient:
+    """
+    Versão assíncrona (asyncio) do EnsemblClient.
+    Executa os mesmos planos do cliente síncrono (retry, breaker, rate limiter,
+    cache e coalescência): as chamadas HTTP rodam em um pool próprio e o trabalho
+    local bloqueante (cache, cota, locks) no pool padrão do event loop, de modo que
+    um Ensembl lento não atrasa os acertos de cache. Esperas usam asyncio.sleep e os
+    blocos do lote e as janelas de Overlap rodam em paralelo (até Config.ASYNC_MAX_CONCURRENCY).
+    """
+
+    def __init__(self, client: EnsemblClient = None):
+        self.client = client or EnsemblClient()
+        self.base_url = self.client.base_url
+
+    @property
+    def cache(self):
+        return self.client.cache
+
+    @property
+    def limiter(self):
+        return self.client.limiter
+
+    @property
+    def breaker(self):
+        return self.client.breaker
+
+    async def _send(self, method: str, url: str, **kwargs):
+        """Primitivo de I/O: a requisição HTTP no pool exclusivo de chamadas upstream."""
+        request = functools.partial(get_session().request, method, url, headers=HEADERS, timeout=TIMEOUTS, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(bridge.http_executor(), request)
+
+    async def _perform(self, effect):
+        if isinstance(effect, Http):
+            return await self._send(effect.method, effect.url, **effect.kwargs)
+        if isinstance(effect, Sleep):
+            return await asyncio.sleep(effect.seconds)
+        if isinstance(effect, Call):
+            return await asyncio.to_thread(effect.fn, *effect.args)
+        if isinstance(effect, Gather):
+            semaphore = asyncio.Semaphore(Config.ASYNC_MAX_CONCURRENCY)
+
+            async def bounded(plan):
+                async with semaphore:
+                    return await self.drive(plan)
+
+            return await asyncio.gather(*(bounded(plan) for plan in effect.plans), return_exceptions=True)
+        if isinstance(effect, Flight):
+            flights = self.client.flights
+            return await flights.run_async(effect.key, lambda: self.drive(effect.plan()), effect.lookup)
+        raise TypeError(f"Efeito desconhecido: {effect!r}")
+
+    async def drive(self, plan):
+        return await drive_async(plan, self._perform)
+
+    async def get_variant_data(self, rsid: str) -> VariantData:
+        """Consulta individual, equivalente a EnsemblClient.get_variant_data."""
+        return await self.drive(self.client._variant_plan(rsid))
+
+    async def get_variants_data(self, rsids: list) -> tuple:
+        """
+        Consulta em lote, equivalente a EnsemblClient.get_variants_data, com os blocos
+        POST e as janelas de Overlap em paralelo. Retorna (resultados, erros).
+        """
+        return await self.drive(self.client._batch_plan(rsids))
+
+
+def request_timeout(ids: int = 1) -> float:
+    """
+    Limite de espera por uma consulta no AsyncBridge: todas as tentativas de cada
+    requisição (conexão, leitura e espera de cota) com os backoffs entre elas, os
+    blocos do lote em rodadas de Config.ASYNC_MAX_CONCURRENCY e, no pior caso, uma
+    consulta de Overlap por variante.
+    """
+    attempt = Config.HTTP_CONNECT_TIMEOUT + Config.TIMEOUT + Config.RATE_LIMIT_MAX_WAIT
+    request = Config.MAX_RETRIES * attempt + (Config.MAX_RETRIES - 1) * Config.RETRY_BACKOFF_MAX
+    concurrency = max(1, Config.ASYNC_MAX_CONCURRENCY)
+    chunks = math.ceil(ids / Config.BATCH_SIZE)
+    return math.ceil(chunks / concurrency) * request + math.ceil(ids / concurrency) * attempt
+
+
+class AsyncBridge:
+    """
+    Event loop dedicado em uma thread de fundo, um por worker do Gunicorn.
+    Permite que as rotas Flask (síncronas) executem corrotinas do AsyncEnsemblClient
+    mantendo várias consultas ao Ensembl em andamento no mesmo processo.
+    Dois pools de threads: Config.ASYNC_MAX_CONCURRENCY para as chamadas HTTP e
+    Config.ASYNC_LOCAL_WORKERS (executor padrão do loop) para o trabalho local.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._pid = None
+        self._http = None
+        self._http_pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        pid = os.getpid()
+        if self._loop is None or self._pid != pid:
+            with self._lock:
+                if self._loop is None or self._pid != pid:
+                    loop = asyncio.new_event_loop()
+                    loop.set_default_executor(ThreadPoolExecutor(
+                        max_workers=Config.ASYNC_LOCAL_WORKERS, thread_name_prefix="ensembl-local"
+                    ))
+                    threading.Thread(target=loop.run_forever, name="ensembl-async", daemon=True).start()
+                    self._loop, self._pid = loop, pid
+        return self._loop
+
+    def http_executor(self) -> ThreadPoolExecutor:
+        """Pool exclusivo das chamadas HTTP ao Ensembl (criado sob demanda em cada worker)."""
+        pid = os.getpid()
+        if self._http is None or self._http_pid != pid:
+            with self._lock:
+                if self._http is None or self._http_pid != pid:
+                    self._http = ThreadPoolExecutor(max_workers=Config.ASYNC_MAX_CONCURRENCY, thread_name_prefix="ensembl-http")
+                    self._http_pid = pid
+        return self._http
+
+    def submit(self, coro):
+        """Agenda a corrotina no loop do worker e retorna um concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def run(self, coro, timeout: float = None):
+        """
+        Executa a corrotina e aguarda o resultado na thread chamadora.
+        Esgotado o `timeout`, a corrotina é cancelada no loop e TimeoutError é propagado.
+        """
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def _reset_after_fork(self):
+        # O loop e os pools (e suas threads) não sobrevivem ao fork; o filho cria os próprios sob demanda
+        self._loop = None
+        self._pid = None
+        self._http = None
+        self._http_pid = None
+        self._lock = threading.Lock()
+
+
+bridge = AsyncBridge()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=bridge._reset_after_fork)
@@ -0,0 +1,161 @@
+"""
+Circuit breaker das chamadas ao Ensembl.
+
+Cada worker observa as próprias chamadas em uma janela deslizante de
+Config.BREAKER_WINDOW segundos. Com pelo menos Config.BREAKER_MIN_CALLS chamadas,
+o circuito abre quando a taxa de falhas (timeouts, erros de conexão e respostas
+5xx) ou a de chamadas lentas atinge o limite configurado. Aberto, ele rejeita as
+chamadas de imediato (CircuitOpen -> 503) por Config.BREAKER_OPEN_SECONDS. Depois
+disso passa a semiaberto, e até Config.BREAKER_HALF_OPEN_CALLS chamadas de teste
+decidem se ele fecha ou volta a abrir.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from .config import Config
+from .metrics import BREAKER_REJECTIONS, BREAKER_TRANSITIONS
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpen(Exception):
+    """O circuito do Ensembl está aberto: a chamada foi rejeitada sem ir à rede."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = max(1, round(retry_after))
+        super().__init__(
+            f"Ensembl temporariamente indisponível; nova tentativa em {self.retry_after}s"
+        )
+
+
+class CircuitBreaker:
+    """Estados fechado/aberto/semiaberto, com taxa de falhas e de lentidão por janela de tempo."""
+
+    def __init__(self, window: float, min_calls: int, error_rate: float, slow_call_seconds: float,
+                 slow_rate: float, open_seconds: float, half_open_calls: int):
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = max(1, half_open_calls)
+        self._lock = threading.Lock()
+        self.counters = {"opened": 0, "rejected": 0, "trials": 0, "failures": 0, "slow_calls": 0}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.state = CLOSED
+            self.opened_at = 0.0
+            self._calls = deque()  # (instante, falhou, lenta)
+            self._trials = 0
+            self._trial_successes = 0
+
+    def _transition(self, state: str, reason: str = ""):
+        """Troca de estado (com o lock adquirido)."""
+        previous, self.state = self.state, state
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+            self.counters["opened"] += 1
+        if state != HALF_OPEN:
+            self._trials = self._trial_successes = 0
+        self._calls.clear()
+        BREAKER_TRANSITIONS.inc(state)
+        log = logger.warning if state == OPEN else logger.info
+        log("Circuito do Ensembl: %s -> %s%s", previous, state, f" ({reason})" if reason else "")
+
+    def _reject(self):
+        self.counters["rejected"] += 1
+        BREAKER_REJECTIONS.inc()
+        return CircuitOpen(self.opened_at + self.open_seconds - time.monotonic())
+
+    def allow(self):
+        """Libera a chamada ou lança CircuitOpen. No estado semiaberto, limita as chamadas de teste."""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    raise self._reject()
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._trials >= self.half_open_calls:
+                    raise self._reject()
+                self._trials += 1
+                self.counters["trials"] += 1
+
+    def check(self):
+        """Lança CircuitOpen se o circuito estiver aberto (ex.: antes do backoff de um retry)."""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at < self.open_seconds:
+                raise self._reject()
+
+    def release(self):
+        """Devolve a vaga de teste de uma chamada liberada que não chegou a ser enviada."""
+        with self._lock:
+            if self.state == HALF_OPEN and self._trials > 0:
+                self._trials -= 1
+
+    def record(self, failed: bool, elapsed: float):
+        """Registra o resultado de uma chamada enviada ao Ensembl."""
+        slow = elapsed >= self.slow_call_seconds
+        now = time.monotonic()
+        with self._lock:
+            self.counters["failures"] += failed
+            self.counters["slow_calls"] += slow
+
+            if self.state == HALF_OPEN:
+                if failed or slow:
+                    self._transition(OPEN, "falha na chamada de teste")
+                else:
+                    self._trial_successes += 1
+                    if self._trial_successes >= self.half_open_calls:
+                        self._transition(CLOSED)
+                return
+            if self.state == OPEN:
+                # Chamada liberada antes da abertura: já não altera o estado
+                return
+
+            calls = self._calls
+            calls.append((now, failed, slow))
+            while calls and now - calls[0][0] > self.window:
+                calls.popleft()
+            if len(calls) < self.min_calls:
+                return
+
+            total = len(calls)
+            failure_rate = sum(1 for _, f, _ in calls if f) / total
+            slow_rate = sum(1 for _, _, s in calls if s) / total
+            if failure_rate >= self.error_rate:
+                self._transition(OPEN, f"{failure_rate:.0%} de falhas em {total} chamadas")
+            elif slow_rate >= self.slow_rate:
+                self._transition(OPEN, f"{slow_rate:.0%} de chamadas acima de {self.slow_call_seconds}s")
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.counters)
+            stats["state"] = self.state
+            calls = [c for c in self._calls if time.monotonic() - c[0] <= self.window]
+            stats["window_calls"] = len(calls)
+            stats["failure_rate"] = round(sum(1 for _, f, _ in calls if f) / len(calls), 4) if calls else 0.0
+            stats["slow_rate"] = round(sum(1 for _, _, s in calls if s) / len(calls), 4) if calls else 0.0
+            if self.state == OPEN:
+                stats["retry_after"] = round(max(0.0, self.opened_at + self.open_seconds - time.monotonic()), 1)
+        return stats
+
+
+def build_breaker():
+    """Circuit breaker configurado em Config, ou None quando desativado."""
+    if not Config.BREAKER_ENABLED:
+        return None
+    return CircuitBreaker(
+        Config.BREAKER_WINDOW,
+        Config.BREAKER_MIN_CALLS,
+        Config.BREAKER_ERROR_RATE,
+        Config.BREAKER_SLOW_CALL_SECONDS,
+        Config.BREAKER_SLOW_RATE,
+        Config.BREAKER_OPEN_SECONDS,
+        Config.BREAKER_HALF_OPEN_CALLS,
+    )
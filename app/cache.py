@@ -0,0 +1,353 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+from .compact import compact_payload
+from .config import Config
+from .coordinates import registry
+from .metrics import NEGATIVE_CACHE_HITS
+from .models import VariantData
+from .serialization import EncodedPayload
+from .storage import connect
+
+logger = logging.getLogger(__name__)
+
+
+# Templates cujas respostas compõem o VariantData em cache (consulta individual, lote e Overlap)
+VARIANT_ENDPOINTS = ("variation", "variation_batch", "overlap")
+# Formato do valor gravado em disco: corpo JSON da resposta + "\n" + índices de maior MAF
+DISK_FORMAT = "2"
+
+
+def endpoint_version() -> str:
+    """
+    Versão dos templates de consulta ao Ensembl que alimentam o cache de variantes,
+    dos campos do VariantData e do formato gravado em disco. Alterar qualquer um
+    deles invalida automaticamente as entradas antigas.
+    """
+    templates = "|".join(Config.ENDPOINTS[name] for name in VARIANT_ENDPOINTS)
+    fields = ",".join(VariantData.model_fields)
+    return hashlib.sha1(f"{templates}|{fields}|{DISK_FORMAT}".encode()).hexdigest()[:8]
+
+
+class LRUCache:
+    """
+    Primeiro nível: cache em memória do processo, limitado em entradas e com TTL.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        item = self.lookup(key)
+        return item[0] if item is not None else None
+
+    def lookup(self, key: str):
+        """Retorna (value, stored_at) ou None."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, stored_at, value = item
+            if time.time() > expires_at:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value, stored_at
+
+    def set(self, key: str, value, stored_at: float = None, expires_at: float = None):
+        """
+        Sem `expires_at`, a entrada vale `ttl` segundos a partir de `stored_at` (ou de agora).
+        Com `expires_at` (ex.: promoção do disco, cujo TTL é mais longo), vale `ttl` a partir
+        de agora, limitado a esse instante; `stored_at` segue indicando a idade real.
+        """
+        now = time.time()
+        stored_at = stored_at or now
+        expires_at = stored_at + self.ttl if expires_at is None else min(expires_at, now + self.ttl)
+        with self._lock:
+            self._data[key] = (expires_at, stored_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    Segundo nível: armazenamento em disco compartilhado por todos os workers.
+    Expurga entradas expiradas e as mais antigas quando o limite é excedido.
+    Entradas vencidas há menos de `grace` segundos ainda podem ser lidas como
+    obsoletas (stale), enquanto uma atualização em segundo plano é feita.
+    """
+
+    # Frequência (em escritas) da rotina de expurgo
+    PRUNE_EVERY = 100
+
+    def __init__(self, path: str, max_entries: int, ttl: float, grace: float = 0):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.grace = grace
+        self._writes = 0
+        connect(self.path).execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB, stored_at REAL)"
+        )
+
+    def get(self, key: str, stale: bool = False):
+        """Retorna (value, stored_at) ou None. Com stale=True, aceita entradas no período de graça."""
+        row = connect(self.path).execute(
+            "SELECT value, stored_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        max_age = self.ttl + self.grace if stale else self.ttl
+        if row is None or time.time() - row[1] > max_age:
+            return None
+        return row
+
+    def set(self, key: str, value: bytes):
+        conn = connect(self.path)
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (key, value, stored_at) VALUES (?, ?, ?)",
+            (key, value, time.time())
+        )
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self) -> int:
+        """Remove entradas expiradas e excedentes. Retorna o total removido."""
+        conn = connect(self.path)
+        removed = conn.execute(
+            "DELETE FROM entries WHERE stored_at < ?", (time.time() - self.ttl - self.grace,)
+        ).rowcount
+        excess = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+        if excess > 0:
+            removed += conn.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY stored_at ASC LIMIT ?)",
+                (excess,)
+            ).rowcount
+        return removed
+
+    def clear(self):
+        connect(self.path).execute("DELETE FROM entries")
+
+    def __len__(self):
+        return connect(self.path).execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
+class CachedVariant(NamedTuple):
+    """Entrada do nível em memória: o modelo e seu corpo JSON já serializado (com ETag)."""
+    variant: VariantData
+    payload: EncodedPayload
+
+
+class VariantCache:
+    """
+    Cache de dois níveis para VariantData (LRU local + SQLite compartilhado).
+    Chave: versão do endpoint + rsID sanitizado.
+    O disco guarda o JSON serializado, reaproveitado como corpo da resposta HTTP.
+    """
+
+    def __init__(self):
+        self.memory = LRUCache(Config.CACHE_MEMORY_MAX_ENTRIES, Config.CACHE_MEMORY_TTL)
+        self.disk = SQLiteCache(
+            os.path.join(Config.CACHE_DIR, "variants.sqlite3"),
+            Config.CACHE_DISK_MAX_ENTRIES,
+            Config.CACHE_DISK_TTL,
+            Config.CACHE_STALE_GRACE
+        )
+        # Corpos no formato compacto, gerados sob demanda a partir da entrada em memória
+        self.compact = LRUCache(Config.CACHE_MEMORY_MAX_ENTRIES, Config.CACHE_MEMORY_TTL)
+        self.version = endpoint_version()
+        self._lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "stale_hits": 0, "misses": 0, "sets": 0, "errors": 0}
+
+    def _key(self, rsid: str) -> str:
+        return f"{self.version}:{rsid}"
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def get_entry(self, rsid: str, record: bool = True):
+        """
+        Busca na memória e depois no disco, promovendo acertos do disco para a memória.
+        Retorna CachedVariant ou None. Com record=False, os contadores não são alterados
+        (consultas repetidas enquanto outro worker resolve a mesma variante).
+        """
+        item = self.lookup(rsid, record)
+        return item[0] if item is not None else None
+
+    def lookup(self, rsid: str, record: bool = True, stale: bool = False):
+        """
+        Retorna (CachedVariant, stored_at) ou None. Com stale=True, entradas vencidas
+        há menos de Config.CACHE_STALE_GRACE também são retornadas (refresh-ahead).
+        """
+        count = self._count if record else (lambda name: None)
+        key = self._key(rsid)
+        item = self.memory.lookup(key)
+        if item is not None:
+            count("memory_hits")
+            return item
+
+        try:
+            row = self.disk.get(key, stale=stale)
+        except Exception as e:
+            logger.warning("Falha na leitura do cache em disco para %s: %s", rsid, e)
+            count("errors")
+            row = None
+
+        if row is None:
+            count("misses")
+            return None
+
+        # O JSON compacto não contém quebras de linha: a primeira separa o corpo da resposta
+        body, _, rows = bytes(row[0]).partition(b"\n")
+        stored_at = row[1]
+        variant = VariantData.model_validate_json(body)
+        variant.highest_maf_rows = json.loads(rows) if rows else []
+        entry = CachedVariant(variant, EncodedPayload(body))
+        if time.time() - stored_at > self.disk.ttl:
+            # Entrada obsoleta: servida uma vez enquanto a atualização é feita, sem promoção
+            count("stale_hits")
+        else:
+            # A idade real (refresh-ahead) vem do disco; o TTL da memória conta a partir da promoção
+            self.memory.set(key, entry, stored_at=stored_at, expires_at=stored_at + self.disk.ttl)
+            count("disk_hits")
+        return entry, stored_at
+
+    def get(self, rsid: str, record: bool = True):
+        entry = self.get_entry(rsid, record)
+        return entry.variant if entry is not None else None
+
+    def set(self, rsid: str, variant: VariantData):
+        key = self._key(rsid)
+        payload = EncodedPayload.from_model(variant)
+        self.memory.set(key, CachedVariant(variant, payload))
+        try:
+            # highest_maf_rows fica fora do corpo da resposta; o formato compacto o usa
+            self.disk.set(key, payload.body + b"\n" + json.dumps(variant.highest_maf_rows).encode())
+        except Exception as e:
+            logger.warning("Falha na escrita do cache em disco para %s: %s", rsid, e)
+            self._count("errors")
+        self._count("sets")
+
+    def payload_for(self, rsid: str, variant: VariantData, compact: bool = False) -> EncodedPayload:
+        """
+        Corpo serializado do resultado: reaproveitado da entrada em memória quando
+        ela corresponde ao mesmo objeto, evitando nova serialização e novo hash.
+        No formato compacto, a chave inclui a versão do dicionário de populações.
+        """
+        if compact:
+            key = f"{self._key(rsid)}:{registry.version}"
+            entry = self.compact.get(key)
+            if entry is None or entry.variant is not variant:
+                entry = CachedVariant(variant, compact_payload(variant))
+                self.compact.set(key, entry)
+            return entry.payload
+
+        entry = self.memory.get(self._key(rsid))
+        if entry is not None and entry.variant is variant:
+            return entry.payload
+        return EncodedPayload.from_model(variant)
+
+    def clear(self):
+        self.memory.clear()
+        self.compact.clear()
+        self.disk.clear()
+
+    def stats(self) -> dict:
+        """Contadores de acerto/erro para ajuste dos limites."""
+        with self._lock:
+            stats = dict(self.counters)
+        hits = stats["memory_hits"] + stats["disk_hits"] + stats["stale_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_ratio"] = round(hits / lookups, 4) if lookups else 0.0
+        stats["memory_entries"] = len(self.memory)
+        stats["version"] = self.version
+        return stats
+
+
+class NegativeCache:
+    """
+    rsIDs inexistentes no Ensembl, lembrados por Config.NEGATIVE_CACHE_TTL segundos
+    (LRU local + SQLite compartilhado), para que IDs desconhecidos repetidos não
+    voltem ao upstream a cada requisição. O TTL curto limita o atraso até que um
+    ID recém-publicado passe a ser encontrado.
+    """
+
+    def __init__(self):
+        self.memory = LRUCache(Config.NEGATIVE_CACHE_MAX_ENTRIES, Config.NEGATIVE_CACHE_TTL)
+        self.disk = SQLiteCache(
+            os.path.join(Config.CACHE_DIR, "negative.sqlite3"),
+            Config.NEGATIVE_CACHE_MAX_ENTRIES,
+            Config.NEGATIVE_CACHE_TTL
+        )
+        self.version = endpoint_version()
+        self._lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "errors": 0}
+
+    def _key(self, rsid: str) -> str:
+        return f"{self.version}:{rsid}"
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def contains(self, rsid: str) -> bool:
+        """True se o rsID foi dado como inexistente dentro do TTL."""
+        key = self._key(rsid)
+        if self.memory.get(key):
+            self._count("memory_hits")
+            NEGATIVE_CACHE_HITS.inc()
+            return True
+
+        try:
+            row = self.disk.get(key)
+        except Exception as e:
+            logger.warning("Falha na leitura do cache negativo para %s: %s", rsid, e)
+            self._count("errors")
+            row = None
+        if row is None:
+            self._count("misses")
+            return False
+
+        self.memory.set(key, True, stored_at=row[1])
+        self._count("disk_hits")
+        NEGATIVE_CACHE_HITS.inc()
+        return True
+
+    def add(self, rsid: str):
+        key = self._key(rsid)
+        self.memory.set(key, True)
+        try:
+            self.disk.set(key, b"")
+        except Exception as e:
+            logger.warning("Falha na escrita do cache negativo para %s: %s", rsid, e)
+            self._count("errors")
+        self._count("sets")
+
+    def clear(self):
+        self.memory.clear()
+        self.disk.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.counters)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((lookups - stats["misses"]) / lookups, 4) if lookups else 0.0
+        stats["memory_entries"] = len(self.memory)
+        stats["ttl"] = Config.NEGATIVE_CACHE_TTL
+        return stats
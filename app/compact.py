@@ -0,0 +1,58 @@
+"""
+Formato compacto das respostas de variantes (?format=compact).
+
+As frequências populacionais são enviadas em colunas (nome, ID, alelo, frequência)
+e os metadados estáticos de cada população (rótulo, coordenadas e is_region) ficam
+no dicionário versionado de /api/populations, referenciados pelo ID. As listas
+highest_maf_* dão lugar aos índices das linhas de maior MAF (highest_maf_rows,
+calculados pelo motor de frequências).
+"""
+import json
+from .coordinates import get_population_id, registry
+from .metrics import stage
+from .models import VariantData
+from .serialization import EncodedPayload
+
+COMPACT = "compact"
+FORMATS = ("full", COMPACT)
+
+# Campos substituídos pelas colunas e pelos índices de highest_maf
+EXPANDED_FIELDS = {
+    "pop_frequencies", "highest_maf_lat", "highest_maf_lon", "highest_maf_labels", "highest_maf_is_region",
+    "highest_maf_rows"
+}
+
+_dictionary_payload = None
+
+
+def compact_variant(variant: VariantData) -> dict:
+    """VariantData no formato compacto (dict pronto para serialização)."""
+    pops = variant.pop_frequencies
+    return {
+        "format": COMPACT,
+        "populations_version": registry.version,
+        **variant.model_dump(exclude=EXPANDED_FIELDS),
+        "pop_frequencies": {
+            "population": [p.population for p in pops],
+            "id": [get_population_id(p.population) for p in pops],
+            "allele": [p.allele for p in pops],
+            "frequency": [p.frequency for p in pops],
+        },
+        "highest_maf": variant.highest_maf_rows,
+    }
+
+
+def compact_payload(variant: VariantData) -> EncodedPayload:
+    with stage("serialize"):
+        return EncodedPayload(json.dumps(compact_variant(variant), separators=(",", ":")).encode())
+
+
+def dictionary_payload() -> EncodedPayload:
+    """Corpo de /api/populations, serializado uma vez por versão do registro."""
+    global _dictionary_payload
+    dictionary = registry.dictionary()
+    payload = _dictionary_payload
+    if payload is None or payload[0] != dictionary["version"]:
+        body = json.dumps(dictionary, separators=(",", ":"), ensure_ascii=False).encode()
+        payload = _dictionary_payload = (dictionary["version"], EncodedPayload(body))
+    return payload[1]
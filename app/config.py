@@ -1,10 +1,12 @@
 import os
 from pathlib import Path
-from dotenv import load_dotenv
 
 # Definição de caminhos base
 BASE_DIR = Path(__file__).resolve().parent.parent
-load_dotenv(os.path.join(BASE_DIR, '.env'))
+# python-dotenv só é importado quando há um .env (em container as variáveis vêm do ambiente)
+if os.path.exists(os.path.join(BASE_DIR, '.env')):
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(BASE_DIR, '.env'))
 
 class Config:
     """
@@ -16,23 +18,138 @@ class Config:
     DEBUG = os.environ.get('FLASK_DEBUG', 'True').lower() == 'true'
     
     # Integração Ensembl 
-    ENSEMBL_BASE_URL = "https://rest.ensembl.org"
+    # Selecionável por ambiente (ex.: servidor local de fixtures em testes e benchmarks)
+    ENSEMBL_BASE_URL = os.environ.get('ENSEMBL_BASE_URL', 'https://rest.ensembl.org').rstrip('/')
     TIMEOUT = 15
+    MAX_RETRIES = 3
+
+    # Pool de conexões HTTP (uma Session por worker do Gunicorn)
+    HTTP_POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', 4))
+    HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', 16))
+    HTTP_KEEPALIVE = os.environ.get('HTTP_KEEPALIVE', 'True').lower() == 'true'
+    HTTP_TCP_KEEPALIVE = os.environ.get('HTTP_TCP_KEEPALIVE', 'True').lower() == 'true'
+    HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 5))
+
+    # Rate limit compartilhado entre workers (Ensembl: 15 req/s por IP)
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+    RATE_LIMIT_PER_SECOND = float(os.environ.get('RATE_LIMIT_PER_SECOND', 14))
+    RATE_LIMIT_BURST = int(os.environ.get('RATE_LIMIT_BURST', 14))
+    RATE_LIMIT_RESERVE = int(os.environ.get('RATE_LIMIT_RESERVE', 10))
+    RATE_LIMIT_MAX_WAIT = float(os.environ.get('RATE_LIMIT_MAX_WAIT', 10))
+    RETRY_BACKOFF_BASE = float(os.environ.get('RETRY_BACKOFF_BASE', 1))
+    RETRY_BACKOFF_MAX = float(os.environ.get('RETRY_BACKOFF_MAX', 8))
+
+    # Circuit breaker do Ensembl (por worker): abre com a taxa de falhas ou de lentidão da janela
+    BREAKER_ENABLED = os.environ.get('BREAKER_ENABLED', 'True').lower() == 'true'
+    BREAKER_WINDOW = float(os.environ.get('BREAKER_WINDOW', 60))
+    BREAKER_MIN_CALLS = int(os.environ.get('BREAKER_MIN_CALLS', 10))
+    BREAKER_ERROR_RATE = float(os.environ.get('BREAKER_ERROR_RATE', 0.5))
+    BREAKER_SLOW_CALL_SECONDS = float(os.environ.get('BREAKER_SLOW_CALL_SECONDS', 5))
+    BREAKER_SLOW_RATE = float(os.environ.get('BREAKER_SLOW_RATE', 0.8))
+    BREAKER_OPEN_SECONDS = float(os.environ.get('BREAKER_OPEN_SECONDS', 30))
+    BREAKER_HALF_OPEN_CALLS = int(os.environ.get('BREAKER_HALF_OPEN_CALLS', 3))
+
+    # Cliente assíncrono: rotas executam as consultas no event loop do worker
+    ASYNC_CLIENT_ENABLED = os.environ.get('ASYNC_CLIENT_ENABLED', 'True').lower() == 'true'
+    ASYNC_MAX_CONCURRENCY = int(os.environ.get('ASYNC_MAX_CONCURRENCY', 16))
+    # Threads para o trabalho local (cache, cota, locks), separadas das chamadas HTTP
+    ASYNC_LOCAL_WORKERS = int(os.environ.get('ASYNC_LOCAL_WORKERS', 4))
+
+    # Consultas em lote (POST /variation/human aceita até 200 IDs por chamada)
+    BATCH_SIZE = 200
+    BATCH_MAX_IDS = int(os.environ.get('BATCH_MAX_IDS', 1000))
+    # Streaming NDJSON (POST /api/variants/stream): consultas simultâneas por requisição
+    STREAM_CONCURRENCY = int(os.environ.get('STREAM_CONCURRENCY', 8))
+    # Janela máxima aceita pelo /overlap/region (5 Mb)
+    OVERLAP_MAX_SPAN = 5_000_000
+    # Índice local de genes (.gix ou GTF/GFF3/BED); vazio = Overlap remoto
+    GENE_INDEX_PATH = os.environ.get('GENE_INDEX_PATH', '')
+    # Armazenamento offline de variantes (python -m app.variant_store build); vazio = apenas REST
+    VARIANT_STORE_DIR = os.environ.get('VARIANT_STORE_DIR', '')
     
     # Templates de URL para endpoints externos
     ENDPOINTS = {
         "variation": "/variation/human/{rsid}?pops=1;phenotypes=1;alt_alleles=1",
-        "overlap": "/overlap/region/human/{region}?feature=gene"
+        # Mesmos parâmetros da consulta individual: ambas gravam na mesma chave de cache
+        "variation_batch": "/variation/human?pops=1;phenotypes=1;alt_alleles=1",
+        "overlap": "/overlap/region/human/{region}?feature=gene",
+        "overlap_variation": "/overlap/region/human/{region}?feature=variation"
     }
+
+    # Consulta por região (/api/region): janela máxima, blocos (tiles) em cache e paginação
+    REGION_MAX_SPAN = int(os.environ.get('REGION_MAX_SPAN', 1_000_000))
+    REGION_TILE_SIZE = int(os.environ.get('REGION_TILE_SIZE', 50_000))
+    REGION_FETCH_CONCURRENCY = int(os.environ.get('REGION_FETCH_CONCURRENCY', 4))
+    REGION_PAGE_SIZE = int(os.environ.get('REGION_PAGE_SIZE', 500))
+    REGION_MAX_PAGE_SIZE = int(os.environ.get('REGION_MAX_PAGE_SIZE', 5000))
+    REGION_TILE_MEMORY_ENTRIES = int(os.environ.get('REGION_TILE_MEMORY_ENTRIES', 64))
+    REGION_TILE_MAX_ENTRIES = int(os.environ.get('REGION_TILE_MAX_ENTRIES', 5000))
     
+    # Registro de populações (catálogo extra em JSON/TSV e memoização de nomes)
+    POP_CATALOG_PATH = os.environ.get('POP_CATALOG_PATH', '')
+    POP_CACHE_SIZE = int(os.environ.get('POP_CACHE_SIZE', 1024))
+
+    # Cache de resultados (LRU em memória + SQLite compartilhado entre workers)
+    CACHE_ENABLED = os.environ.get('CACHE_ENABLED', 'True').lower() == 'true'
+    CACHE_DIR = os.environ.get('CACHE_DIR', os.path.join(BASE_DIR, 'cache'))
+    CACHE_MEMORY_MAX_ENTRIES = int(os.environ.get('CACHE_MEMORY_MAX_ENTRIES', 512))
+    CACHE_MEMORY_TTL = int(os.environ.get('CACHE_MEMORY_TTL', 3600))
+    CACHE_DISK_MAX_ENTRIES = int(os.environ.get('CACHE_DISK_MAX_ENTRIES', 50000))
+    CACHE_DISK_TTL = int(os.environ.get('CACHE_DISK_TTL', 86400))
+    # Cache negativo: rsIDs inexistentes no Ensembl não são consultados de novo dentro do TTL (0 = desativado)
+    NEGATIVE_CACHE_TTL = int(os.environ.get('NEGATIVE_CACHE_TTL', 300))
+    NEGATIVE_CACHE_MAX_ENTRIES = int(os.environ.get('NEGATIVE_CACHE_MAX_ENTRIES', 10000))
+    # Refresh-ahead: acertos após esta fração do TTL disparam atualização em segundo plano (0 = desativado)
+    CACHE_REFRESH_AHEAD = float(os.environ.get('CACHE_REFRESH_AHEAD', 0.8))
+    # Janela após o vencimento em que a entrada ainda é servida (obsoleta) enquanto é atualizada
+    CACHE_STALE_GRACE = int(os.environ.get('CACHE_STALE_GRACE', 3600))
+    CACHE_REFRESH_WORKERS = int(os.environ.get('CACHE_REFRESH_WORKERS', 2))
+
+    # Warm-up do cache na inicialização (histórico de logs/app.log + sementes separadas por vírgula)
+    WARMUP_ENABLED = os.environ.get('WARMUP_ENABLED', 'True').lower() == 'true'
+    WARMUP_TOP_N = int(os.environ.get('WARMUP_TOP_N', 100))
+    WARMUP_RSIDS = os.environ.get('WARMUP_RSIDS', '')
+    WARMUP_TIMEOUT = float(os.environ.get('WARMUP_TIMEOUT', 30))
+
+    # Coalescência de consultas (uma resolução upstream por rsID entre threads e workers)
+    SINGLEFLIGHT_ENABLED = os.environ.get('SINGLEFLIGHT_ENABLED', 'True').lower() == 'true'
+    SINGLEFLIGHT_LEASE = float(os.environ.get('SINGLEFLIGHT_LEASE', 60))
+    SINGLEFLIGHT_POLL_INTERVAL = float(os.environ.get('SINGLEFLIGHT_POLL_INTERVAL', 0.05))
+
+    # Respostas HTTP: cache do navegador/proxy e compressão
+    VARIANT_CACHE_MAX_AGE = int(os.environ.get('VARIANT_CACHE_MAX_AGE', 300))
+    # Dicionário de populações versionado (/api/populations?v=): imutável enquanto a versão não muda
+    POPULATIONS_MAX_AGE = int(os.environ.get('POPULATIONS_MAX_AGE', 31536000))
+    COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 512))
+    GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', 6))
+    BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', 5))
+
+    # Métricas (/metrics): snapshot por worker em disco, agregado na leitura
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+    METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(CACHE_DIR, 'metrics'))
+    METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+
+    # Profiler por amostragem, ativado por requisição com o header PROFILER_HEADER
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'False').lower() == 'true'
+    PROFILER_HEADER = os.environ.get('PROFILER_HEADER', 'X-Profile')
+    PROFILER_TOKEN = os.environ.get('PROFILER_TOKEN', '')
+    PROFILER_INTERVAL = float(os.environ.get('PROFILER_INTERVAL', 0.005))
+    PROFILER_DIR = os.environ.get('PROFILER_DIR', os.path.join(CACHE_DIR, 'profiles'))
+
+    # Inicialização: 'default' carrega o cliente Ensembl em create_app; 'fast' (serverless)
+    # adia requests/Pydantic/cliente para uma thread de fundo e para o primeiro uso
+    STARTUP_PROFILE = os.environ.get('STARTUP_PROFILE', 'default').lower()
+    # Aplicação criada no master do Gunicorn antes do fork (lido também por gunicorn.conf.py)
+    PRELOAD_APP = os.environ.get('PRELOAD_APP', 'False').lower() == 'true'
+
     # Gerenciamento de Logs (Garante que a pasta exista)
-    LOG_DIR = os.path.join(BASE_DIR, 'logs')
+    LOG_DIR = os.environ.get('LOG_DIR', os.path.join(BASE_DIR, 'logs'))
     LOG_FILE = os.path.join(LOG_DIR, 'app.log')
+    # Formato do arquivo de log: 'text' ou 'json' (um objeto por linha)
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text').lower()
 
     @classmethod
     def init_app(cls):
-        """Cria diretórios necessários na inicialização"""
+        """Cria diretórios necessários (chamado por create_app, não na importação)"""
         os.makedirs(cls.LOG_DIR, exist_ok=True)
-
-# Chamada automática para garantir diretórios
-Config.init_app()
\ No newline at end of file
+        os.makedirs(cls.CACHE_DIR, exist_ok=True)
@@ -1,4 +1,10 @@
 # app/coordinates.py
+import csv
+import hashlib
+import json
+import re
+from functools import lru_cache
+from .config import Config
 
 POP_COORDS = {
     # --- 1000 Genomes (Super-populações / Regiões) ---
@@ -80,19 +86,148 @@ POP_COORDS = {
     "GWW": {"lat": 13.6, "lon": -16.7, "label": "GGVP: Gambian - Wolof", "is_region": False},
 }
 
+# Separadores de segmentos nos nomes de população do Ensembl (ex.: 1000GENOMES:phase_3:YRI)
+TOKEN_SPLIT = re.compile(r"[:_]")
+
+
+def tokenize(name: str) -> tuple:
+    return tuple(TOKEN_SPLIT.split(name))
+
+
+class PopulationRegistry:
+    """
+    Registro de populações pré-indexado por segmentos (tokens) do nome.
+
+    Regras de prioridade na resolução de um nome:
+    1. Correspondência exata com uma chave registrada.
+    2. Sequência de tokens de uma chave dentro do nome, nunca no primeiro segmento
+       (equivalente a ':SIGLA' ou '_SIGLA'). Entre vários candidatos vence:
+       a) a chave com mais tokens (mais específica);
+       b) a ocorrência mais à direita (a sigla costuma ser o último segmento);
+       c) entre chaves com os mesmos tokens (ex.: 'A:B' e 'A_B'), a menor em ordem
+          lexicográfica (desempate determinístico).
+    3. Fallback: população desconhecida, exibida com o próprio nome.
+    """
+
+    def __init__(self, entries: dict, cache_size: int = 1024):
+        self.entries = {}
+        self._by_tokens = {}
+        self._max_tokens = 1
+        self._cache_size = cache_size
+        for key, geo in entries.items():
+            self._add(key, geo)
+        self._reset_cache()
+
+    def _add(self, key: str, geo: dict):
+        self.entries[key] = {
+            "lat": float(geo.get("lat", 0.0)),
+            "lon": float(geo.get("lon", 0.0)),
+            "label": str(geo.get("label", key)),
+            "is_region": bool(geo.get("is_region", False))
+        }
+        tokens = tokenize(key)
+        self._by_tokens[tokens] = min(key, self._by_tokens.get(tokens, key))
+        self._max_tokens = max(self._max_tokens, len(tokens))
+
+    def _reset_cache(self):
+        self.resolve = lru_cache(maxsize=self._cache_size)(self._resolve)
+        self.population_id = lru_cache(maxsize=self._cache_size)(self._population_id)
+        # IDs do dicionário: posição da chave na ordem de registro
+        self._ids = {key: index for index, key in enumerate(self.entries)}
+        self._dictionary = None
+
+    def register(self, entries: dict):
+        """Adiciona (ou substitui) populações e invalida a memoização."""
+        for key, geo in entries.items():
+            self._add(key, geo)
+        self._reset_cache()
+
+    def match(self, pop_name: str):
+        """Retorna a chave registrada que corresponde ao nome, ou None."""
+        if pop_name in self.entries:
+            return pop_name
+
+        tokens = tokenize(pop_name)
+        for size in range(min(self._max_tokens, len(tokens) - 1), 0, -1):
+            for start in range(len(tokens) - size, 0, -1):
+                key = self._by_tokens.get(tokens[start:start + size])
+                if key is not None:
+                    return key
+        return None
+
+    def _resolve(self, pop_name: str) -> dict:
+        key = self.match(pop_name)
+        if key is not None:
+            return self.entries[key]
+        return {"lat": 0.0, "lon": 0.0, "label": pop_name, "is_region": True}
+
+    def _population_id(self, pop_name: str) -> int:
+        key = self.match(pop_name)
+        return self._ids[key] if key is not None else -1
+
+    def dictionary(self) -> dict:
+        """
+        Dicionário colunar das populações registradas (keys, labels, lat, lon, is_region),
+        em que o ID de cada população é o seu índice. A versão é o hash do conteúdo:
+        muda sempre que o registro muda e identifica a URL cacheável /api/populations?v=.
+        """
+        if self._dictionary is None:
+            entries = self.entries.values()
+            columns = {
+                "keys": list(self.entries),
+                "labels": [geo["label"] for geo in entries],
+                "lat": [geo["lat"] for geo in entries],
+                "lon": [geo["lon"] for geo in entries],
+                "is_region": [geo["is_region"] for geo in entries],
+            }
+            digest = hashlib.sha1(json.dumps(columns, separators=(",", ":")).encode()).hexdigest()[:8]
+            self._dictionary = {"version": digest, **columns}
+        return self._dictionary
+
+    @property
+    def version(self) -> str:
+        return self.dictionary()["version"]
+
+    def load_catalog(self, path: str) -> int:
+        """
+        Carrega populações extras de um arquivo JSON ou TSV, sem alterar o código.
+        JSON: {"CHAVE": {"lat":..., "lon":..., "label":..., "is_region":...}} ou lista de
+        objetos com o campo "population". TSV: cabeçalho population, lat, lon, label, is_region.
+        """
+        if path.lower().endswith(".json"):
+            with open(path, encoding="utf-8") as handle:
+                data = json.load(handle)
+            if isinstance(data, list):
+                data = {item["population"]: item for item in data}
+        else:
+            with open(path, encoding="utf-8", newline="") as handle:
+                data = {
+                    row["population"]: {
+                        **row,
+                        "is_region": str(row.get("is_region", "")).strip().lower() in ("1", "true", "yes", "sim")
+                    }
+                    for row in csv.DictReader(handle, delimiter="\t")
+                }
+        self.register(data)
+        return len(data)
+
+
+registry = PopulationRegistry(POP_COORDS, cache_size=Config.POP_CACHE_SIZE)
+if Config.POP_CATALOG_PATH:
+    registry.load_catalog(Config.POP_CATALOG_PATH)
+
+
 def get_coords(pop_name):
     """
     Retorna dicionário com lat, lon, label e is_region.
-    Tenta busca exata, depois busca por sufixo (sigla).
+    Resolução via registro pré-indexado (ver PopulationRegistry), com memoização.
+    """
+    return registry.resolve(pop_name)
+
+
+def get_population_id(pop_name):
+    """
+    ID no dicionário de populações (/api/populations) da chave que corresponde ao nome,
+    ou -1 para populações desconhecidas (exibidas com o próprio nome, sem coordenadas).
     """
-    # 1. Procura exata
-    if pop_name in POP_COORDS:
-        return POP_COORDS[pop_name]
-    
-    # 2. Procura por sigla limpa (:SIGLA ou _SIGLA)
-    for key in POP_COORDS:
-        if f":{key}" in pop_name or f"_{key}" in pop_name:
-            return POP_COORDS[key]
-            
-    # 3. Fallback (População desconhecida)
-    return {"lat": 0.0, "lon": 0.0, "label": pop_name, "is_region": True}
\ No newline at end of file
+    return registry.population_id(pop_name)
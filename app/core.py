@@ -1,179 +1,671 @@
+import os
 import requests
 import logging
 import time  # Adicionado para a lógica de retry
-from .models import VariantData, PopulationFrequency
-from .coordinates import get_coords
+from concurrent.futures import ThreadPoolExecutor
+from .models import VariantData
+from .frequencies import compute_frequencies
 from .config import Config
+from .cache import NegativeCache, VariantCache
+from .breaker import CircuitOpen, build_breaker
+from .session import get_session
+from .ratelimit import RateLimiter, RateLimitExceeded, backoff_delay
+from .gene_index import load_configured_index
+from .variant_store import open_configured_store
+from .singleflight import ABSENT, FlightLock, SingleFlight
+from .refresh import RefreshAhead
+from .regions import RegionFetchError, RegionTileCache, build_tile, make_cursor, parse_cursor, tile_bounds, tile_range
+from .effects import Call, Flight, Gather, Http, Sleep, drive
+from .metrics import UPSTREAM_IN_FLIGHT, UPSTREAM_RETRIES, record_upstream, stage
 
 # Configuração do logger para rastreabilidade de processos e depuração
 logger = logging.getLogger(__name__)
 
+# Headers idênticos ao exemplo oficial para máxima compatibilidade
+HEADERS = { "Content-Type" : "application/json", "Accept": "application/json" }
+
+# Timeout separado para conexão e leitura (requests aceita a tupla)
+TIMEOUTS = (Config.HTTP_CONNECT_TIMEOUT, Config.TIMEOUT)
+
+# O Ensembl responde 400 (e não 404) para rsIDs inexistentes em /variation/human
+NOT_FOUND_STATUS = (400, 404)
+NOT_FOUND = "Identificador não localizado na base Ensembl"
+
+
+def upstream_failed(response, error: Exception = None) -> bool:
+    """Falha do ponto de vista do circuit breaker: exceção (timeout, conexão) ou resposta 5xx."""
+    return error is not None or (response is not None and response.status_code >= 500)
+
+
+def is_not_found(response) -> bool:
+    return response is not None and response.status_code in NOT_FOUND_STATUS
+
+
+def collect_genes(data: dict) -> set:
+    """
+    Extrai os genes associados a partir de fenótipos e transcript_variations.
+    Retorna um conjunto vazio quando a variante exige a consulta de Overlap.
+    """
+    gene_set = set()
+
+    for p in data.get("phenotypes", []):
+        if p.get("genes"):
+            for g in p.get("genes").split(","):
+                gene_set.add(g.strip())
+
+    for tv in data.get("transcript_variations", []):
+        gene_name = tv.get("gene_symbol")
+        if gene_name:
+            gene_set.add(gene_name)
+
+    return gene_set
+
+
+def parse_variant(data: dict, rsid: str, gene_set: set) -> VariantData:
+    """
+    Converte o payload bruto de /variation/human em VariantData.
+    Caminho único de parsing, compartilhado pelas consultas individual e em lote.
+    """
+    # --- 1. Processamento de Frequências Populacionais (motor colunar) ---
+    with stage("populations"):
+        freq = compute_frequencies(data.get("populations", []))
+
+    # --- 2. Mapeamento Genômico ---
+    mapping = data.get("mappings", [{}])[0]
+
+    return VariantData(
+        rsid=data.get("name", rsid),
+        chromosome=str(mapping.get("seq_region_name", "N/A")),
+        position=int(mapping.get("start", 0)),
+        alleles=mapping.get("allele_string", "N/A"),
+        minor_allele_freq=freq.minor_allele_freq,
+        maf_1000g=freq.maf_1000g,
+        pop_frequencies=freq.pop_frequencies,
+        genes=sorted(list(gene_set)),
+        consequence=data.get("most_severe_consequence", "N/A").replace("_", " "),
+        highest_maf_lat=freq.highest_maf_lat,
+        highest_maf_lon=freq.highest_maf_lon,
+        highest_maf_labels=freq.highest_maf_labels,
+        highest_maf_is_region=freq.highest_maf_is_region,
+        highest_maf_rows=freq.highest_maf_rows
+    )
+
+
+def needs_overlap(data: dict, gene_set: set) -> bool:
+    """Indica se a variante depende da Lógica de Emergência (Overlap) para localizar genes."""
+    mapping = data.get("mappings", [{}])[0]
+    return not gene_set and bool(mapping.get("seq_region_name"))
+
+
+def group_overlap_regions(mappings: dict, max_span: int) -> list:
+    """
+    Agrupa mapeamentos por cromossomo em janelas contíguas de até `max_span` bases.
+    Recebe {rsid: mapping} e retorna uma lista de (chrom, start, end, [rsids]),
+    permitindo resolver vários Overlaps com uma única chamada por janela.
+    """
+    by_chrom = {}
+    for rsid, mapping in mappings.items():
+        chrom = str(mapping.get("seq_region_name"))
+        by_chrom.setdefault(chrom, []).append((int(mapping.get("start")), int(mapping.get("end")), rsid))
+
+    windows = []
+    for chrom, items in by_chrom.items():
+        items.sort()
+        current = None
+        for start, end, rsid in items:
+            if current and max(current[2], end) - current[1] + 1 <= max_span:
+                current[2] = max(current[2], end)
+                current[3].append(rsid)
+            else:
+                if current:
+                    windows.append(tuple(current))
+                current = [chrom, start, end, [rsid]]
+        if current:
+            windows.append(tuple(current))
+    return windows
+
+
+def add_overlap_genes(gene_set: set, features: list, start: int = None, end: int = None):
+    """
+    Adiciona ao conjunto os genes retornados pelo Overlap, marcados com '(overlap)'.
+    Com start/end, considera apenas genes que cobrem a variante (janelas agrupadas).
+    """
+    for feature in features:
+        gene_symbol = feature.get("external_name")
+        if not gene_symbol:
+            continue
+        if start is not None and not (feature.get("start", 0) <= end and feature.get("end", 0) >= start):
+            continue
+        gene_set.add(f"{gene_symbol} (overlap)")
+
+
+def decode_variation(response, rsid: str):
+    """
+    Interpreta a resposta de /variation/human para um único rsID.
+    Retorna o payload (dict) ou None quando ausente, não encontrado ou inválido.
+    """
+    if response is None:
+        return None
+
+    if is_not_found(response):
+        logger.warning("Variante %s não encontrada no Ensembl.", rsid)
+        return None
+
+    try:
+        response.raise_for_status()
+        return response.json() or None
+    except Exception as e:
+        logger.error("Erro inesperado na requisição de %s: %s", rsid, e)
+        return None
+
+
+def decode_batch(response, chunk: list) -> tuple:
+    """
+    Interpreta a resposta do POST /variation/human para um bloco de IDs.
+    Retorna (payloads, erros) indexados pelo rsID solicitado.
+    """
+    raw, errors = {}, {}
+    if response is None or not response.ok:
+        status = response.status_code if response is not None else "sem resposta"
+        return raw, {rsid: f"Falha na comunicação com o Ensembl ({status})" for rsid in chunk}
+
+    try:
+        payload = response.json()
+    except Exception as e:
+        logger.error("Resposta inválida do Ensembl para o lote: %s", e)
+        return raw, {rsid: "Resposta inválida do Ensembl" for rsid in chunk}
+
+    # O Ensembl indexa pelo ID enviado; a busca por 'name' cobre sinônimos
+    by_name = {str(v.get("name", "")).lower(): v for v in payload.values() if isinstance(v, dict)}
+    for rsid in chunk:
+        data = payload.get(rsid) or by_name.get(rsid)
+        if data:
+            raw[rsid] = data
+        else:
+            errors[rsid] = NOT_FOUND
+    return raw, errors
+
+
+def pending_overlaps(raw: dict) -> tuple:
+    """
+    Extrai os genes de cada payload do lote e separa as variantes que dependem de Overlap.
+    Retorna (genes por rsID, mapeamentos pendentes por rsID).
+    """
+    genes, pending = {}, {}
+    for rsid, data in raw.items():
+        genes[rsid] = collect_genes(data)
+        if needs_overlap(data, genes[rsid]):
+            pending[rsid] = data.get("mappings", [{}])[0]
+    return genes, pending
+
+
+def assign_window_genes(genes: dict, pending: dict, members: list, features: list):
+    """Distribui os genes de uma janela de Overlap entre as variantes que ela cobre."""
+    for rsid in members:
+        add_overlap_genes(genes[rsid], features, int(pending[rsid].get("start")), int(pending[rsid].get("end")))
+
+
+def reject_members(raw: dict, errors: dict, members: list, error: Exception):
+    """
+    Variantes cujo Overlap foi rejeitado pelo circuito aberto saem do lote como erro,
+    em vez de irem para o cache sem os genes vizinhos.
+    """
+    for rsid in members:
+        raw.pop(rsid, None)
+        errors[rsid] = str(error)
+
+
 class EnsemblClient:
     """
     Interface técnica para consumo da API REST do Ensembl.
-    Gerencia a integração de dados genômicos, frequências populacionais 
+    Gerencia a integração de dados genômicos, frequências populacionais
     e lógica de redundância para localização de genes.
     """
 
     def __init__(self):
         # Centralização da URL base via Config para facilitar manutenção
         self.base_url = Config.ENSEMBL_BASE_URL
+        # Cache de dois níveis (memória + disco compartilhado entre workers)
+        self.cache = VariantCache() if Config.CACHE_ENABLED else None
+        # Controle de cota compartilhado entre workers (headers X-RateLimit/Retry-After)
+        self.limiter = RateLimiter(
+            os.path.join(Config.CACHE_DIR, "ratelimit.sqlite3"),
+            Config.RATE_LIMIT_PER_SECOND,
+            Config.RATE_LIMIT_BURST
+        ) if Config.RATE_LIMIT_ENABLED else None
+        # Índice local de genes: resolve o Overlap em processo quando configurado
+        self.gene_index = load_configured_index(Config.GENE_INDEX_PATH)
+        # Armazenamento offline (mmap): consultado antes da API REST
+        self.store = open_configured_store(Config.VARIANT_STORE_DIR)
+        # Coalescência: uma resolução upstream por rsID; entre workers, o resultado
+        # é compartilhado pelo cache em disco (sem cache, a coordenação é só local)
+        self.flights = SingleFlight(
+            FlightLock(os.path.join(Config.CACHE_DIR, "flights.sqlite3"), Config.SINGLEFLIGHT_LEASE) if self.cache else None,
+            Config.SINGLEFLIGHT_POLL_INTERVAL
+        ) if Config.SINGLEFLIGHT_ENABLED else None
+        # Refresh-ahead: entradas antigas são servidas enquanto são atualizadas em segundo plano
+        self.refresher = RefreshAhead(Config.CACHE_REFRESH_WORKERS) if self.cache and Config.CACHE_REFRESH_AHEAD > 0 else None
+        # Blocos da consulta por região: janelas sobrepostas reaproveitam os blocos já buscados
+        self.region_tiles = RegionTileCache() if Config.CACHE_ENABLED else None
+        # rsIDs inexistentes (400/404 do Ensembl) lembrados por um TTL curto
+        self.negative = NegativeCache() if Config.CACHE_ENABLED and Config.NEGATIVE_CACHE_TTL > 0 else None
+        # Circuit breaker: com o Ensembl degradado, as chamadas falham de imediato (CircuitOpen)
+        self.breaker = build_breaker()
 
-    def get_variant_data(self, rsid: str) -> VariantData:
+    def cached_variant(self, rsid: str):
         """
-        Consolida informações completas de uma variante com lógica de retentativa.
-        Cruza dados de variação, fenótipos e coordenadas físicas (Overlap).
+        Consulta o cache com refresh-ahead: entradas com idade acima de
+        CACHE_REFRESH_AHEAD * CACHE_DISK_TTL (ou já obsoletas, dentro de CACHE_STALE_GRACE)
+        são retornadas de imediato e atualizadas em segundo plano.
+        """
+        if not self.cache:
+            return None
+        with stage("cache_lookup"):
+            item = self.cache.lookup(rsid, stale=self.refresher is not None)
+        if item is None:
+            return None
+
+        entry, stored_at = item
+        if self.refresher and time.time() - stored_at >= Config.CACHE_DISK_TTL * Config.CACHE_REFRESH_AHEAD:
+            self.refresher.schedule(rsid, lambda: self._refresh_variant(rsid))
+        return entry.variant
+
+    def _refresh_variant(self, rsid: str) -> VariantData:
+        """Atualização em segundo plano, coordenada com as demais consultas ao mesmo rsID."""
+        if self.flights:
+            # Se outro worker já atualiza o rsID, a entrada vigente (ou a nova) encerra a espera
+            return self.flights.run(rsid, lambda: self._resolve_variant(rsid), lambda: self.shared_variant(rsid))
+        return self._resolve_variant(rsid)
+
+    def peek_cache(self, rsid: str):
+        """Consulta o cache sem alterar os contadores (espera por outro worker)."""
+        return self.cache.get(rsid, record=False) if self.cache else None
+
+    def shared_variant(self, rsid: str):
+        """
+        Lookup da coalescência entre workers: a variante gravada pelo líder ou, se ele
+        a registrou no cache negativo, ABSENT (o seguidor não repete a consulta).
         """
-        logger.info(f"Iniciando integração de dados para: {rsid}")
-        
-        # Preparação do endpoint e headers (Padrão exigido pelo Ensembl)
-        endpoint = Config.ENDPOINTS["variation"].format(rsid=rsid)
-        url = f"{self.base_url}{endpoint}"
-        
-        # Headers idênticos ao exemplo oficial para máxima compatibilidade
-        headers = { "Content-Type" : "application/json" }
-        
-        data = None
-        max_retries = 3
-        
-        # --- Lógica de Resiliência (Retry) ---
+        variant = self.peek_cache(rsid)
+        if variant is None and self.negative and self.negative.contains(rsid):
+            return ABSENT
+        return variant
+
+    def from_store(self, rsid: str):
+        """Payload de /variation/human no armazenamento offline, ou None (ausente/desativado)."""
+        if not self.store:
+            return None
+        try:
+            return self.store.get(rsid)
+        except Exception as e:
+            logger.warning("Falha na leitura do armazenamento offline para %s: %s", rsid, e)
+            return None
+
+    def split_store_hits(self, rsids: list) -> tuple:
+        """Separa os rsIDs presentes no armazenamento offline. Retorna (payloads, faltantes)."""
+        raw, missing = {}, []
+        for rsid in rsids:
+            data = self.from_store(rsid)
+            if data:
+                raw[rsid] = data
+            else:
+                missing.append(rsid)
+        return raw, missing
+
+    # --- Execução dos planos (cliente síncrono) ---
+
+    def _send(self, method: str, url: str, **kwargs):
+        """Primitivo de I/O: uma requisição HTTP pela Session do worker."""
+        return get_session().request(method, url, headers=HEADERS, timeout=TIMEOUTS, **kwargs)
+
+    def _perform(self, effect):
+        if isinstance(effect, Http):
+            return self._send(effect.method, effect.url, **effect.kwargs)
+        if isinstance(effect, Sleep):
+            return time.sleep(effect.seconds)
+        if isinstance(effect, Call):
+            return effect.fn(*effect.args)
+        if isinstance(effect, Gather):
+            # Sem event loop, os planos independentes rodam em sequência
+            results = []
+            for plan in effect.plans:
+                try:
+                    results.append(self.drive(plan))
+                except Exception as e:
+                    results.append(e)
+            return results
+        if isinstance(effect, Flight):
+            return self.flights.run(effect.key, lambda: self.drive(effect.plan()), effect.lookup)
+        raise TypeError(f"Efeito desconhecido: {effect!r}")
+
+    def drive(self, plan):
+        return drive(plan, self._perform)
+
+    # --- Planos: política compartilhada pelos clientes síncrono e assíncrono ---
+
+    def _send_plan(self, method: str, url: str, **kwargs):
+        """
+        Envia uma única requisição respeitando o circuit breaker e o rate limiter compartilhado.
+        Registra o tempo upstream e repassa o resultado ao breaker e os headers de cota ao limiter.
+        """
+        # O breaker vem antes do limiter: com o circuito aberto não há espera por cota
+        if self.breaker:
+            self.breaker.allow()
+        if self.limiter:
+            wait = yield Call(self.limiter.next_slot)
+            if wait is None:
+                if self.breaker:
+                    self.breaker.release()
+                raise RateLimitExceeded("Cota do Ensembl esgotada; tente novamente mais tarde")
+            if wait > 0:
+                yield Sleep(wait)
+
+        started = time.monotonic()
+        response = error = None
+        try:
+            with UPSTREAM_IN_FLIGHT.track():
+                response = yield Http(method, url, kwargs)
+        except Exception as e:
+            error = e
+
+        elapsed = time.monotonic() - started
+        record_upstream(method, url, response, elapsed, error)
+        if self.breaker:
+            self.breaker.record(upstream_failed(response, error), elapsed)
+        if self.limiter:
+            yield Call(self.limiter.observe, (response, elapsed))
+        if error is not None:
+            raise error
+        return response
+
+    def _request_plan(self, method: str, url: str, label: str, **kwargs):
+        """
+        Executa uma requisição HTTP com a lógica de resiliência (Retry).
+        Timeouts, falhas de conexão e respostas 429 são retentados com backoff.
+        Retorna o objeto Response ou None em caso de falha persistente; com o
+        circuito aberto, CircuitOpen é propagado sem novas tentativas.
+        """
+        max_retries = Config.MAX_RETRIES
+
         for attempt in range(max_retries):
             try:
-                response = requests.get(url, headers=headers, timeout=Config.TIMEOUT)
-                
-                if response.status_code == 404:
-                    logger.warning(f"Variante {rsid} não encontrada no Ensembl.")
-                    return None
-                
-                response.raise_for_status()
-                data = response.json()
-                break # Sucesso! Sai do loop de tentativas
-                
+                response = yield from self._send_plan(method, url, **kwargs)
+                if response.status_code == 429 and attempt < max_retries - 1:
+                    # A espera indicada pelo Retry-After é aplicada pelo limiter na próxima tentativa
+                    logger.warning("Limite de requisições do Ensembl atingido para %s (tentativa %s).", label, attempt + 1)
+                    UPSTREAM_RETRIES.inc("429")
+                    if not self.limiter:
+                        yield Sleep(backoff_delay(attempt))
+                    continue
+                return response
+
             except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
                 if attempt < max_retries - 1:
-                    wait_time = (attempt + 1) * 2
-                    logger.warning(f"Tentativa {attempt + 1} falhou para {rsid}. Tentando novamente em {wait_time}s...")
-                    time.sleep(wait_time)
+                    if self.breaker:
+                        # Se esta falha abriu o circuito, não há por que esperar o backoff
+                        self.breaker.check()
+                    wait_time = backoff_delay(attempt)
+                    logger.warning("Tentativa %s falhou para %s. Tentando novamente em %.1fs...", attempt + 1, label, wait_time)
+                    UPSTREAM_RETRIES.inc("timeout" if isinstance(e, requests.exceptions.Timeout) else "connection")
+                    yield Sleep(wait_time)
                     continue
                 else:
-                    logger.error(f"Erro de conexão persistente após {max_retries} tentativas para {rsid}: {e}")
+                    logger.error("Erro de conexão persistente após %s tentativas para %s: %s", max_retries, label, e)
                     return None
+            except RateLimitExceeded as e:
+                logger.error("Requisição de %s descartada: %s", label, e)
+                return None
+            except CircuitOpen as e:
+                logger.warning("Requisição de %s rejeitada: %s", label, e)
+                raise
             except Exception as e:
-                logger.error(f"Erro inesperado na requisição de {rsid}: {e}")
+                logger.error("Erro inesperado na requisição de %s: %s", label, e)
                 return None
 
+        return None
+
+    def _overlap_plan(self, chrom: str, start: int, end: int, label: str):
+        """
+        Consulta /overlap/region para a janela informada (ou o índice local, se houver).
+        Retorna a lista de features (genes) ou lista vazia em caso de falha.
+        """
+        with stage("overlap"):
+            if self.gene_index:
+                return self.gene_index.overlap_features(chrom, start, end)
+
+            region = f"{chrom}:{start}-{end}"
+            overlap_endpoint = Config.ENDPOINTS["overlap"].format(region=region)
+            overlap_url = f"{self.base_url}{overlap_endpoint}"
+
+            try:
+                overlap_res = yield from self._send_plan("GET", overlap_url)
+                if overlap_res.ok:
+                    return overlap_res.json()
+            except CircuitOpen:
+                raise
+            except Exception as e:
+                logger.warning("Falha na consulta de redundância (Overlap) para %s: %s", label, e)
+            return []
+
+    def _variant_plan(self, rsid: str):
+        logger.info("Iniciando integração de dados para: %s", rsid)
+
+        if self.cache:
+            cached = yield Call(self.cached_variant, (rsid,))
+            if cached is not None:
+                return cached
+        if self.negative and (yield Call(self.negative.contains, (rsid,))):
+            return None
+
+        if self.flights:
+            return (yield Flight(rsid, lambda: self._resolve_plan(rsid), lambda: self.shared_variant(rsid)))
+        return (yield from self._resolve_plan(rsid))
+
+    def _resolve_plan(self, rsid: str):
+        """Busca a variante e grava o resultado no cache compartilhado."""
+        variant = yield from self._fetch_variant_plan(rsid)
+        if variant is not None and self.cache:
+            yield Call(self.cache.set, (rsid, variant))
+        return variant
+
+    def _fetch_variant_plan(self, rsid: str):
+        """Busca e processa a variante (armazenamento offline primeiro, depois API do Ensembl)."""
+        data = self.from_store(rsid)
+        if not data:
+            # Preparação do endpoint (Padrão exigido pelo Ensembl)
+            endpoint = Config.ENDPOINTS["variation"].format(rsid=rsid)
+            url = f"{self.base_url}{endpoint}"
+            with stage("upstream_fetch"):
+                response = yield from self._request_plan("GET", url, rsid)
+                data = decode_variation(response, rsid)
+            if self.negative and is_not_found(response):
+                yield Call(self.negative.add, (rsid,))
         if not data:
             return None
 
         try:
-            # --- 1. Processamento de Frequências Populacionais ---
-            pops = data.get("populations", [])
-            pop_groups = {}
-            for p in pops:
-                name = p['population']
-                if name not in pop_groups:
-                    pop_groups[name] = []
-                pop_groups[name].append(p)
-
-            all_pop_data = []
-            highest_maf_val = -1.0
-            highest_allele = ""
-            h_lats, h_lons = [], []
-            h_names_clean, h_labels, h_is_region = [], [], []
-            maf_1000g_str = "N/A"
-
-            for name, entries in pop_groups.items():
-                if len(entries) >= 2:
-                    sorted_alleles = sorted(entries, key=lambda x: float(x.get('frequency', 0)), reverse=True)
-                    minor_data = sorted_alleles[1]
-                    current_maf = float(minor_data.get('frequency', 0))
-                    current_allele = minor_data.get('allele', '')
-                    
-                    geo = get_coords(name)
-                    clean_name = name.split(':')[-1]
-
-                    if name == "1000GENOMES:phase_3:ALL":
-                        maf_1000g_str = f"{current_allele}: {current_maf:.2f}"
-
-                    all_pop_data.append(
-                        PopulationFrequency(
-                            population=name,
-                            allele=current_allele,
-                            frequency=round(current_maf, 4),
-                            lat=geo['lat'],
-                            lon=geo['lon'],
-                            label=geo.get('label', name),
-                            is_region=geo.get('is_region', False)
-                        )
-                    )
-
-                    if current_maf > highest_maf_val:
-                        highest_maf_val, highest_allele = current_maf, current_allele
-                        h_names_clean = [clean_name]
-                        h_lats, h_lons = [geo['lat']], [geo['lon']]
-                        h_labels, h_is_region = [geo['label']], [geo['is_region']]
-                    elif current_maf == highest_maf_val and highest_maf_val >= 0:
-                        h_names_clean.append(clean_name)
-                        h_lats.append(geo['lat'])
-                        h_lons.append(geo['lon'])
-                        h_labels.append(geo['label'])
-                        h_is_region.append(geo['is_region'])
-
-            # --- 2. Consolidação de Genes ---
-            mapping = data.get("mappings", [{}])[0]
-            gene_set = set()
-
-            for p in data.get("phenotypes", []):
-                if p.get("genes"):
-                    for g in p.get("genes").split(","):
-                        gene_set.add(g.strip())
-
-            for tv in data.get("transcript_variations", []):
-                gene_name = tv.get("gene_symbol")
-                if gene_name:
-                    gene_set.add(gene_name)
+            gene_set = collect_genes(data)
 
             # Lógica de Emergência (Overlap)
-            if not gene_set and mapping.get("seq_region_name"):
-                chrom = mapping.get("seq_region_name")
-                start, end = mapping.get("start"), mapping.get("end")
-                region = f"{chrom}:{start}-{end}"
-                
-                overlap_endpoint = Config.ENDPOINTS["overlap"].format(region=region)
-                overlap_url = f"{self.base_url}{overlap_endpoint}"
-                
-                try:
-                    overlap_res = requests.get(overlap_url, headers=headers, timeout=Config.TIMEOUT)
-                    if overlap_res.ok:
-                        overlap_data = overlap_res.json()
-                        for feature in overlap_data:
-                            gene_symbol = feature.get("external_name")
-                            if gene_symbol:
-                                gene_set.add(f"{gene_symbol} (overlap)")
-                except Exception as e:
-                    logger.warning(f"Falha na consulta de redundância (Overlap) para {rsid}: {e}")
-
-            formatted_highest = "N/A"
-            if h_names_clean:
-                sources_str = ", ".join(h_names_clean)
-                formatted_highest = f"{highest_allele}: {highest_maf_val:.2f} ({sources_str})"
-
-            return VariantData(
-                rsid=data.get("name", rsid),
-                chromosome=str(mapping.get("seq_region_name", "N/A")),
-                position=int(mapping.get("start", 0)),
-                alleles=mapping.get("allele_string", "N/A"),
-                minor_allele_freq=formatted_highest, 
-                maf_1000g=maf_1000g_str,             
-                pop_frequencies=all_pop_data,
-                genes=sorted(list(gene_set)),
-                consequence=data.get("most_severe_consequence", "N/A").replace("_", " "),
-                highest_maf_lat=h_lats,
-                highest_maf_lon=h_lons,
-                highest_maf_labels=h_labels,
-                highest_maf_is_region=h_is_region
-            )
+            if needs_overlap(data, gene_set):
+                mapping = data.get("mappings", [{}])[0]
+                add_overlap_genes(gene_set, (yield from self._overlap_plan(mapping.get("seq_region_name"), mapping.get("start"), mapping.get("end"), rsid)))
+
+            with stage("parse"):
+                return parse_variant(data, rsid, gene_set)
 
         except Exception as e:
-            logger.error(f"Erro crítico no processamento de {rsid}: {str(e)}")
-            return None
\ No newline at end of file
+            logger.error("Erro crítico no processamento de %s: %s", rsid, e)
+            return None
+
+    def _batch_plan(self, rsids: list):
+        results, errors = {}, {}
+
+        # --- 0. Acertos de cache (positivos e negativos) não geram chamadas externas ---
+        if self.cache:
+            missing = []
+            for rsid in rsids:
+                cached = yield Call(self.cached_variant, (rsid,))
+                if cached is not None:
+                    results[rsid] = cached
+                elif self.negative and (yield Call(self.negative.contains, (rsid,))):
+                    errors[rsid] = NOT_FOUND
+                else:
+                    missing.append(rsid)
+            rsids = missing
+
+        # --- 1. Armazenamento offline e, para o restante, busca em blocos ---
+        raw, rsids = self.split_store_hits(rsids)
+        url = f"{self.base_url}{Config.ENDPOINTS['variation_batch']}"
+        chunks = [rsids[i:i + Config.BATCH_SIZE] for i in range(0, len(rsids), Config.BATCH_SIZE)]
+        for chunk in chunks:
+            logger.info("Iniciando integração em lote para %s variantes", len(chunk))
+        with stage("upstream_fetch"):
+            responses = yield Gather([
+                self._request_plan("POST", url, f"lote de {len(chunk)} IDs", json={"ids": chunk}) for chunk in chunks
+            ])
+
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, CircuitOpen):
+                errors.update({rsid: str(response) for rsid in chunk})
+                continue
+            if isinstance(response, BaseException):
+                raise response
+            chunk_raw, chunk_errors = decode_batch(response, chunk)
+            raw.update(chunk_raw)
+            errors.update(chunk_errors)
+            yield Call(self.remember_not_found, (chunk_errors,))
+
+        # --- 2. Genes e Overlap agrupado por janela ---
+        genes, pending = pending_overlaps(raw)
+        windows = group_overlap_regions(pending, Config.OVERLAP_MAX_SPAN)
+        features = yield Gather([
+            self._overlap_plan(chrom, start, end, f"{len(members)} variantes") for chrom, start, end, members in windows
+        ])
+        for (_, _, _, members), window_features in zip(windows, features):
+            if isinstance(window_features, CircuitOpen):
+                reject_members(raw, errors, members, window_features)
+                continue
+            if isinstance(window_features, BaseException):
+                raise window_features
+            assign_window_genes(genes, pending, members, window_features)
+
+        # --- 3. Parsing individual ---
+        for rsid, data in raw.items():
+            try:
+                with stage("parse"):
+                    results[rsid] = parse_variant(data, rsid, genes[rsid])
+                if self.cache:
+                    yield Call(self.cache.set, (rsid, results[rsid]))
+            except Exception as e:
+                logger.error("Erro crítico no processamento de %s: %s", rsid, e)
+                errors[rsid] = "Erro no processamento dos dados da variante"
+
+        return results, errors
+
+    # --- API síncrona ---
+
+    def get_variant_data(self, rsid: str) -> VariantData:
+        """
+        Consolida informações completas de uma variante com lógica de retentativa.
+        Cruza dados de variação, fenótipos e coordenadas físicas (Overlap).
+        Resultados são servidos do cache quando disponíveis e consultas concorrentes
+        ao mesmo rsID compartilham uma única resolução upstream. rsIDs inexistentes
+        no cache negativo retornam None sem consulta; com o circuito aberto, lança CircuitOpen.
+        """
+        return self.drive(self._variant_plan(rsid))
+
+    def _resolve_variant(self, rsid: str) -> VariantData:
+        return self.drive(self._resolve_plan(rsid))
+
+    def get_variants_data(self, rsids: list) -> tuple:
+        """
+        Consulta em lote via POST /variation/human (até Config.BATCH_SIZE IDs por chamada).
+        Os fallbacks de Overlap são agrupados por janela genômica.
+        Retorna (resultados, erros): dicionários indexados pelo rsID solicitado.
+        Com o circuito aberto, os IDs ainda não resolvidos voltam como erro.
+        """
+        return self.drive(self._batch_plan(rsids))
+
+    def remember_not_found(self, errors: dict):
+        """Grava no cache negativo os IDs ausentes de uma resposta de lote bem-sucedida."""
+        if self.negative:
+            for rsid, message in errors.items():
+                if message == NOT_FOUND:
+                    self.negative.add(rsid)
+
+    def fetch_region_tile(self, chrom: str, index: int) -> list:
+        """
+        Busca no Ensembl (/overlap/region, feature=variation) as variantes do bloco `index`.
+        Lança ValueError para regiões rejeitadas pelo Ensembl e RegionFetchError para falhas upstream.
+        """
+        tile_start, tile_end = tile_bounds(index, Config.REGION_TILE_SIZE)
+        region = f"{chrom}:{tile_start}-{tile_end}"
+        url = f"{self.base_url}{Config.ENDPOINTS['overlap_variation'].format(region=region)}"
+
+        with stage("upstream_fetch"):
+            response = self.drive(self._request_plan("GET", url, f"região {region}"))
+        if response is not None and response.status_code == 400:
+            raise ValueError(f"Região não reconhecida pelo Ensembl: {chrom}:{tile_start}-{tile_end}")
+        if response is None or not response.ok:
+            raise RegionFetchError(f"Falha na consulta da região {region} ao Ensembl")
+        try:
+            features = response.json()
+        except ValueError:
+            raise RegionFetchError(f"Resposta inválida do Ensembl para a região {region}")
+
+        with stage("parse"):
+            return build_tile(features or [], chrom, index, Config.REGION_TILE_SIZE)
+
+    def region_tile(self, chrom: str, index: int) -> list:
+        """Bloco do cache ou, se ausente, buscado uma única vez entre as consultas concorrentes."""
+        if self.region_tiles:
+            tile = self.region_tiles.get(chrom, index)
+            if tile is not None:
+                return tile
+
+        if self.flights:
+            lookup = (lambda: self.region_tiles.get(chrom, index, record=False)) if self.region_tiles else (lambda: None)
+            return self.flights.run(f"region:{chrom}:{index}", lambda: self._resolve_region_tile(chrom, index), lookup)
+        return self._resolve_region_tile(chrom, index)
+
+    def _resolve_region_tile(self, chrom: str, index: int) -> list:
+        tile = self.fetch_region_tile(chrom, index)
+        if self.region_tiles:
+            self.region_tiles.set(chrom, index, tile)
+        return tile
+
+    def get_region_variants(self, chrom: str, start: int, end: int, cursor: str = None, limit: int = None) -> dict:
+        """
+        Variantes com início em [start, end], ordenadas por (posição, id), em páginas de `limit`.
+        Os blocos são percorridos em ordem e buscados em paralelo (Config.REGION_FETCH_CONCURRENCY)
+        apenas até completar a página; `next_cursor` retoma a consulta do ponto seguinte.
+        """
+        limit = limit or Config.REGION_PAGE_SIZE
+        after = parse_cursor(cursor) if cursor else None
+        first = max(start, after[0]) if after else start
+        logger.info("Consulta por região %s:%s-%s", chrom, start, end)
+
+        indexes = list(tile_range(first, end, Config.REGION_TILE_SIZE)) if first <= end else []
+        concurrency = max(1, Config.REGION_FETCH_CONCURRENCY)
+        variants = []
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(indexes) or 1), thread_name_prefix="ensembl-region") as pool:
+            for i in range(0, len(indexes), concurrency):
+                batch = indexes[i:i + concurrency]
+                for tile in pool.map(lambda index: self.region_tile(chrom, index), batch):
+                    for variant in tile:
+                        if start <= variant["start"] <= end and (after is None or (variant["start"], variant["id"]) > after):
+                            variants.append(variant)
+                # Um item além do limite indica que há próxima página
+                if len(variants) > limit:
+                    break
+
+        page = variants[:limit]
+        return {
+            "chromosome": chrom,
+            "start": start,
+            "end": end,
+            "count": len(page),
+            "next_cursor": make_cursor(page[-1]) if len(variants) > limit else None,
+            "variants": page,
+        }
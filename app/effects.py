@@ -0,0 +1,75 @@
+"""
+Efeitos das consultas ao Ensembl (planos sem I/O).
+
+A política das consultas (retries, circuit breaker, rate limiter, cache, cache
+negativo, coalescência e Overlap) é escrita uma única vez, como geradores em
+EnsemblClient (os "planos"). Um plano não executa I/O: ele produz (yield) os
+efeitos abaixo e recebe o resultado de cada um. Cada cliente só implementa a
+execução dos efeitos. O síncrono chama direto e dorme com time.sleep. O
+assíncrono usa asyncio.sleep, threads para o trabalho bloqueante e gather para
+os efeitos em paralelo.
+"""
+from typing import Callable, NamedTuple
+
+
+class Http(NamedTuple):
+    """Uma chamada HTTP ao Ensembl (o primitivo de I/O de cada cliente)."""
+    method: str
+    url: str
+    kwargs: dict
+
+
+class Sleep(NamedTuple):
+    """Espera (backoff ou cota do rate limiter)."""
+    seconds: float
+
+
+class Call(NamedTuple):
+    """Trabalho bloqueante (SQLite, cache em disco); no cliente assíncrono roda em uma thread."""
+    fn: Callable
+    args: tuple = ()
+
+
+class Gather(NamedTuple):
+    """
+    Planos independentes (ex.: blocos do lote, janelas de Overlap). O resultado é a
+    lista de retornos ou das exceções de cada plano, na ordem recebida.
+    """
+    plans: list
+
+
+class Flight(NamedTuple):
+    """Plano coalescido por chave (SingleFlight); `plan` cria o gerador quando este worker lidera."""
+    key: str
+    plan: Callable
+    lookup: Callable
+
+
+def drive(plan, perform):
+    """Executa um plano de forma síncrona; `perform(efeito)` retorna o resultado de cada efeito."""
+    value = error = None
+    while True:
+        try:
+            effect = plan.throw(error) if error is not None else plan.send(value)
+        except StopIteration as stop:
+            return stop.value
+        value = error = None
+        try:
+            value = perform(effect)
+        except BaseException as e:
+            error = e
+
+
+async def drive_async(plan, perform):
+    """Equivalente assíncrono de `drive` (`perform` é uma corrotina)."""
+    value = error = None
+    while True:
+        try:
+            effect = plan.throw(error) if error is not None else plan.send(value)
+        except StopIteration as stop:
+            return stop.value
+        value = error = None
+        try:
+            value = await perform(effect)
+        except BaseException as e:
+            error = e
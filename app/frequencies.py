@@ -0,0 +1,137 @@
+"""
+Motor colunar de frequências populacionais.
+
+Carrega o array `populations` do Ensembl em colunas (nomes, alelos e frequências
+em array('d')) e calcula, em passagens lineares, o alelo menor de cada população,
+o MAF global do 1000 Genomes e os empates de maior MAF (também como índices em
+pop_frequencies, usados pelo formato compacto).
+"""
+from array import array
+from typing import List, NamedTuple
+from .coordinates import get_coords
+from .models import PopulationFrequency
+
+# População de referência para o MAF global
+GLOBAL_1000G = "1000GENOMES:phase_3:ALL"
+
+
+class FrequencySummary(NamedTuple):
+    pop_frequencies: List[PopulationFrequency]
+    minor_allele_freq: str
+    maf_1000g: str
+    highest_maf_lat: List[float]
+    highest_maf_lon: List[float]
+    highest_maf_labels: List[str]
+    highest_maf_is_region: List[bool]
+    highest_maf_rows: List[int]
+
+
+class PopulationTable:
+    """
+    Representação colunar do array `populations`.
+    Cada linha pertence a um grupo (população), na ordem da primeira ocorrência.
+    """
+
+    __slots__ = ("alleles", "freqs", "group_of", "group_names")
+
+    def __init__(self, pops: list):
+        self.alleles = []
+        self.freqs = array("d")
+        self.group_of = array("l")
+        self.group_names = []
+        group_ids = {}
+
+        for p in pops:
+            name = p['population']
+            gid = group_ids.get(name)
+            if gid is None:
+                gid = group_ids[name] = len(self.group_names)
+                self.group_names.append(name)
+            self.group_of.append(gid)
+            self.alleles.append(p.get('allele', ''))
+            self.freqs.append(float(p.get('frequency', 0)))
+
+    def minor_rows(self) -> array:
+        """
+        Índice da linha do alelo menor (segundo mais frequente) de cada grupo, ou -1.
+        Equivale a ordenar o grupo por frequência decrescente (ordenação estável)
+        e tomar o segundo elemento: em empates, prevalece a ordem original.
+        """
+        n_groups = len(self.group_names)
+        first = array("l", [-1]) * n_groups
+        second = array("l", [-1]) * n_groups
+        freqs = self.freqs
+
+        for row, gid in enumerate(self.group_of):
+            top = first[gid]
+            if top < 0:
+                first[gid] = row
+            elif freqs[row] > freqs[top]:
+                second[gid] = top
+                first[gid] = row
+            elif second[gid] < 0 or freqs[row] > freqs[second[gid]]:
+                second[gid] = row
+        return second
+
+
+def compute_frequencies(pops: list) -> FrequencySummary:
+    """Processa o array `populations` e retorna as métricas prontas para o VariantData."""
+    table = PopulationTable(pops)
+    minor = table.minor_rows()
+    freqs, alleles = table.freqs, table.alleles
+
+    all_pop_data = []
+    highest_maf_val = -1.0
+    highest_allele = ""
+    h_rows = []
+    maf_1000g_str = "N/A"
+
+    # --- Passagem 1: MAF por população e maior MAF (com empates) ---
+    for gid, row in enumerate(minor):
+        if row < 0:
+            continue
+        current_maf = freqs[row]
+        if current_maf > highest_maf_val:
+            highest_maf_val, highest_allele = current_maf, alleles[row]
+            h_rows = [gid]
+        elif current_maf == highest_maf_val and highest_maf_val >= 0:
+            h_rows.append(gid)
+
+    # --- Passagem 2: materialização (dados internos confiáveis, sem revalidação) ---
+    geos, positions = {}, {}
+    for gid, row in enumerate(minor):
+        if row < 0:
+            continue
+        name = table.group_names[gid]
+        geo = geos[gid] = get_coords(name)
+        positions[gid] = len(all_pop_data)
+        if name == GLOBAL_1000G:
+            maf_1000g_str = f"{alleles[row]}: {freqs[row]:.2f}"
+
+        all_pop_data.append(
+            PopulationFrequency.model_construct(
+                population=name,
+                allele=alleles[row],
+                frequency=round(freqs[row], 4),
+                lat=geo['lat'],
+                lon=geo['lon'],
+                label=geo.get('label', name),
+                is_region=geo.get('is_region', False)
+            )
+        )
+
+    formatted_highest = "N/A"
+    if h_rows:
+        sources_str = ", ".join(table.group_names[gid].split(':')[-1] for gid in h_rows)
+        formatted_highest = f"{highest_allele}: {highest_maf_val:.2f} ({sources_str})"
+
+    return FrequencySummary(
+        pop_frequencies=all_pop_data,
+        minor_allele_freq=formatted_highest,
+        maf_1000g=maf_1000g_str,
+        highest_maf_lat=[geos[gid]['lat'] for gid in h_rows],
+        highest_maf_lon=[geos[gid]['lon'] for gid in h_rows],
+        highest_maf_labels=[geos[gid]['label'] for gid in h_rows],
+        highest_maf_is_region=[geos[gid]['is_region'] for gid in h_rows],
+        highest_maf_rows=[positions[gid] for gid in h_rows]
+    )
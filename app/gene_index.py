@@ -0,0 +1,224 @@
+"""
+Índice local de genes para a Lógica de Emergência (Overlap).
+
+Carrega anotações GTF, GFF3 ou BED em arrays ordenados por cromossomo e responde
+consultas de sobreposição em processo, sem a chamada a /overlap/region do Ensembl.
+
+Uso (pré-compilação para carga rápida no start dos workers):
+    python -m app.gene_index build Homo_sapiens.GRCh38.gtf.gz genes.gix
+"""
+import argparse
+import gzip
+import json
+import logging
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from urllib.parse import unquote
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"DASAGIX1"
+
+
+def _open_text(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def normalize_chrom(chrom: str) -> str:
+    """Padroniza o cromossomo no formato do Ensembl ('chr1' -> '1', 'chrM' -> 'MT')."""
+    chrom = chrom[3:] if chrom.lower().startswith("chr") else chrom
+    return "MT" if chrom == "M" else chrom
+
+
+def _gtf_attributes(field: str) -> dict:
+    attrs = {}
+    for part in field.strip().split(";"):
+        part = part.strip()
+        if " " in part:
+            key, value = part.split(" ", 1)
+            attrs[key] = value.strip('"')
+    return attrs
+
+
+def _gff3_attributes(field: str) -> dict:
+    attrs = {}
+    for part in field.strip().split(";"):
+        if "=" in part:
+            key, value = part.split("=", 1)
+            attrs[key] = unquote(value)
+    return attrs
+
+
+def parse_annotation(path: str):
+    """
+    Lê genes de um arquivo GTF, GFF3 ou BED (opcionalmente .gz).
+    Gera tuplas (cromossomo, início, fim, símbolo) em coordenadas 1-based inclusivas.
+    """
+    lower = path.lower().removesuffix(".gz")
+    is_bed = lower.endswith(".bed")
+    is_gff3 = lower.endswith(".gff3") or lower.endswith(".gff")
+
+    with _open_text(path) as handle:
+        for line in handle:
+            if not line.strip() or line.startswith(("#", "track", "browser")):
+                continue
+            cols = line.rstrip("\n").split("\t")
+
+            if is_bed:
+                if len(cols) < 4:
+                    continue
+                # BED é 0-based semiaberto
+                yield normalize_chrom(cols[0]), int(cols[1]) + 1, int(cols[2]), cols[3]
+                continue
+
+            if len(cols) < 9 or cols[2] != "gene":
+                continue
+            attrs = _gff3_attributes(cols[8]) if is_gff3 else _gtf_attributes(cols[8])
+            name = attrs.get("gene_name") or attrs.get("Name")
+            if name:
+                yield normalize_chrom(cols[0]), int(cols[3]), int(cols[4]), name
+
+
+class GeneIndex:
+    """
+    Intervalos de genes em arrays ordenados por início, um conjunto por cromossomo.
+    A consulta usa busca binária e o maior comprimento de gene do cromossomo para
+    limitar a varredura aos candidatos que podem sobrepor a janela.
+    """
+
+    def __init__(self, names: list, chroms: dict):
+        # chroms: {cromossomo: (starts, ends, name_ids, max_len)}
+        self.names = names
+        self.chroms = chroms
+
+    @classmethod
+    def from_records(cls, records) -> "GeneIndex":
+        names, name_ids = [], {}
+        per_chrom = {}
+        for chrom, start, end, name in records:
+            if name not in name_ids:
+                name_ids[name] = len(names)
+                names.append(name)
+            per_chrom.setdefault(chrom, []).append((start, end, name_ids[name]))
+
+        chroms = {}
+        for chrom, items in per_chrom.items():
+            items.sort()
+            starts = array("q", (i[0] for i in items))
+            ends = array("q", (i[1] for i in items))
+            ids = array("i", (i[2] for i in items))
+            max_len = max(e - s for s, e, _ in items)
+            chroms[chrom] = (starts, ends, ids, max_len)
+        return cls(names, chroms)
+
+    def query(self, chrom: str, start: int, end: int) -> list:
+        """Retorna (símbolo, início, fim) dos genes que sobrepõem [start, end]."""
+        entry = self.chroms.get(normalize_chrom(str(chrom)))
+        if entry is None:
+            return []
+        starts, ends, ids, max_len = entry
+        hits = []
+        i = bisect_right(starts, end) - 1
+        lower_bound = start - max_len
+        while i >= 0 and starts[i] >= lower_bound:
+            if ends[i] >= start:
+                hits.append((self.names[ids[i]], starts[i], ends[i]))
+            i -= 1
+        hits.reverse()
+        return hits
+
+    def overlap_features(self, chrom: str, start: int, end: int) -> list:
+        """Mesmo formato das features de /overlap/region?feature=gene."""
+        return [
+            {"external_name": name, "start": g_start, "end": g_end, "feature_type": "gene"}
+            for name, g_start, g_end in self.query(chrom, int(start), int(end))
+        ]
+
+    def __len__(self):
+        return sum(len(entry[0]) for entry in self.chroms.values())
+
+    # --- Formato binário ---
+    def save(self, path: str):
+        """
+        Serializa o índice: MAGIC + cabeçalho JSON (nomes e cromossomos) + arrays brutos.
+        """
+        header = {
+            "names": self.names,
+            "chroms": [[chrom, len(entry[0]), entry[3]] for chrom, entry in self.chroms.items()]
+        }
+        header_bytes = json.dumps(header).encode()
+        with open(path, "wb") as out:
+            out.write(MAGIC)
+            out.write(struct.pack("<I", len(header_bytes)))
+            out.write(header_bytes)
+            for starts, ends, ids, _ in self.chroms.values():
+                out.write(starts.tobytes())
+                out.write(ends.tobytes())
+                out.write(ids.tobytes())
+
+    @classmethod
+    def load(cls, path: str) -> "GeneIndex":
+        """Carrega um índice binário (.gix) ou, na falta dele, o arquivo de anotação."""
+        with open(path, "rb") as handle:
+            if handle.read(len(MAGIC)) != MAGIC:
+                return cls.from_records(parse_annotation(path))
+
+            (header_len,) = struct.unpack("<I", handle.read(4))
+            header = json.loads(handle.read(header_len))
+
+            chroms = {}
+            for chrom, count, max_len in header["chroms"]:
+                columns = []
+                for code in ("q", "q", "i"):
+                    column = array(code)
+                    column.frombytes(handle.read(count * column.itemsize))
+                    columns.append(column)
+                chroms[chrom] = (*columns, max_len)
+        return cls(header["names"], chroms)
+
+
+def load_configured_index(path: str):
+    """Carrega o índice configurado em Config.GENE_INDEX_PATH (ou None se ausente)."""
+    if not path:
+        return None
+    try:
+        index = GeneIndex.load(path)
+        logger.info("Índice local de genes carregado: %s genes de %s", len(index), path)
+        return index
+    except Exception as e:
+        logger.error("Falha ao carregar o índice de genes %s; usando Overlap remoto: %s", path, e)
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Índice local de genes (substitui o Overlap remoto)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Converte GTF/GFF3/BED no formato binário .gix")
+    build.add_argument("annotation", help="Arquivo de anotação (GTF, GFF3 ou BED, opcionalmente .gz)")
+    build.add_argument("output", help="Arquivo .gix de saída")
+
+    query = sub.add_parser("query", help="Consulta genes que sobrepõem uma região")
+    query.add_argument("index", help="Arquivo .gix ou de anotação")
+    query.add_argument("region", help="Região no formato CHR:INICIO-FIM")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        index = GeneIndex.from_records(parse_annotation(args.annotation))
+        index.save(args.output)
+        print(f"{len(index)} genes em {len(index.chroms)} cromossomos gravados em {args.output}")
+    else:
+        chrom, coords = args.region.split(":")
+        start, end = (int(v) for v in coords.replace(",", "").split("-"))
+        for name, g_start, g_end in GeneIndex.load(args.index).query(chrom, start, end):
+            print(f"{name}\t{chrom}:{g_start}-{g_end}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
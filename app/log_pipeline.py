@@ -0,0 +1,278 @@
+"""
+Pipeline de logs baseado em fila.
+
+As threads de requisição apenas enfileiram o LogRecord (sem formatar nem tocar
+em disco); uma thread ouvinte por processo faz a formatação e a escrita.
+
+Com o Gunicorn (gunicorn.conf.py), o processo master abre um LogServer em um
+socket Unix (LOG_SOCKET): os ouvintes dos workers encaminham os registros para
+ele, e apenas o master escreve e rotaciona o logs/app.log. Sem o socket (Flask
+em desenvolvimento, testes, scripts), o ouvinte do próprio processo escreve o
+arquivo.
+
+Config.LOG_FORMAT escolhe o formato do arquivo: 'text' (padrão) ou 'json'
+(um objeto por linha).
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from .config import Config
+
+TEXT_FORMAT = '[%(asctime)s] %(levelname)s - %(module)s: %(message)s'
+CONSOLE_FORMAT = '[%(levelname)s] %(message)s'
+
+# Atributos do LogRecord transmitidos do worker para o master
+RECORD_FIELDS = ("name", "levelno", "levelname", "module", "funcName", "lineno",
+                 "created", "msecs", "process", "threadName")
+
+# Pipeline ativo no processo: {"queue", "handler", "listener", "logger"}
+_state = {}
+_state_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """Um objeto JSON por linha (ex.: para coletores como Loki/Elasticsearch)."""
+
+    def format(self, record) -> str:
+        data = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "pid": record.process,
+            "message": record.getMessage(),
+        }
+        exc_text = record.exc_text or (self.formatException(record.exc_info) if record.exc_info else None)
+        if exc_text:
+            data["exc"] = exc_text
+        return json.dumps(data, ensure_ascii=False)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Enfileira o registro como está. O QueueHandler padrão formata a mensagem na
+    thread chamadora; aqui a interpolação dos argumentos fica com o ouvinte.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class SocketForwardHandler(logging.Handler):
+    """Encaminha registros ao LogServer do master (uma linha JSON por registro)."""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._sock = None
+        self._pid = None
+        self._exc_formatter = logging.Formatter()
+
+    def _connect(self):
+        if self._sock is None or self._pid != os.getpid():
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self.path)
+            self._sock, self._pid = sock, os.getpid()
+        return self._sock
+
+    def serialize(self, record) -> bytes:
+        data = {field: getattr(record, field, None) for field in RECORD_FIELDS}
+        data["msg"] = record.getMessage()
+        if record.exc_info:
+            data["exc_text"] = self._exc_formatter.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exc_text"] = record.exc_text
+        return (json.dumps(data, ensure_ascii=False) + "\n").encode("utf-8")
+
+    def emit(self, record):
+        try:
+            line = self.serialize(record)
+            try:
+                self._connect().sendall(line)
+            except OSError:
+                # Master reiniciado ou conexão herdada: uma nova tentativa
+                self._close_socket()
+                self._connect().sendall(line)
+        except Exception:
+            self._close_socket()
+            self.handleError(record)
+
+    def _close_socket(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+
+    def close(self):
+        self._close_socket()
+        super().close()
+
+
+def build_handlers(log_file: str, fmt: str = "text") -> list:
+    """Handlers de destino: arquivo rotativo (1MB, 5 backups) e console."""
+    os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+    # delay: o arquivo é aberto na primeira escrita, pela thread do ouvinte
+    file_handler = RotatingFileHandler(log_file, maxBytes=1024 * 1024, backupCount=5, encoding="utf-8", delay=True)
+    file_handler.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+    file_handler.setLevel(logging.INFO)
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+    return [file_handler, console_handler]
+
+
+class LogServer:
+    """
+    Recebe os registros dos workers pelo socket Unix e os grava com os handlers
+    locais: um único processo formata, escreve e rotaciona o arquivo.
+    """
+
+    def __init__(self, path: str, handlers: list):
+        self.path = path
+        self.handlers = handlers
+        self.received = 0
+        self._server = None
+        self._thread = None
+
+    def dispatch(self, data: dict):
+        record = logging.makeLogRecord({**data, "args": None})
+        self.received += 1
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        server.dispatch(json.loads(line))
+                    except ValueError:
+                        continue
+
+        return Handler
+
+    def start(self) -> "LogServer":
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = socketserver.ThreadingUnixStreamServer(self.path, self._handler_class())
+        self._server.daemon_threads = True
+        os.chmod(self.path, 0o600)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="log-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        for handler in self.handlers:
+            handler.flush()
+            handler.close()
+
+
+def _targets() -> list:
+    """Destino do ouvinte: o LogServer do master, se houver, ou os handlers locais."""
+    socket_path = os.environ.get("LOG_SOCKET", "")
+    if socket_path and os.path.exists(socket_path):
+        return [SocketForwardHandler(socket_path)]
+    return build_handlers(Config.LOG_FILE, Config.LOG_FORMAT)
+
+
+def configure_logging(logger: logging.Logger) -> logging.Handler:
+    """
+    Liga o `logger` ao pipeline: um DeferredQueueHandler no caminho das requisições
+    e um QueueListener que encaminha ao master (LOG_SOCKET) ou escreve localmente.
+    Chamadas repetidas no mesmo processo reutilizam o pipeline existente.
+    """
+    with _state_lock:
+        if _state.get("logger") is logger:
+            return _state["handler"]
+        stop_logging()
+
+        # O handler padrão do Flask escreveria no stderr na thread da requisição
+        from flask.logging import default_handler
+        logger.removeHandler(default_handler)
+
+        handlers = _targets()
+        log_queue = queue.SimpleQueue()
+        handler = DeferredQueueHandler(log_queue)
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        logger.addHandler(handler)
+        _state.update(queue=log_queue, handler=handler, listener=listener, logger=logger)
+        return handler
+
+
+def stop_logging():
+    """Esvazia a fila, encerra o ouvinte e remove o handler do logger."""
+    listener = _state.pop("listener", None)
+    handler = _state.pop("handler", None)
+    logger = _state.pop("logger", None)
+    _state.pop("queue", None)
+    if listener is not None:
+        listener.stop()
+        for target in listener.handlers:
+            try:
+                target.flush()
+                target.close()
+            except (OSError, ValueError):
+                # stderr já fechado no encerramento do interpretador
+                pass
+    if logger is not None and handler is not None:
+        logger.removeHandler(handler)
+
+
+def start_log_server(path: str, fmt: str = None) -> LogServer:
+    """Inicia o LogServer do master do Gunicorn (ver gunicorn.conf.py)."""
+    return LogServer(path, build_handlers(Config.LOG_FILE, fmt or Config.LOG_FORMAT)).start()
+
+
+def forward_to_server():
+    """
+    Passa o ouvinte a encaminhar ao LogServer quando o pipeline foi criado antes
+    dele (preload_app: a aplicação é carregada no master antes de on_starting).
+    """
+    listener = _state.get("listener")
+    if listener is None or isinstance(listener.handlers[0], SocketForwardHandler):
+        return
+    targets = _targets()
+    if isinstance(targets[0], SocketForwardHandler):
+        previous, listener.handlers = listener.handlers, tuple(targets)
+        for target in previous:
+            target.flush()
+            target.close()
+
+
+def _reset_after_fork():
+    # A thread ouvinte não sobrevive ao fork: o worker recomeça com fila e ouvinte próprios
+    global _state_lock
+    _state_lock = threading.Lock()
+    listener = _state.get("listener")
+    if listener is None:
+        return
+    log_queue = queue.SimpleQueue()
+    _state["handler"].queue = log_queue
+    listener.queue = log_queue
+    listener._thread = None
+    forward_to_server()
+    listener.start()
+
+
+atexit.register(stop_logging)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
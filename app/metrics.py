@@ -0,0 +1,395 @@
+"""
+Instrumentação leve do caminho crítico, exposta em /metrics (formato Prometheus).
+
+Cada worker do Gunicorn mantém contadores, gauges e histogramas em memória e
+grava periodicamente um snapshot JSON em Config.METRICS_DIR (um arquivo por PID).
+O /metrics soma os snapshots de todos os workers; gauges de processos encerrados
+são descartados, enquanto contadores e histogramas continuam somados (monotônicos).
+Quando um worker termina, o master soma seus contadores e histogramas ao snapshot
+"retired" e apaga o arquivo do PID, que pode então ser reutilizado sem que os
+totais voltem atrás.
+"""
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+# Limites (segundos) para etapas internas e chamadas upstream
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Limites (bytes) para tamanhos de payload
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Metric:
+    """Base: amostras indexadas pela tupla de valores dos labels."""
+
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._samples = {}
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self._samples = {}
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = [[list(labels), value if not isinstance(value, list) else list(value)]
+                       for labels, value in self._samples.items()]
+        return {"type": self.kind, "help": self.help, "labels": list(self.labelnames), "samples": samples}
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._samples[labels] = self._samples.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._samples[labels] = self._samples.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    @contextmanager
+    def track(self, *labels):
+        """Incrementa durante o bloco (ex.: requisições em andamento)."""
+        self.inc(*labels)
+        try:
+            yield
+        finally:
+            self.dec(*labels)
+
+
+class Histogram(Metric):
+    """Contagens por faixa (não cumulativas em memória) + soma + total."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            sample = self._samples.get(labels)
+            if sample is None:
+                # len(buckets) + 1 faixas (a última é +Inf), seguidas de soma e total
+                sample = self._samples[labels] = [0] * (len(self.buckets) + 3)
+            sample[index] += 1
+            sample[-2] += value
+            sample[-1] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def snapshot(self) -> dict:
+        data = super().snapshot()
+        data["buckets"] = list(self.buckets)
+        return data
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def snapshot(self) -> dict:
+        return {"pid": os.getpid(), "written_at": time.time(), "metrics": {m.name: m.snapshot() for m in self.metrics}}
+
+    def reset(self):
+        for metric in self.metrics:
+            metric.reset()
+
+
+registry = MetricsRegistry()
+
+# --- Métricas da aplicação ---
+STAGE_SECONDS = registry.register(Histogram(
+    "dasa_stage_seconds", "Tempo gasto em cada etapa da consulta", ("stage",)
+))
+UPSTREAM_RESPONSES = registry.register(Counter(
+    "dasa_upstream_responses_total", "Respostas do Ensembl por endpoint e status", ("endpoint", "status")
+))
+UPSTREAM_SECONDS = registry.register(Histogram(
+    "dasa_upstream_request_seconds", "Duração das chamadas ao Ensembl", ("endpoint",)
+))
+UPSTREAM_RETRIES = registry.register(Counter(
+    "dasa_upstream_retries_total", "Retentativas de chamadas ao Ensembl por motivo", ("reason",)
+))
+UPSTREAM_IN_FLIGHT = registry.register(Gauge(
+    "dasa_upstream_in_flight", "Chamadas ao Ensembl em andamento"
+))
+BREAKER_TRANSITIONS = registry.register(Counter(
+    "dasa_upstream_breaker_transitions_total", "Mudanças de estado do circuit breaker do Ensembl", ("state",)
+))
+BREAKER_REJECTIONS = registry.register(Counter(
+    "dasa_upstream_breaker_rejections_total", "Chamadas ao Ensembl rejeitadas com o circuito aberto"
+))
+NEGATIVE_CACHE_HITS = registry.register(Counter(
+    "dasa_negative_cache_hits_total", "Consultas a rsIDs inexistentes respondidas pelo cache negativo"
+))
+UPSTREAM_BYTES = registry.register(Histogram(
+    "dasa_upstream_payload_bytes", "Tamanho das respostas do Ensembl", ("endpoint",), SIZE_BUCKETS
+))
+HTTP_REQUESTS = registry.register(Counter(
+    "dasa_http_requests_total", "Requisições atendidas por rota e status", ("endpoint", "status")
+))
+HTTP_SECONDS = registry.register(Histogram(
+    "dasa_http_request_seconds", "Duração das requisições por rota", ("endpoint",)
+))
+HTTP_IN_FLIGHT = registry.register(Gauge(
+    "dasa_http_requests_in_flight", "Requisições em andamento"
+))
+RESPONSE_BYTES = registry.register(Histogram(
+    "dasa_response_payload_bytes", "Tamanho do corpo das respostas por rota", ("endpoint",), SIZE_BUCKETS
+))
+
+
+def stage(name: str):
+    """Atalho: `with stage("overlap"): ...` registra a duração da etapa."""
+    return STAGE_SECONDS.time(name)
+
+
+def upstream_endpoint(method: str, url: str) -> str:
+    """Label de baixa cardinalidade para a chamada ao Ensembl."""
+    if "/overlap/" in url:
+        return "overlap"
+    return "variation_batch" if method == "POST" else "variation"
+
+
+def record_upstream(method: str, url: str, response, elapsed: float, error: Exception = None):
+    """Registra status, duração e tamanho de uma chamada ao Ensembl."""
+    endpoint = upstream_endpoint(method, url)
+    status = str(response.status_code) if response is not None else type(error).__name__ if error else "none"
+    UPSTREAM_RESPONSES.inc(endpoint, status)
+    UPSTREAM_SECONDS.observe(elapsed, endpoint)
+    if response is not None:
+        length = response.headers.get("Content-Length")
+        size = int(length) if length and length.isdigit() else len(response.content or b"")
+        UPSTREAM_BYTES.observe(size, endpoint)
+
+
+def install(app):
+    """Registra os hooks de requisição (duração, status, tamanho e requisições em andamento)."""
+    from flask import g, request
+
+    @app.before_request
+    def _start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+
+    @app.after_request
+    def _record_request_metrics(response):
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        HTTP_REQUESTS.inc(endpoint, str(response.status_code))
+        HTTP_SECONDS.observe(time.perf_counter() - g.get("metrics_started", time.perf_counter()), endpoint)
+        if not response.is_streamed:
+            RESPONSE_BYTES.observe(response.calculate_content_length() or 0, endpoint)
+        store.flush()
+        return response
+
+    @app.teardown_request
+    def _finish_request_metrics(exc):
+        if g.pop("metrics_started", None) is not None:
+            HTTP_IN_FLIGHT.dec()
+
+
+class SnapshotStore:
+    """Snapshots por PID em disco, agregados na leitura do /metrics."""
+
+    def __init__(self, directory: str, interval: float):
+        self.directory = directory
+        self.interval = interval
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+    def path_for(self, pid: int) -> str:
+        return os.path.join(self.directory, f"metrics-{pid}.json")
+
+    def flush(self, force: bool = False):
+        """Grava o snapshot do worker (no máximo a cada `interval` segundos, salvo force)."""
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.interval:
+            return
+        if not self._lock.acquire(blocking=force):
+            return
+        try:
+            self._last_flush = now
+            os.makedirs(self.directory, exist_ok=True)
+            path = self.path_for(os.getpid())
+            with open(f"{path}.tmp", "w", encoding="utf-8") as handle:
+                json.dump(registry.snapshot(), handle, separators=(",", ":"))
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            logger.warning("Falha ao gravar o snapshot de métricas: %s", e)
+        finally:
+            self._lock.release()
+
+    @property
+    def retired_path(self) -> str:
+        return os.path.join(self.directory, "metrics-retired.json")
+
+    def retire(self, pid: int):
+        """
+        Soma contadores e histogramas do worker encerrado ao snapshot "retired" e
+        apaga o arquivo do PID (hook child_exit do master, antes de o PID ser reutilizado).
+        """
+        path = self.path_for(pid)
+        try:
+            with open(path, encoding="utf-8") as handle:
+                snapshot = json.load(handle)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("Snapshot de métricas ilegível para o PID %s; descartado: %s", pid, e)
+            snapshot = None
+
+        with self._lock:
+            try:
+                if snapshot is not None:
+                    snapshots = [snapshot]
+                    if os.path.exists(self.retired_path):
+                        with open(self.retired_path, encoding="utf-8") as handle:
+                            snapshots.append(json.load(handle))
+                    retired = {"written_at": time.time(), "metrics": {
+                        name: {**metric, "samples": [[list(labels), value] for labels, value in metric["samples"].items()]}
+                        for name, metric in merge(snapshots).items() if metric["type"] != "gauge"
+                    }}
+                    with open(f"{self.retired_path}.tmp", "w", encoding="utf-8") as handle:
+                        json.dump(retired, handle, separators=(",", ":"))
+                    os.replace(f"{self.retired_path}.tmp", self.retired_path)
+                os.remove(path)
+            except (OSError, ValueError) as e:
+                logger.warning("Falha ao consolidar as métricas do PID %s: %s", pid, e)
+
+    def retire_dead(self):
+        """Consolida snapshots deixados por processos que já não existem (ex.: execução anterior)."""
+        for path in glob.glob(os.path.join(self.directory, "metrics-*.json")):
+            pid = os.path.basename(path)[len("metrics-"):-len(".json")]
+            if pid.isdigit() and not _pid_alive(int(pid)):
+                self.retire(int(pid))
+
+    def collect(self) -> list:
+        snapshots = []
+        for path in glob.glob(os.path.join(self.directory, "metrics-*.json")):
+            try:
+                with open(path, encoding="utf-8") as handle:
+                    snapshots.append(json.load(handle))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def _reset_after_fork(self):
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge(snapshots: list) -> dict:
+    """Soma as amostras de todos os workers (gauges apenas de processos vivos)."""
+    merged = {}
+    for snapshot in snapshots:
+        # O snapshot "retired" não tem PID (e não guarda gauges)
+        pid = snapshot.get("pid")
+        alive = pid is not None and _pid_alive(pid)
+        for name, metric in snapshot["metrics"].items():
+            target = merged.setdefault(name, {**metric, "samples": {}})
+            if metric["type"] == "gauge" and not alive:
+                continue
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                current = target["samples"].get(key)
+                if current is None:
+                    target["samples"][key] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    target["samples"][key] = [a + b for a, b in zip(current, value)]
+                else:
+                    target["samples"][key] = current + value
+    return merged
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: list, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def render(merged: dict) -> str:
+    """Formato texto de exposição do Prometheus (versão 0.0.4)."""
+    lines = []
+    for name in sorted(merged):
+        metric = merged[name]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for labels, value in sorted(metric["samples"].items()):
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{_format_labels(metric['labels'], labels)} {value:g}")
+                continue
+            cumulative = 0
+            for bound, count in zip(metric["buckets"] + ["+Inf"], value[:-2]):
+                cumulative += count
+                le = f'le="{bound if bound == "+Inf" else format(bound, "g")}"'
+                lines.append(f"{name}_bucket{_format_labels(metric['labels'], labels, le)} {cumulative:g}")
+            lines.append(f"{name}_sum{_format_labels(metric['labels'], labels)} {value[-2]:.6g}")
+            lines.append(f"{name}_count{_format_labels(metric['labels'], labels)} {value[-1]:g}")
+    return "\n".join(lines) + "\n"
+
+
+store = SnapshotStore(Config.METRICS_DIR, Config.METRICS_FLUSH_INTERVAL)
+
+
+def exposition() -> str:
+    """Grava o snapshot do worker atual e retorna a agregação de todos os workers."""
+    store.flush(force=True)
+    return render(merge(store.collect()))
+
+
+def _reset_after_fork():
+    # Valores do processo pai já constam do snapshot dele; o worker começa do zero
+    registry.reset()
+    store._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
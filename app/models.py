@@ -33,4 +33,39 @@ class VariantData(BaseModel):
     highest_maf_lat: List[float] = Field(default_factory=list, description="Lista de latitudes das populações com maior MAF")
     highest_maf_lon: List[float] = Field(default_factory=list, description="Lista de longitudes das populações com maior MAF")
     highest_maf_labels: List[str] = Field(default_factory=list, description="Nomes amigáveis das populações")
-    highest_maf_is_region: List[bool] = Field(default_factory=list, description ="Detecta se é uma região ou não")
\ No newline at end of file
+    highest_maf_is_region: List[bool] = Field(default_factory=list, description ="Detecta se é uma região ou não")
+    # Usado apenas pelo formato compacto: fora do JSON da resposta completa
+    highest_maf_rows: List[int] = Field(default_factory=list, exclude=True, description="Índices em pop_frequencies das populações com maior MAF")
+
+class RegionVariant(BaseModel):
+    """
+    Resumo de uma variante retornada pela consulta por região (/api/region).
+    Mantém apenas os campos do /overlap/region (feature=variation), sem frequências.
+    """
+    id: str = Field(..., description="Identificador da variante (Ex: rs699)")
+    chromosome: str = Field(..., description="Cromossomo (Mapeamento GRCh38)")
+    start: int = Field(..., description="Posição genômica inicial")
+    end: int = Field(..., description="Posição genômica final")
+    strand: int = Field(1, description="Fita (1 ou -1)")
+    alleles: List[str] = Field(default_factory=list, description="Alelos conhecidos")
+    consequence: str = Field("N/A", description="Consequência predita")
+    clinical_significance: List[str] = Field(default_factory=list, description="Significância clínica (ClinVar)")
+    source: str = Field("N/A", description="Fonte da variante (Ex: dbSNP)")
+
+
+def build_validators():
+    """
+    Garante os validadores/serializadores compilados dos modelos e exercita um ciclo
+    completo (validação, JSON e leitura do cache), tirando da primeira requisição a
+    inicialização preguiçosa do pydantic-core. Com preload_app, roda uma vez no master
+    e os workers herdam as estruturas por copy-on-write.
+    """
+    for model in (PopulationFrequency, VariantData, RegionVariant):
+        model.model_rebuild()
+    sample = VariantData(
+        rsid="rs0", chromosome="1", position=1, alleles="A/G", consequence="N/A",
+        pop_frequencies=[PopulationFrequency(
+            population="warmup", allele="A", frequency=0.5, label="warmup", is_region=False
+        )]
+    )
+    VariantData.model_validate_json(sample.model_dump_json())
@@ -0,0 +1,111 @@
+"""
+Profiler por amostragem, ativado por requisição.
+
+Com Config.PROFILER_ENABLED, uma requisição com o header Config.PROFILER_HEADER
+(e o valor de Config.PROFILER_TOKEN, se configurado) é amostrada a cada
+Config.PROFILER_INTERVAL segundos: a pilha da thread da requisição e das threads
+de I/O do Ensembl ("ensembl-*") é registrada no formato "folded" (flame graph)
+em Config.PROFILER_DIR. O nome do arquivo volta no header X-Profile-File.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class SamplingProfiler:
+    """Amostra periodicamente as pilhas das threads selecionadas (sys._current_frames)."""
+
+    def __init__(self, interval: float, thread_ids: set = None, name_prefixes: tuple = ("ensembl-",)):
+        self.interval = interval
+        self.thread_ids = set(thread_ids or ())
+        self.name_prefixes = name_prefixes
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _targets(self) -> dict:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        return {
+            ident: name for ident, name in names.items()
+            if ident in self.thread_ids or name.startswith(self.name_prefixes)
+        }
+
+    def _sample(self):
+        targets = self._targets()
+        for ident, frame in sys._current_frames().items():
+            name = targets.get(ident)
+            if name is None:
+                continue
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            frames.append(name)
+            self.stacks[";".join(reversed(frames))] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return self.stacks
+
+    def folded(self) -> str:
+        """Uma linha 'pilha;...;folha contagem' por pilha (flamegraph.pl / speedscope)."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def requested(headers) -> bool:
+    """Indica se a requisição pediu profiling (e está autorizada)."""
+    if not Config.PROFILER_ENABLED:
+        return False
+    value = headers.get(Config.PROFILER_HEADER)
+    if not value:
+        return False
+    return not Config.PROFILER_TOKEN or value == Config.PROFILER_TOKEN
+
+
+def install(app):
+    """Registra os hooks que iniciam e encerram o profiler nas requisições marcadas."""
+    from flask import g, request
+
+    @app.before_request
+    def _start_profiler():
+        if requested(request.headers):
+            g.profiler = SamplingProfiler(Config.PROFILER_INTERVAL, {threading.get_ident()}).start()
+
+    @app.after_request
+    def _stop_profiler(response):
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return response
+
+        profiler.stop()
+        endpoint = (request.endpoint or "unmatched").replace(".", "_")
+        filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{endpoint}.folded"
+        try:
+            os.makedirs(Config.PROFILER_DIR, exist_ok=True)
+            with open(os.path.join(Config.PROFILER_DIR, filename), "w", encoding="utf-8") as handle:
+                handle.write(profiler.folded())
+            response.headers["X-Profile-File"] = filename
+            response.headers["X-Profile-Samples"] = str(profiler.samples)
+        except OSError as e:
+            logger.warning("Falha ao gravar o perfil da requisição: %s", e)
+        return response
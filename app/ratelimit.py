@@ -0,0 +1,174 @@
+import logging
+import random
+import threading
+import time
+from .config import Config
+from .storage import connect
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(Exception):
+    """A cota do Ensembl não será liberada dentro de Config.RATE_LIMIT_MAX_WAIT."""
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Backoff exponencial com jitter completo (0 até base * 2^tentativa, limitado).
+    Evita que workers throttled ao mesmo tempo retornem juntos.
+    """
+    ceiling = min(Config.RETRY_BACKOFF_MAX, Config.RETRY_BACKOFF_BASE * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+def _header_float(response, name: str):
+    value = response.headers.get(name)
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class RateLimiter:
+    """
+    Token bucket compartilhado entre os workers do Gunicorn (estado em SQLite).
+    Os headers X-RateLimit-* e Retry-After do Ensembl ajustam o bucket em tempo real,
+    de forma que todos os workers desaceleram juntos antes de atingir a cota.
+    """
+
+    def __init__(self, path: str, rate: float, burst: int):
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self.counters = {
+            "acquired": 0, "rejected": 0, "throttled": 0,
+            "queued_seconds": 0.0, "upstream_seconds": 0.0, "upstream_requests": 0
+        }
+        connect(self.path).execute(
+            "CREATE TABLE IF NOT EXISTS bucket (name TEXT PRIMARY KEY, tokens REAL, updated_at REAL, blocked_until REAL)"
+        )
+
+    def _count(self, name: str, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def reserve(self, max_wait: float) -> float:
+        """
+        Reserva um token e retorna o tempo de espera necessário até utilizá-lo.
+        Se a espera exceder `max_wait`, nada é reservado e a espera é retornada.
+        """
+        conn = connect(self.path)
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated_at, blocked_until FROM bucket WHERE name = 'ensembl'").fetchone()
+            tokens, updated_at, blocked_until = row if row else (self.burst, now, 0.0)
+
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            wait = max(blocked_until - now, 0.0)
+            # Tokens negativos representam reservas já enfileiradas por outros workers
+            if tokens < 1:
+                wait = max(wait, (1 - tokens) / self.rate)
+
+            if wait <= max_wait:
+                tokens -= 1
+            conn.execute(
+                "INSERT OR REPLACE INTO bucket (name, tokens, updated_at, blocked_until) VALUES ('ensembl', ?, ?, ?)",
+                (tokens, now, blocked_until)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def next_slot(self):
+        """
+        Reserva a vez desta requisição e retorna quanto aguardar (em segundos).
+        Retorna None se a espera exceder Config.RATE_LIMIT_MAX_WAIT.
+        Não dorme: o cliente síncrono usa time.sleep e o assíncrono asyncio.sleep.
+        """
+        try:
+            wait = self.reserve(Config.RATE_LIMIT_MAX_WAIT)
+        except Exception as e:
+            # Falha no estado compartilhado não deve bloquear as consultas
+            logger.warning("Rate limiter indisponível, seguindo sem controle: %s", e)
+            return 0.0
+
+        if wait > Config.RATE_LIMIT_MAX_WAIT:
+            self._count("rejected")
+            return None
+        self._count("acquired")
+        self._count("queued_seconds", wait)
+        return wait
+
+    def acquire(self) -> bool:
+        """
+        Aguarda a vez desta requisição. Retorna False se a cota
+        não for liberada dentro de Config.RATE_LIMIT_MAX_WAIT.
+        """
+        wait = self.next_slot()
+        if wait is None:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    def observe(self, response, elapsed: float):
+        """Registra o tempo upstream e aplica os headers de rate limit do Ensembl."""
+        self._count("upstream_requests")
+        self._count("upstream_seconds", elapsed)
+        if response is None:
+            return
+
+        now = time.time()
+        blocked_until = None
+        tokens_cap = None
+
+        retry_after = _header_float(response, "Retry-After")
+        if response.status_code == 429:
+            self._count("throttled")
+            blocked_until = now + (retry_after if retry_after is not None else Config.RETRY_BACKOFF_MAX)
+
+        remaining = _header_float(response, "X-RateLimit-Remaining")
+        reset = _header_float(response, "X-RateLimit-Reset")
+        if remaining is not None:
+            # Nunca consumir além do que o Ensembl ainda permite no período
+            tokens_cap = remaining - Config.RATE_LIMIT_RESERVE
+            if tokens_cap <= 0 and reset is not None:
+                blocked_until = max(blocked_until or 0, now + reset)
+
+        if blocked_until is None and tokens_cap is None:
+            return
+
+        try:
+            conn = connect(self.path)
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT tokens, updated_at, blocked_until FROM bucket WHERE name = 'ensembl'").fetchone()
+            tokens, updated_at, current_block = row if row else (self.burst, now, 0.0)
+            if tokens_cap is not None:
+                tokens = min(tokens, tokens_cap)
+            if blocked_until is not None:
+                current_block = max(current_block, blocked_until)
+            conn.execute(
+                "INSERT OR REPLACE INTO bucket (name, tokens, updated_at, blocked_until) VALUES ('ensembl', ?, ?, ?)",
+                (tokens, updated_at, current_block)
+            )
+            conn.execute("COMMIT")
+        except Exception as e:
+            logger.warning("Falha ao atualizar o rate limiter compartilhado: %s", e)
+            try:
+                connect(self.path).execute("ROLLBACK")
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        """Tempo em fila versus tempo upstream (por worker)."""
+        with self._lock:
+            stats = dict(self.counters)
+        stats["queued_seconds"] = round(stats["queued_seconds"], 4)
+        stats["upstream_seconds"] = round(stats["upstream_seconds"], 4)
+        stats["avg_queued_ms"] = round(stats["queued_seconds"] * 1000 / stats["acquired"], 2) if stats["acquired"] else 0.0
+        stats["avg_upstream_ms"] = round(stats["upstream_seconds"] * 1000 / stats["upstream_requests"], 2) if stats["upstream_requests"] else 0.0
+        return stats
@@ -0,0 +1,66 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshAhead:
+    """
+    Atualização em segundo plano (refresh-ahead / stale-while-revalidate).
+    Entradas próximas do vencimento, ou já obsoletas, são servidas de imediato
+    enquanto um pool pequeno de threads refaz a consulta. Cada chave tem no
+    máximo uma atualização pendente por worker.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._pid = None
+        self._init_state()
+
+    def _init_state(self):
+        self._executor = None
+        self._pending = set()
+        self._lock = threading.Lock()
+        self.counters = {"scheduled": 0, "skipped": 0, "completed": 0, "failed": 0}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Threads não sobrevivem ao fork: cada worker cria o próprio pool
+        pid = os.getpid()
+        if self._pid != pid:
+            self._init_state()
+            self._pid = pid
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cache-refresh")
+        return self._executor
+
+    def schedule(self, key: str, refresh) -> bool:
+        """Agenda `refresh()` para a chave, se ainda não houver uma atualização pendente."""
+        executor = self._get_executor()
+        with self._lock:
+            if key in self._pending:
+                self.counters["skipped"] += 1
+                return False
+            self._pending.add(key)
+            self.counters["scheduled"] += 1
+        executor.submit(self._run, key, refresh)
+        return True
+
+    def _run(self, key: str, refresh):
+        outcome = "failed"
+        try:
+            if refresh() is not None:
+                outcome = "completed"
+        except Exception as e:
+            logger.warning("Falha na atualização em segundo plano de %s: %s", key, e)
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+                self.counters[outcome] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.counters)
+            stats["pending"] = len(self._pending)
+        return stats
@@ -0,0 +1,156 @@
+"""
+Consulta por região genômica com cache em blocos (tiles).
+
+O genoma é dividido em blocos fixos de Config.REGION_TILE_SIZE bases por
+cromossomo. Cada bloco guarda as variantes cujo início está nele, obtidas do
+/overlap/region (feature=variation). Janelas sobrepostas ou deslocadas
+reaproveitam os blocos já em cache e buscam apenas os que faltam.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from .config import Config
+from .cache import LRUCache, SQLiteCache
+from .models import RegionVariant
+
+logger = logging.getLogger(__name__)
+
+
+class RegionFetchError(Exception):
+    """Falha upstream ao buscar um bloco (o bloco não é gravado no cache)."""
+
+
+def tile_version() -> str:
+    """Versão do template e do tamanho dos blocos: alterá-los invalida os blocos antigos."""
+    template = f"{Config.ENDPOINTS['overlap_variation']}|{Config.REGION_TILE_SIZE}"
+    return hashlib.sha1(template.encode()).hexdigest()[:8]
+
+
+def tile_bounds(index: int, size: int) -> tuple:
+    """Coordenadas (1-based, inclusivas) do bloco `index`."""
+    start = index * size + 1
+    return start, start + size - 1
+
+
+def tile_range(start: int, end: int, size: int) -> range:
+    """Índices dos blocos que cobrem a janela [start, end]."""
+    return range((start - 1) // size, (end - 1) // size + 1)
+
+
+def summarize(feature: dict, chrom: str) -> dict:
+    """Converte uma feature 'variation' do Overlap no resumo RegionVariant (dict)."""
+    consequence = feature.get("consequence_type") or "N/A"
+    return RegionVariant(
+        id=str(feature.get("id")),
+        chromosome=str(feature.get("seq_region_name") or chrom),
+        start=int(feature.get("start", 0)),
+        end=int(feature.get("end", feature.get("start", 0))),
+        strand=int(feature.get("strand") or 1),
+        alleles=[str(a) for a in feature.get("alleles") or []],
+        consequence=consequence.replace("_", " "),
+        clinical_significance=[str(c) for c in feature.get("clinical_significance") or []],
+        source=feature.get("source") or "N/A",
+    ).model_dump()
+
+
+def build_tile(features: list, chrom: str, index: int, size: int) -> list:
+    """
+    Resumos das variantes que começam no bloco, ordenados por (início, id).
+    Variantes que apenas atravessam o limite pertencem ao bloco onde começam.
+    """
+    tile_start, tile_end = tile_bounds(index, size)
+    variants = []
+    for feature in features:
+        if feature.get("feature_type", "variation") != "variation" or not feature.get("id"):
+            continue
+        if tile_start <= int(feature.get("start", 0)) <= tile_end:
+            variants.append(summarize(feature, chrom))
+    variants.sort(key=lambda v: (v["start"], v["id"]))
+    return variants
+
+
+def parse_cursor(cursor: str) -> tuple:
+    """Cursor de paginação 'início:id' (último item da página anterior)."""
+    position, _, variant_id = cursor.partition(":")
+    if not position.isdigit() or not variant_id:
+        raise ValueError(f"Cursor de paginação inválido: {cursor}")
+    return int(position), variant_id
+
+
+def make_cursor(variant: dict) -> str:
+    return f"{variant['start']}:{variant['id']}"
+
+
+class RegionTileCache:
+    """
+    Blocos de variantes em dois níveis (LRU local + SQLite compartilhado entre workers).
+    Chave: versão + cromossomo + índice do bloco; valor: lista JSON de resumos.
+    """
+
+    def __init__(self):
+        self.memory = LRUCache(Config.REGION_TILE_MEMORY_ENTRIES, Config.CACHE_MEMORY_TTL)
+        self.disk = SQLiteCache(
+            os.path.join(Config.CACHE_DIR, "regions.sqlite3"),
+            Config.REGION_TILE_MAX_ENTRIES,
+            Config.CACHE_DISK_TTL
+        )
+        self.version = tile_version()
+        self._lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "errors": 0}
+
+    def _key(self, chrom: str, index: int) -> str:
+        return f"{self.version}:{chrom}:{index}"
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def get(self, chrom: str, index: int, record: bool = True):
+        """Lista de resumos do bloco ou None (ausente/expirado)."""
+        count = self._count if record else (lambda name: None)
+        key = self._key(chrom, index)
+        tile = self.memory.get(key)
+        if tile is not None:
+            count("memory_hits")
+            return tile
+
+        try:
+            row = self.disk.get(key)
+        except Exception as e:
+            logger.warning("Falha na leitura do bloco %s:%s em disco: %s", chrom, index, e)
+            count("errors")
+            row = None
+        if row is None:
+            count("misses")
+            return None
+
+        tile = json.loads(bytes(row[0]))
+        # O TTL da memória conta a partir da promoção, sem passar do prazo do disco
+        self.memory.set(key, tile, stored_at=row[1], expires_at=row[1] + self.disk.ttl)
+        count("disk_hits")
+        return tile
+
+    def set(self, chrom: str, index: int, tile: list):
+        key = self._key(chrom, index)
+        self.memory.set(key, tile)
+        try:
+            self.disk.set(key, json.dumps(tile, separators=(",", ":")).encode())
+        except Exception as e:
+            logger.warning("Falha na escrita do bloco %s:%s em disco: %s", chrom, index, e)
+            self._count("errors")
+        self._count("sets")
+
+    def clear(self):
+        self.memory.clear()
+        self.disk.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.counters)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((lookups - stats["misses"]) / lookups, 4) if lookups else 0.0
+        stats["memory_entries"] = len(self.memory)
+        stats["tile_size"] = Config.REGION_TILE_SIZE
+        return stats
@@ -1,12 +1,181 @@
-from flask import Blueprint, jsonify, render_template
-from .core import EnsemblClient
-from .utils import clean_rsid
+import json
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from flask import Blueprint, Response, jsonify, render_template, request, stream_with_context
+from .breaker import CircuitOpen
+from .config import Config
+from .serialization import EncodedPayload, json_response
+from .utils import clean_rsid, parse_region
+from . import metrics, startup, warmup
 
 # Criação do Blueprint para modularizar as rotas e facilitar escalabilidade
 main_bp = Blueprint('main', __name__)
 
-# Instância única do cliente Ensembl para reutilização
-client = EnsemblClient()
+# Clientes Ensembl (instâncias únicas), criados no primeiro uso: a importação de
+# core/async_core traz requests, asyncio e os modelos Pydantic (ver create_app)
+_clients = None
+_clients_lock = threading.Lock()
+
+
+def get_clients() -> tuple:
+    """(EnsemblClient, AsyncEnsemblClient) do processo; o assíncrono compartilha cache e rate limiter."""
+    global _clients
+    if _clients is None:
+        with _clients_lock:
+            if _clients is None:
+                from .core import EnsemblClient
+                from .async_core import AsyncEnsemblClient
+                sync_client = EnsemblClient()
+                _clients = (sync_client, AsyncEnsemblClient(sync_client))
+    return _clients
+
+
+def __getattr__(name):
+    # Compatibilidade: `from app.routes import client, async_client`
+    if name == "client":
+        return get_clients()[0]
+    if name == "async_client":
+        return get_clients()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def fetch_variant(rsid: str):
+    """Consulta individual pelo cliente assíncrono (quando habilitado) ou síncrono."""
+    client, async_client = get_clients()
+    if Config.ASYNC_CLIENT_ENABLED:
+        from .async_core import bridge, request_timeout
+        return bridge.run(async_client.get_variant_data(rsid), request_timeout())
+    return client.get_variant_data(rsid)
+
+
+def compact_requested() -> bool:
+    """True para ?format=compact; ValueError para formatos desconhecidos."""
+    from .compact import COMPACT, FORMATS
+    fmt = request.args.get("format", "full")
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato inválido: {fmt}. Use {' ou '.join(FORMATS)}")
+    return fmt == COMPACT
+
+
+def variant_payload(rsid: str, variant, compact: bool = False) -> EncodedPayload:
+    """Corpo JSON pré-serializado (reaproveitado do cache quando disponível)."""
+    client = get_clients()[0]
+    if client.cache:
+        return client.cache.payload_for(rsid, variant, compact)
+    if compact:
+        from .compact import compact_payload
+        return compact_payload(variant)
+    return EncodedPayload.from_model(variant)
+
+
+def iter_uploaded_rsids():
+    """
+    Identificadores enviados ao endpoint de streaming, lidos sob demanda.
+    Aceita lista JSON (ou {"rsids": [...]}), arquivo multipart ou texto com um rsID por linha;
+    o texto é consumido linha a linha, sem carregar o corpo inteiro em memória.
+    """
+    if request.is_json:
+        payload = request.get_json(silent=True)
+        rsids = payload.get("rsids") if isinstance(payload, dict) else payload
+        if not isinstance(rsids, list):
+            raise ValueError("Corpo inválido. Envie {\"rsids\": [...]} ou um rsID por linha")
+        for raw in rsids:
+            yield str(raw)
+        return
+
+    if request.mimetype == "multipart/form-data":
+        upload = next(iter(request.files.values()), None)
+        stream = upload.stream if upload else []
+    else:
+        stream = request.stream
+
+    for line in stream:
+        line = line.decode("utf-8", "replace").strip()
+        if line:
+            yield line
+
+
+def stream_variants(rsids, concurrency: int, compact: bool = False):
+    """
+    Resolve os rsIDs com no máximo `concurrency` consultas em andamento e gera uma linha
+    NDJSON por identificador, na ordem de conclusão. Erros viram linhas {"rsid", "error"}.
+    """
+    client, async_client = get_clients()
+    from .async_core import bridge
+    executor = None if Config.ASYNC_CLIENT_ENABLED else ThreadPoolExecutor(max_workers=concurrency)
+    in_flight = {}
+
+    def error_line(rsid: str, message: str) -> bytes:
+        return json.dumps({"rsid": rsid, "error": message}).encode() + b"\n"
+
+    def drain(return_when):
+        done, _ = wait(in_flight, return_when=return_when)
+        for future in done:
+            rsid = in_flight.pop(future)
+            try:
+                variant = future.result()
+            except Exception as e:
+                yield error_line(rsid, f"Erro no processamento da variante: {e}")
+                continue
+            if variant is None:
+                yield error_line(rsid, "Identificador não localizado na base Ensembl")
+            else:
+                yield variant_payload(rsid, variant, compact).body + b"\n"
+
+    try:
+        for raw in rsids:
+            try:
+                rsid = clean_rsid(raw)
+            except ValueError as e:
+                yield error_line(raw, str(e))
+                continue
+
+            if executor:
+                future = executor.submit(client.get_variant_data, rsid)
+            else:
+                future = bridge.submit(async_client.get_variant_data(rsid))
+            in_flight[future] = rsid
+
+            # Limite de consultas em andamento: aguarda a primeira conclusão antes de ler mais IDs
+            if len(in_flight) >= concurrency:
+                yield from drain(FIRST_COMPLETED)
+
+        while in_flight:
+            yield from drain(FIRST_COMPLETED)
+    except ValueError as e:
+        yield json.dumps({"error": str(e)}).encode() + b"\n"
+    finally:
+        # Cliente desconectado: descarta o que ainda não começou
+        for future in in_flight:
+            future.cancel()
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_variants(rsids: list) -> tuple:
+    """Consulta em lote pelo cliente assíncrono (quando habilitado) ou síncrono."""
+    client, async_client = get_clients()
+    if Config.ASYNC_CLIENT_ENABLED:
+        from .async_core import bridge, request_timeout
+        return bridge.run(async_client.get_variants_data(rsids), request_timeout(len(rsids)))
+    return client.get_variants_data(rsids)
+
+@main_bp.errorhandler(CircuitOpen)
+def circuit_open(error):
+    """Ensembl degradado: falha imediata com 503 e Retry-After, sem ocupar o worker com retries."""
+    response = jsonify({"error": str(error)})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(error.retry_after)
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+@main_bp.errorhandler(TimeoutError)
+def upstream_timeout(error):
+    """Consulta ao Ensembl além do limite do AsyncBridge: cancelada e respondida com 504."""
+    response = jsonify({"error": "Tempo limite excedido na consulta ao Ensembl"})
+    response.status_code = 504
+    response.headers["Cache-Control"] = "no-store"
+    return response
 
 @main_bp.route('/')
 def index():
@@ -24,19 +193,168 @@ def get_variant(rsid):
     Processo:
     1. Sanitiza a entrada (remove caracteres perigosos).
     2. Consulta o Core (EnsemblClient).
-    3. Serializa a resposta usando Pydantic.
+    3. Serializa a resposta direto para bytes (Pydantic), com ETag e compressão.
+
+    Com ?format=compact, as frequências vêm em colunas que referenciam o dicionário
+    de /api/populations (ver app/compact.py).
     """
     try:
+        compact = compact_requested()
         # Sanitização da entrada via utilitário re
         sanitized_rsid = clean_rsid(rsid)
         # Chamada ao motor de processamento
-        variant_obj = client.get_variant_data(sanitized_rsid)
+        variant_obj = fetch_variant(sanitized_rsid)
         if not variant_obj:
             return jsonify({"error": "Identificador não localizado na base Ensembl"}), 404
             
-        # Utilizando model_dump() para serialização Pydantic v2
-        return jsonify(variant_obj.model_dump())
+        # Corpo pré-serializado (model_dump_json) com suporte a If-None-Match (304)
+        return json_response(variant_payload(sanitized_rsid, variant_obj, compact))
         
     except ValueError as e:
         # Retorna erro 400 (Bad Request) se a sanitização falhar
-        return jsonify({"error": str(e)}), 400
\ No newline at end of file
+        return jsonify({"error": str(e)}), 400
+
+@main_bp.route('/api/populations')
+def get_populations():
+    """
+    Dicionário de populações usado pelo formato compacto (o ID é o índice nas colunas).
+
+    Com ?v=<versão atual> a resposta é imutável e fica em cache por Config.POPULATIONS_MAX_AGE;
+    sem versão (ou com uma versão antiga) o conteúdo atual é servido com cache curto.
+    """
+    from .compact import dictionary_payload
+    from .coordinates import registry
+
+    payload = dictionary_payload()
+    if request.args.get("v") == registry.version:
+        response = json_response(payload, max_age=Config.POPULATIONS_MAX_AGE)
+        response.headers["Cache-Control"] += ", immutable"
+        return response
+    return json_response(payload)
+
+@main_bp.route('/health')
+def health():
+    """
+    Health check: responde imediatamente, sem consultar o Ensembl.
+    Informa o andamento da preparação do cliente e do warm-up apenas como diagnóstico.
+    """
+    return jsonify({"status": "ok", "startup": dict(startup.status), "warmup": dict(warmup.status)})
+
+@main_bp.route('/metrics')
+def get_metrics():
+    """
+    Métricas no formato de exposição do Prometheus, agregadas entre os workers.
+    """
+    if not Config.METRICS_ENABLED:
+        return jsonify({"error": "Métricas desativadas"}), 404
+    return Response(metrics.exposition(), mimetype="text/plain; version=0.0.4")
+
+@main_bp.route('/api/stats')
+def get_stats():
+    """
+    Endpoint de monitoramento: contadores internos para ajuste de limites.
+    """
+    from .session import stats as http_stats
+    client = get_clients()[0]
+    return jsonify({
+        "cache": client.cache.stats() if client.cache else None,
+        "http": http_stats.snapshot(),
+        "rate_limit": client.limiter.stats() if client.limiter else None,
+        "coalescing": client.flights.stats() if client.flights else None,
+        "refresh": client.refresher.stats() if client.refresher else None,
+        "regions": client.region_tiles.stats() if client.region_tiles else None,
+        "negative_cache": client.negative.stats() if client.negative else None,
+        "breaker": client.breaker.stats() if client.breaker else None
+    })
+
+@main_bp.route('/api/region/<region>')
+def get_region(region):
+    """
+    Endpoint de consulta por região genômica (Ex: /api/region/1:230700000-230800000).
+
+    Retorna os resumos das variantes com início na janela, ordenados por posição,
+    em páginas de ?limit= itens (até Config.REGION_MAX_PAGE_SIZE). A próxima página
+    é obtida repetindo a consulta com ?cursor=<next_cursor>. A janela é limitada a
+    Config.REGION_MAX_SPAN bases.
+    """
+    from .regions import RegionFetchError
+
+    limit = request.args.get("limit", Config.REGION_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, Config.REGION_MAX_PAGE_SIZE))
+    try:
+        chrom, start, end = parse_region(region)
+        if end - start + 1 > Config.REGION_MAX_SPAN:
+            return jsonify({"error": f"Janela máxima de {Config.REGION_MAX_SPAN} bases por consulta"}), 400
+        page = get_clients()[0].get_region_variants(chrom, start, end, request.args.get("cursor"), limit)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except RegionFetchError as e:
+        return jsonify({"error": str(e)}), 502
+
+    return json_response(EncodedPayload(json.dumps(page, separators=(",", ":")).encode()))
+
+@main_bp.route('/api/variants', methods=['POST'])
+def get_variants():
+    """
+    Endpoint de consulta em lote.
+
+    Aceita {"rsids": [...]} (ou a lista diretamente) e retorna, em uma única
+    resposta, os resultados e os erros individuais de cada identificador.
+    Aceita ?format=compact (ver /api/variant).
+    """
+    try:
+        compact = compact_requested()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    payload = request.get_json(silent=True)
+    rsids = payload.get("rsids") if isinstance(payload, dict) else payload
+    if not isinstance(rsids, list):
+        return jsonify({"error": "Corpo inválido. Envie {\"rsids\": [...]}"}), 400
+    if len(rsids) > Config.BATCH_MAX_IDS:
+        return jsonify({"error": f"Máximo de {Config.BATCH_MAX_IDS} identificadores por requisição"}), 400
+
+    # Sanitização individual: IDs inválidos não invalidam o lote
+    valid, errors = [], {}
+    for raw in rsids:
+        try:
+            sanitized_rsid = clean_rsid(str(raw))
+        except ValueError as e:
+            errors[str(raw)] = str(e)
+            continue
+        if sanitized_rsid not in valid:
+            valid.append(sanitized_rsid)
+
+    results, fetch_errors = fetch_variants(valid) if valid else ({}, {})
+    errors.update(fetch_errors)
+
+    # Composição direta dos corpos já serializados de cada variante
+    parts = [json.dumps(rsid).encode() + b":" + variant_payload(rsid, variant, compact).body for rsid, variant in results.items()]
+    body = b'{"results":{' + b",".join(parts) + b'},"errors":' + json.dumps(errors).encode() + b"}"
+    return json_response(EncodedPayload(body), cacheable=False)
+
+@main_bp.route('/api/variants/stream', methods=['POST'])
+def stream_variants_route():
+    """
+    Endpoint de consulta em streaming (NDJSON).
+
+    Aceita uma lista JSON ou um upload com um rsID por linha e devolve um VariantData
+    por linha assim que cada consulta termina. IDs inválidos e não encontrados retornam
+    como linhas {"rsid": ..., "error": ...} sem interromper a resposta.
+    O paralelismo é limitado por ?concurrency= (até Config.STREAM_CONCURRENCY) e
+    ?format=compact vale para cada linha.
+    """
+    try:
+        compact = compact_requested()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    concurrency = request.args.get("concurrency", Config.STREAM_CONCURRENCY, type=int)
+    concurrency = max(1, min(concurrency, Config.STREAM_CONCURRENCY))
+
+    body = stream_with_context(stream_variants(iter_uploaded_rsids(), concurrency, compact))
+    response = Response(body, mimetype="application/x-ndjson")
+    response.headers["Cache-Control"] = "no-store"
+    # Desativa o buffer de proxies reversos (nginx) para entregar cada linha imediatamente
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
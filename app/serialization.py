@@ -0,0 +1,88 @@
+import gzip
+import hashlib
+import threading
+from flask import Response, request
+from .config import Config
+from .metrics import stage
+
+# Brotli é opcional: sem o pacote, a negociação usa apenas gzip
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende do ambiente
+    brotli = None
+
+
+class EncodedPayload:
+    """
+    Corpo JSON já serializado (bytes), seu hash de conteúdo (ETag) e as versões
+    comprimidas, geradas sob demanda e mantidas junto ao resultado em cache.
+    """
+
+    __slots__ = ("body", "etag", "_compressed", "_lock")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self._compressed = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_model(cls, model) -> "EncodedPayload":
+        """Serializa direto do modelo Pydantic para bytes (sem dicts intermediários)."""
+        with stage("serialize"):
+            return cls(model.model_dump_json().encode())
+
+    def encoded(self, encoding: str) -> bytes:
+        """Retorna o corpo comprimido ('gzip' ou 'br'), memoizado por codificação."""
+        data = self._compressed.get(encoding)
+        if data is None:
+            with self._lock:
+                data = self._compressed.get(encoding)
+                if data is None:
+                    with stage("compress"):
+                        if encoding == "br":
+                            data = brotli.compress(self.body, quality=Config.BROTLI_QUALITY)
+                        else:
+                            data = gzip.compress(self.body, compresslevel=Config.GZIP_LEVEL, mtime=0)
+                    self._compressed[encoding] = data
+        return data
+
+
+def negotiate_encoding(body_size: int):
+    """Escolhe a compressão aceita pelo cliente (br > gzip) ou None."""
+    if body_size < Config.COMPRESS_MIN_BYTES:
+        return None
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def json_response(payload: EncodedPayload, max_age: int = None, cacheable: bool = True) -> Response:
+    """
+    Resposta JSON a partir de bytes pré-serializados.
+    Responde 304 quando o If-None-Match corresponde ao ETag e comprime o corpo
+    conforme o Accept-Encoding do cliente. Com cacheable=False (respostas a POST),
+    não há ETag nem 304 e o Cache-Control é no-store.
+    """
+    max_age = Config.VARIANT_CACHE_MAX_AGE if max_age is None else max_age
+
+    if cacheable and request.if_none_match.contains_weak(payload.etag):
+        response = Response(status=304)
+    else:
+        encoding = negotiate_encoding(len(payload.body))
+        body = payload.encoded(encoding) if encoding else payload.body
+        response = Response(body, mimetype="application/json")
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+
+    if cacheable:
+        # ETag fraco: as versões comprimidas são representações equivalentes
+        response.set_etag(payload.etag, weak=True)
+        response.headers["Cache-Control"] = f"public, max-age={max_age}"
+    else:
+        response.headers["Cache-Control"] = "no-store"
+    response.vary.add("Accept-Encoding")
+    return response
@@ -0,0 +1,130 @@
+import os
+import socket
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from .config import Config
+
+
+class ConnectionStats:
+    """
+    Contadores de requisições e conexões abertas pelo pool.
+    A diferença entre ambos indica quantos handshakes TCP/TLS foram evitados.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def count_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.new_connections = 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            reused = max(self.requests - self.new_connections, 0)
+            return {
+                "pid": os.getpid(),
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": reused,
+                "reuse_ratio": round(reused / self.requests, 4) if self.requests else 0.0
+            }
+
+
+stats = ConnectionStats()
+
+
+class CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        stats.count_connection()
+        return super()._new_conn()
+
+
+class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        stats.count_connection()
+        return super()._new_conn()
+
+
+class PooledAdapter(HTTPAdapter):
+    """
+    Adapter HTTP com pool de conexões persistentes (keep-alive) e contagem de reuso.
+    """
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if Config.HTTP_TCP_KEEPALIVE:
+            # Mantém conexões ociosas vivas através de NATs/load balancers
+            pool_kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            ]
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CountingHTTPConnectionPool,
+            "https": CountingHTTPSConnectionPool
+        }
+
+    def send(self, request, **kwargs):
+        stats.count_request()
+        return super().send(request, **kwargs)
+
+
+def build_session() -> requests.Session:
+    """Cria uma Session com o pool configurado em Config."""
+    session = requests.Session()
+    adapter = PooledAdapter(
+        pool_connections=Config.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=Config.HTTP_POOL_MAXSIZE,
+        max_retries=0  # A retentativa é responsabilidade do EnsemblClient
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not Config.HTTP_KEEPALIVE:
+        session.headers["Connection"] = "close"
+    return session
+
+
+# Uma Session por processo: após o fork do Gunicorn cada worker cria o próprio pool
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Retorna a Session do worker atual, criando-a sob demanda."""
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session = build_session()
+                _session_pid = pid
+    return _session
+
+
+def _reset_after_fork():
+    """
+    Descarta (sem fechar) o pool herdado do processo pai.
+    Fechar os sockets no filho encerraria as conexões TLS ainda usadas pelo pai.
+    """
+    global _session, _session_pid, _session_lock
+    _session = None
+    _session_pid = None
+    _session_lock = threading.Lock()
+    stats.__init__()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+import weakref
+from concurrent.futures import Future
+from .storage import connect
+
+logger = logging.getLogger(__name__)
+
+# Instâncias ativas, reiniciadas no worker após o fork do Gunicorn
+_instances = weakref.WeakSet()
+
+# Retorno de `lookup` quando o outro worker concluiu sem resultado (ex.: rsID inexistente)
+ABSENT = object()
+
+
+def shared_result(result):
+    """Resultado obtido por `lookup` (ABSENT vira None)."""
+    return None if result is ABSENT else result
+
+
+class FlightLock:
+    """
+    Lock leve entre workers do Gunicorn (tabela SQLite no CACHE_DIR).
+    Cada chave tem um dono e um prazo (lease): se o worker morrer durante a
+    consulta, a chave expira e outro worker assume.
+    """
+
+    def __init__(self, path: str, lease: float):
+        self.path = path
+        self.lease = lease
+        connect(self.path).execute(
+            "CREATE TABLE IF NOT EXISTS flights (key TEXT PRIMARY KEY, owner TEXT, expires_at REAL)"
+        )
+
+    def acquire(self, key: str):
+        """Tenta obter a chave. Retorna o token do dono ou None se outro worker a detém."""
+        now = time.time()
+        token = f"{os.getpid()}:{uuid.uuid4().hex}"
+        conn = connect(self.path)
+        conn.execute("DELETE FROM flights WHERE key = ? AND expires_at < ?", (key, now))
+        inserted = conn.execute(
+            "INSERT OR IGNORE INTO flights (key, owner, expires_at) VALUES (?, ?, ?)",
+            (key, token, now + self.lease)
+        ).rowcount
+        return token if inserted == 1 else None
+
+    def release(self, key: str, token: str):
+        connect(self.path).execute("DELETE FROM flights WHERE key = ? AND owner = ?", (key, token))
+
+
+class SingleFlight:
+    """
+    Coalescência de consultas: no máximo uma resolução upstream por chave em andamento.
+
+    - No mesmo worker, chamadas concorrentes aguardam o Future da primeira (líder).
+    - Entre workers, o líder detém a chave no FlightLock; os demais aguardam o
+      resultado aparecer no cache compartilhado (`lookup`) ou a chave ser liberada.
+      `lookup` retorna ABSENT quando o líder registrou que não há resultado (o
+      seguidor recebe None sem nova consulta upstream).
+    """
+
+    def __init__(self, lock: FlightLock = None, poll_interval: float = 0.05):
+        self.lock = lock
+        self.poll_interval = poll_interval
+        self._flights = {}
+        self._async_flights = {}
+        self._mutex = threading.Lock()
+        self.counters = {"leaders": 0, "coalesced_local": 0, "coalesced_remote": 0, "lock_errors": 0}
+        _instances.add(self)
+
+    def _count(self, name: str):
+        with self._mutex:
+            self.counters[name] += 1
+
+    def _try_acquire(self, key: str):
+        """Token do lock entre workers; '' quando o lock está desativado ou indisponível."""
+        if not self.lock:
+            return ""
+        try:
+            return self.lock.acquire(key)
+        except Exception as e:
+            logger.warning("Falha no lock compartilhado para %s; consultando sem coordenação: %s", key, e)
+            self._count("lock_errors")
+            return ""
+
+    def _release(self, key: str, token: str):
+        if token:
+            try:
+                self.lock.release(key, token)
+            except Exception as e:
+                logger.warning("Falha ao liberar o lock compartilhado de %s: %s", key, e)
+                self._count("lock_errors")
+
+    def run(self, key: str, resolve, lookup):
+        """
+        Executa `resolve()` uma única vez por chave entre as chamadas concorrentes.
+        `lookup()` consulta o armazenamento compartilhado enquanto outro worker resolve.
+        """
+        with self._mutex:
+            future = self._flights.get(key)
+            leader = future is None
+            if leader:
+                future = self._flights[key] = Future()
+
+        if not leader:
+            self._count("coalesced_local")
+            return future.result()
+
+        self._count("leaders")
+        try:
+            result = self._resolve_shared(key, resolve, lookup)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._mutex:
+                self._flights.pop(key, None)
+
+    def _resolve_shared(self, key: str, resolve, lookup):
+        waited = False
+        while True:
+            token = self._try_acquire(key)
+            if token is not None:
+                try:
+                    # O outro worker pode ter concluído entre a última consulta e a liberação da chave
+                    result = lookup() if waited else None
+                    return shared_result(result) if result is not None else resolve()
+                finally:
+                    self._release(key, token)
+
+            # Outro worker está resolvendo a mesma chave
+            if not waited:
+                self._count("coalesced_remote")
+                waited = True
+            time.sleep(self.poll_interval)
+            result = lookup()
+            if result is not None:
+                return shared_result(result)
+
+    async def run_async(self, key: str, resolve, lookup):
+        """
+        Equivalente assíncrono de `run` (event loop do worker).
+        `resolve` é uma função que retorna a corrotina; `lookup` é síncrona (executada em thread).
+        """
+        while True:
+            future = self._async_flights.get(key)
+            if future is None:
+                break
+            self._count("coalesced_local")
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Líder cancelado (ex.: cliente do streaming desconectado): o seguidor não
+                # herda o cancelamento e tenta de novo, assumindo a liderança se preciso
+                if not future.cancelled():
+                    raise
+
+        future = self._async_flights[key] = asyncio.get_running_loop().create_future()
+        self._count("leaders")
+        try:
+            result = await self._resolve_shared_async(key, resolve, lookup)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Evita o aviso de exceção não recuperada quando não há seguidores
+            future.exception()
+            raise
+        finally:
+            self._async_flights.pop(key, None)
+
+    async def _resolve_shared_async(self, key: str, resolve, lookup):
+        waited = False
+        while True:
+            token = await asyncio.to_thread(self._try_acquire, key)
+            if token is not None:
+                try:
+                    result = await asyncio.to_thread(lookup) if waited else None
+                    return shared_result(result) if result is not None else await resolve()
+                finally:
+                    await asyncio.to_thread(self._release, key, token)
+
+            if not waited:
+                self._count("coalesced_remote")
+                waited = True
+            await asyncio.sleep(self.poll_interval)
+            result = await asyncio.to_thread(lookup)
+            if result is not None:
+                return shared_result(result)
+
+    def stats(self) -> dict:
+        """Contadores de consultas coalescidas (no worker e entre workers)."""
+        with self._mutex:
+            stats = dict(self.counters)
+            stats["in_flight"] = len(self._flights) + len(self._async_flights)
+        return stats
+
+    def _reset_after_fork(self):
+        # Futures e locks do processo pai não pertencem ao worker
+        self._flights = {}
+        self._async_flights = {}
+        self._mutex = threading.Lock()
+
+
+def _reset_after_fork():
+    for instance in list(_instances):
+        instance._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,55 @@
+"""
+Perfis de inicialização (Config.STARTUP_PROFILE).
+
+- default: create_app importa a pilha do cliente Ensembl (requests, asyncio,
+  Pydantic, índices locais) e compila os validadores antes de atender.
+- fast: para instâncias serverless que escalam a zero. create_app registra só
+  as rotas; a pilha do cliente é carregada por uma thread de fundo logo após a
+  inicialização (ou pela primeira requisição que precisar dela, o que vier antes),
+  e o /health responde sem esperar.
+
+Com PRELOAD_APP (gunicorn.conf.py), a preparação roda de forma síncrona no
+master, e os workers compartilham o resultado por copy-on-write.
+"""
+import logging
+import threading
+import time
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+# Estado exposto em /health
+status = {"profile": Config.STARTUP_PROFILE, "state": "idle", "elapsed": 0.0}
+
+
+def prepare():
+    """Cria os clientes Ensembl e compila os validadores dos modelos. Retorna o cliente síncrono."""
+    started = time.monotonic()
+    status["state"] = "preparing"
+    from .models import build_validators
+    from .routes import get_clients
+
+    client = get_clients()[0]
+    build_validators()
+    status.update(state="ready", elapsed=round(time.monotonic() - started, 3))
+    return client
+
+
+def _prime(warmup: bool):
+    try:
+        client = prepare()
+    except Exception as e:
+        status["state"] = "error"
+        logger.error("Falha na preparação do cliente Ensembl: %s", e)
+        return
+    logger.info("Cliente Ensembl preparado em %ss", status["elapsed"])
+    if warmup:
+        from .warmup import start_warmup
+        start_warmup(client)
+
+
+def start_priming(warmup: bool = False) -> threading.Thread:
+    """Prepara o cliente (e dispara o warm-up) em segundo plano."""
+    thread = threading.Thread(target=_prime, args=(warmup,), name="startup-prime", daemon=True)
+    thread.start()
+    return thread
@@ -5,6 +5,8 @@
 
 let lastVariantData = null;
 let historyCache = JSON.parse(localStorage.getItem('genvar_recent_v2') || '[]');
+// Dicionário de populações do formato compacto (rótulos e coordenadas), por versão
+let populationDictionary = JSON.parse(localStorage.getItem('genvar_populations') || 'null');
 
 document.addEventListener('DOMContentLoaded', () => {
     const input = document.getElementById('rsid-input');
@@ -78,6 +80,50 @@ function removeFromHistory(event, rsid) {
     renderHistory();
 }
 
+/** Dicionário de populações: memória/localStorage e, na troca de versão, /api/populations (imutável) */
+async function loadPopulations(version) {
+    if (populationDictionary && populationDictionary.version === version) return populationDictionary;
+
+    const response = await fetch(`/api/populations?v=${version}`);
+    if (!response.ok) throw new Error(`Erro no servidor (Status: ${response.status})`);
+    populationDictionary = await response.json();
+    try {
+        localStorage.setItem('genvar_populations', JSON.stringify(populationDictionary));
+    } catch (e) {
+        console.warn("Dicionário de populações não armazenado:", e);
+    }
+    return populationDictionary;
+}
+
+/** Reconstrói o VariantData a partir das colunas do formato compacto e do dicionário */
+function expandCompact(data, dict) {
+    const cols = data.pop_frequencies;
+    const popFrequencies = cols.population.map((name, i) => {
+        const id = cols.id[i];
+        const known = id >= 0;
+        return {
+            population: name,
+            allele: cols.allele[i],
+            frequency: cols.frequency[i],
+            lat: known ? dict.lat[id] : 0,
+            lon: known ? dict.lon[id] : 0,
+            // Populações fora do dicionário: exibidas com o próprio nome, como região
+            label: known ? dict.labels[id] : name,
+            is_region: known ? dict.is_region[id] : true
+        };
+    });
+    const highest = data.highest_maf.map(row => popFrequencies[row]);
+
+    return {
+        ...data,
+        pop_frequencies: popFrequencies,
+        highest_maf_lat: highest.map(p => p.lat),
+        highest_maf_lon: highest.map(p => p.lon),
+        highest_maf_labels: highest.map(p => p.label),
+        highest_maf_is_region: highest.map(p => p.is_region)
+    };
+}
+
 /** Busca API */
 async function buscarVariante() {
     const input = document.getElementById('rsid-input');
@@ -86,7 +132,7 @@ async function buscarVariante() {
 
     toggleProgress(true);
     try {
-        const response = await fetch(`/api/variant/${rsid}`);
+        const response = await fetch(`/api/variant/${rsid}?format=compact`);
         
         // Verifica se o servidor retornou erro 
         if (!response.ok) {
@@ -94,13 +140,15 @@ async function buscarVariante() {
             throw new Error(errorData.error || `Erro no servidor (Status: ${response.status})`);
         }
 
-        const data = await response.json();
+        const compact = await response.json();
 
         // Se o backend retornou um objeto de erro formatado
-        if (data.error) {
-            throw new Error(data.error);
+        if (compact.error) {
+            throw new Error(compact.error);
         }
 
+        const data = expandCompact(compact, await loadPopulations(compact.populations_version));
+
         lastVariantData = data;
         updateCache(data.rsid);
         renderHorizontalTable(data);
@@ -0,0 +1,28 @@
+import os
+import sqlite3
+import threading
+
+# Conexões por thread: sqlite3 não permite compartilhar a conexão entre threads,
+# e uma conexão herdada via fork (Gunicorn) não pode ser reutilizada no worker.
+_local = threading.local()
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """
+    Retorna uma conexão SQLite para o arquivo compartilhado entre os workers.
+    A conexão é reaproveitada dentro da mesma thread e recriada após fork.
+    """
+    pid = os.getpid()
+    if getattr(_local, "pid", None) != pid:
+        _local.pid = pid
+        _local.connections = {}
+
+    conn = _local.connections.get(path)
+    if conn is None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+        # WAL permite leituras concorrentes enquanto outro worker escreve
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _local.connections[path] = conn
+    return conn
@@ -18,4 +18,29 @@ def clean_rsid(rsid: str) -> str:
     rsid_clean = rsid.strip().lower()
     if not re.match(r'^rs\d+$', rsid_clean):
         raise ValueError(f"Formato de rsID inválido: {rsid}. Deve ser 'rs' seguido de números.")
-    return rsid_clean
\ No newline at end of file
+    return rsid_clean
+
+
+def parse_region(region: str) -> tuple:
+    """
+    Valida uma região genômica no formato 'cromossomo:início-fim'.
+
+    Aceita o prefixo 'chr', separadores de milhar (',') e '..' no lugar de '-'.
+
+    Args:
+        region (str): Região fornecida pelo usuário (Ex: '1:230700000-230800000').
+
+    Returns:
+        tuple: (cromossomo, início, fim), com coordenadas inteiras (1-based, inclusivas).
+
+    Raises:
+        ValueError: Se o formato ou as coordenadas forem inválidos.
+    """
+    match = re.match(r'^(?:chr)?([A-Za-z0-9_.]{1,40}):([\d,]+)(?:-|\.\.)([\d,]+)$', region.strip(), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Formato de região inválido: {region}. Use 'cromossomo:início-fim' (Ex: 1:230700000-230800000).")
+    chrom = match.group(1).upper() if len(match.group(1)) <= 2 else match.group(1)
+    start, end = int(match.group(2).replace(',', '')), int(match.group(3).replace(',', ''))
+    if start < 1 or end < start:
+        raise ValueError(f"Coordenadas inválidas: {region}. O início deve ser >= 1 e menor ou igual ao fim.")
+    return chrom, start, end
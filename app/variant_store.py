@@ -0,0 +1,207 @@
+"""
+Armazenamento offline de variantes em arquivos mapeados em memória (mmap).
+
+Estrutura do diretório gerado pelo importador:
+    index.bin  MAGIC | contagem (uint64) | rsIDs numéricos ordenados (uint64[]) | offsets (uint64[])
+    data.bin   registros [tamanho (uint32) | JSON comprimido com zlib]
+
+Os registros são as próprias respostas de /variation/human (pops=1;phenotypes=1),
+processadas pelo mesmo caminho de parsing do cliente REST. A busca é binária
+sobre o índice mapeado (O(log n)) e os workers compartilham as páginas via page cache.
+
+Uso:
+    python -m app.variant_store build variantes.ndjson.gz /dados/variant_store
+    python -m app.variant_store get /dados/variant_store rs699
+"""
+import argparse
+import gzip
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"DASAVST1"
+HEADER = struct.Struct("<8sQ")
+RECORD_LEN = struct.Struct("<I")
+
+
+def rsid_number(rsid: str):
+    """'rs699' -> 699 (None para identificadores fora do padrão)."""
+    rsid = rsid.strip().lower()
+    if rsid.startswith("rs") and rsid[2:].isdigit():
+        return int(rsid[2:])
+    return None
+
+
+def iter_records(path: str):
+    """
+    Lê NDJSON (opcionalmente .gz) com respostas de /variation/human.
+    Aceita um objeto por linha (com 'name') ou linhas no formato do POST em lote
+    ({"rs1": {...}, "rs2": {...}}). Exportações do dbSNP devem ser convertidas
+    previamente para esse mesmo esquema.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as handle:
+        for line_no, line in enumerate(handle, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning("Linha %s ignorada (JSON inválido): %s", line_no, e)
+                continue
+            if "name" in obj or "mappings" in obj:
+                yield obj.get("name") or obj.get("id"), obj
+            else:
+                for key, value in obj.items():
+                    if isinstance(value, dict):
+                        yield value.get("name", key), value
+
+
+def build_store(source: str, output_dir: str, level: int = 6) -> int:
+    """Importa o NDJSON e grava index.bin/data.bin. Retorna o total de variantes."""
+    os.makedirs(output_dir, exist_ok=True)
+    keys, offsets = array("Q"), array("Q")
+    data_path = os.path.join(output_dir, "data.bin")
+
+    with open(data_path + ".tmp", "wb") as data_file:
+        offset = 0
+        for name, record in iter_records(source):
+            number = rsid_number(str(name or ""))
+            if number is None:
+                continue
+            blob = zlib.compress(json.dumps(record, separators=(",", ":")).encode(), level)
+            data_file.write(RECORD_LEN.pack(len(blob)))
+            data_file.write(blob)
+            keys.append(number)
+            offsets.append(offset)
+            offset += RECORD_LEN.size + len(blob)
+
+    # Ordenação pelo número do rsID; em duplicatas prevalece o último registro lido
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    sorted_keys, sorted_offsets = array("Q"), array("Q")
+    for i in order:
+        if sorted_keys and sorted_keys[-1] == keys[i]:
+            sorted_offsets[-1] = max(sorted_offsets[-1], offsets[i])
+            continue
+        sorted_keys.append(keys[i])
+        sorted_offsets.append(offsets[i])
+
+    index_path = os.path.join(output_dir, "index.bin")
+    with open(index_path + ".tmp", "wb") as index_file:
+        index_file.write(HEADER.pack(MAGIC, len(sorted_keys)))
+        index_file.write(sorted_keys.tobytes())
+        index_file.write(sorted_offsets.tobytes())
+
+    # Troca atômica: workers em execução continuam com a versão já mapeada
+    os.replace(data_path + ".tmp", data_path)
+    os.replace(index_path + ".tmp", index_path)
+    return len(sorted_keys)
+
+
+class VariantStore:
+    """
+    Leitor somente-leitura do armazenamento offline.
+    Índice e dados ficam mapeados (mmap); nenhuma cópia do conjunto é feita por worker.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "index.bin"), "rb") as handle:
+            self._index_map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(os.path.join(directory, "data.bin"), "rb") as handle:
+            self._data_map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count = HEADER.unpack_from(self._index_map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Arquivo de índice inválido em {directory}")
+        self.count = count
+        view = memoryview(self._index_map)
+        start = HEADER.size
+        self._keys = view[start:start + 8 * count].cast("Q")
+        self._offsets = view[start + 8 * count:start + 16 * count].cast("Q")
+        self._data = memoryview(self._data_map)
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, rsid: str) -> bool:
+        return self._locate(rsid) is not None
+
+    def _locate(self, rsid: str):
+        number = rsid_number(rsid)
+        if number is None:
+            return None
+        i = bisect_left(self._keys, number)
+        if i < self.count and self._keys[i] == number:
+            return self._offsets[i]
+        return None
+
+    def get_raw(self, rsid: str):
+        """Registro comprimido como memoryview sobre o mmap (sem cópia), ou None."""
+        offset = self._locate(rsid)
+        if offset is None:
+            return None
+        (length,) = RECORD_LEN.unpack_from(self._data, offset)
+        start = offset + RECORD_LEN.size
+        return self._data[start:start + length]
+
+    def get(self, rsid: str):
+        """Payload de /variation/human para o rsID, ou None se ausente."""
+        raw = self.get_raw(rsid)
+        if raw is None:
+            return None
+        return json.loads(zlib.decompress(raw))
+
+
+def open_configured_store(directory: str):
+    """Abre o armazenamento configurado em Config.VARIANT_STORE_DIR (ou None)."""
+    if not directory:
+        return None
+    try:
+        store = VariantStore(directory)
+        logger.info("Armazenamento offline de variantes carregado: %s variantes em %s", len(store), directory)
+        return store
+    except Exception as e:
+        logger.error("Falha ao abrir o armazenamento offline %s; usando apenas a API REST: %s", directory, e)
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Armazenamento offline de variantes (mmap)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Importa NDJSON de /variation/human")
+    build.add_argument("source", help="Arquivo NDJSON (opcionalmente .gz)")
+    build.add_argument("output", help="Diretório de saída")
+    build.add_argument("--level", type=int, default=6, help="Nível de compressão zlib (0-9)")
+
+    get = sub.add_parser("get", help="Consulta um rsID no armazenamento")
+    get.add_argument("directory", help="Diretório do armazenamento")
+    get.add_argument("rsid", help="Identificador (ex.: rs699)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        total = build_store(args.source, args.output, args.level)
+        print(f"{total} variantes gravadas em {args.output}")
+        return 0
+
+    record = VariantStore(args.directory).get(args.rsid)
+    if record is None:
+        print(f"{args.rsid} não encontrado", file=sys.stderr)
+        return 1
+    print(json.dumps(record, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Aquecimento do cache na inicialização (warm-up).
+
+Pré-carrega os rsIDs mais consultados, extraídos do histórico em logs/app.log
+("Iniciando integração de dados para: ..."), e/ou de uma lista semente
+(Config.WARMUP_RSIDS). Roda em uma thread de fundo com prazo máximo
+(Config.WARMUP_TIMEOUT), sem atrasar o health check.
+"""
+import glob
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from .config import Config
+from .utils import clean_rsid
+
+logger = logging.getLogger(__name__)
+
+# Mensagem registrada por EnsemblClient.get_variant_data a cada consulta individual
+ACCESS_PATTERN = re.compile(r"Iniciando integração de dados para: (rs\d+)", re.IGNORECASE)
+
+# Estado exposto em /health
+status = {"state": "idle", "requested": 0, "loaded": 0, "elapsed": 0.0}
+_status_lock = threading.Lock()
+
+
+def _set_status(**values):
+    with _status_lock:
+        status.update(values)
+
+
+def top_requested(log_file: str, limit: int) -> list:
+    """
+    rsIDs mais consultados no log atual e nos arquivos rotacionados (app.log.1, ...).
+    Vale para os formatos texto e JSON (a mensagem é gravada sem escapes).
+    """
+    counts = Counter()
+    for path in sorted(glob.glob(f"{glob.escape(log_file)}*")):
+        try:
+            with open(path, encoding="utf-8", errors="replace") as handle:
+                for line in handle:
+                    match = ACCESS_PATTERN.search(line)
+                    if match:
+                        counts[match.group(1).lower()] += 1
+        except OSError as e:
+            logger.warning("Histórico de acesso indisponível em %s: %s", path, e)
+    return [rsid for rsid, _ in counts.most_common(limit)]
+
+
+def warmup_candidates() -> list:
+    """Lista semente (prioritária) seguida dos mais consultados, sem repetições, até WARMUP_TOP_N."""
+    seeds = []
+    for raw in Config.WARMUP_RSIDS.split(","):
+        if raw.strip():
+            try:
+                seeds.append(clean_rsid(raw))
+            except ValueError as e:
+                logger.warning("Semente de warm-up ignorada: %s", e)
+
+    candidates = list(dict.fromkeys(seeds + top_requested(Config.LOG_FILE, Config.WARMUP_TOP_N)))
+    return candidates[:Config.WARMUP_TOP_N]
+
+
+def run_warmup(client, rsids: list, timeout: float) -> int:
+    """
+    Carrega os rsIDs no cache em blocos do POST em lote, até o prazo `timeout`.
+    Cada bloco roda no AsyncBridge limitado ao tempo restante: esgotado o prazo,
+    a consulta em andamento é cancelada. Retorna o total de variantes carregadas.
+    """
+    from .async_core import AsyncEnsemblClient, bridge
+
+    async_client = AsyncEnsemblClient(client)
+    started = time.monotonic()
+    loaded = 0
+    _set_status(state="running", requested=len(rsids), loaded=0, elapsed=0.0)
+
+    for i in range(0, len(rsids), Config.BATCH_SIZE):
+        remaining = timeout - (time.monotonic() - started)
+        try:
+            if remaining <= 0:
+                raise TimeoutError
+            results, _ = bridge.run(async_client.get_variants_data(rsids[i:i + Config.BATCH_SIZE]), remaining)
+        except TimeoutError:
+            _set_status(state="timeout", elapsed=round(time.monotonic() - started, 3))
+            logger.warning("Warm-up interrompido pelo prazo de %ss (%s/%s variantes)", timeout, loaded, len(rsids))
+            return loaded
+        loaded += len(results)
+        _set_status(loaded=loaded, elapsed=round(time.monotonic() - started, 3))
+
+    _set_status(state="done", elapsed=round(time.monotonic() - started, 3))
+    logger.info("Warm-up concluído: %s/%s variantes em cache", loaded, len(rsids))
+    return loaded
+
+
+def _warmup_worker(client):
+    try:
+        rsids = warmup_candidates() if client.cache else []
+        if not rsids:
+            _set_status(state="done")
+            return
+
+        # Apenas um worker do Gunicorn aquece o cache compartilhado por vez
+        lock = client.flights.lock if client.flights else None
+        token = lock.acquire("__warmup__") if lock else ""
+        if token is None:
+            _set_status(state="skipped")
+            return
+        try:
+            run_warmup(client, rsids, Config.WARMUP_TIMEOUT)
+        finally:
+            if token:
+                lock.release("__warmup__", token)
+    except Exception as e:
+        _set_status(state="failed")
+        logger.error("Falha no warm-up do cache: %s", e)
+
+
+def start_warmup(client) -> threading.Thread:
+    """Dispara o warm-up em uma thread de fundo (daemon) e retorna imediatamente."""
+    thread = threading.Thread(target=_warmup_worker, args=(client,), name="cache-warmup", daemon=True)
+    thread.start()
+    return thread
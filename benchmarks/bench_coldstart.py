@@ -0,0 +1,125 @@
+"""
+Cold start: tempo de importação e tempo até a primeira resposta.
+
+Cada execução sobe um processo Python novo (cache e logs em diretórios
+temporários) que importa app.main e atende em uma porta local; o processo pai
+mede, a partir do spawn:
+
+- import_ms:       importação de app.main (inclui create_app), medida no filho
+- ready_ms:        primeira resposta 200 do /health
+- first_variant_ms: primeira resposta de /api/variant/rs699 (Ensembl local, sem latência)
+
+Os perfis 'default' e 'fast' (STARTUP_PROFILE) são medidos em sequência e o
+resultado é a mediana das execuções.
+
+Uso:
+    python -m benchmarks.bench_coldstart --runs 5
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+# O processo filho reutiliza este módulo: só a biblioteca padrão é importada no topo,
+# para não antecipar dependências da aplicação (requests, http.server) na medição
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILES = ("default", "fast")
+
+
+def serve(port: int):
+    """Processo filho: importa a aplicação, informa o tempo de importação e atende."""
+    started = time.perf_counter()
+    from app.main import app
+    import_ms = (time.perf_counter() - started) * 1000
+    print(json.dumps({"import_ms": import_ms}), flush=True)
+
+    from werkzeug.serving import make_server
+    make_server("127.0.0.1", port, app, threaded=True).serve_forever()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ok(url: str, deadline: float) -> float:
+    """Repete a requisição até o primeiro 200; retorna o instante (perf_counter) da resposta."""
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                if response.status == 200:
+                    return time.perf_counter()
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.002)
+    raise TimeoutError(f"Sem resposta de {url}")
+
+
+def measure(profile: str, ensembl_url: str, timeout: float = 30.0) -> dict:
+    port = _free_port()
+    with tempfile.TemporaryDirectory(prefix="dasa-coldstart-") as workdir:
+        env = dict(
+            os.environ,
+            STARTUP_PROFILE=profile,
+            CACHE_DIR=os.path.join(workdir, "cache"),
+            LOG_DIR=os.path.join(workdir, "logs"),
+            ENSEMBL_BASE_URL=ensembl_url,
+            WARMUP_ENABLED="False",
+            RATE_LIMIT_ENABLED="False",
+        )
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.bench_coldstart", "--serve", str(port)],
+            cwd=ROOT_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        )
+        try:
+            base = f"http://127.0.0.1:{port}"
+            ready = _wait_ok(f"{base}/health", started + timeout)
+            first_variant = _wait_ok(f"{base}/api/variant/rs699", started + timeout)
+            child = json.loads(process.stdout.readline())
+        finally:
+            process.kill()
+            process.wait()
+    return {
+        "import_ms": child["import_ms"],
+        "ready_ms": (ready - started) * 1000,
+        "first_variant_ms": (first_variant - started) * 1000,
+    }
+
+
+def run(runs: int = 5) -> dict:
+    """Retorna {métrica: {"value", "unit", "better"}} no formato dos baselines (medianas)."""
+    from tests.ensembl_standin import EnsemblStandin
+
+    metrics = {}
+    with EnsemblStandin(seed=0) as standin:
+        for profile in PROFILES:
+            samples = [measure(profile, standin.url) for _ in range(runs)]
+            for name in samples[0]:
+                value = statistics.median(sample[name] for sample in samples)
+                metrics[f"coldstart.{profile}.{name}"] = {"value": round(value, 3), "unit": "ms", "better": "lower"}
+    return metrics
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tempo de importação e de primeira resposta (cold start)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--serve", type=int, metavar="PORTA", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        return serve(args.serve)
+    for name, metric in run(args.runs).items():
+        print(f"{name:<40}{metric['value']:>12.1f} {metric['unit']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Micro-benchmark: resolução de populações (get_coords).
+
+Compara a varredura linear original de POP_COORDS com o PopulationRegistry
+pré-indexado (com e sem memoização).
+
+Uso:
+    python -m benchmarks.bench_coords
+"""
+import timeit
+from app.coordinates import POP_COORDS, PopulationRegistry
+
+# Nomes no formato retornado pelo Ensembl para uma variante típica (ex.: rs699)
+SAMPLE_NAMES = [
+    "1000GENOMES:phase_3:ALL", "1000GENOMES:phase_3:AFR", "1000GENOMES:phase_3:AMR",
+    "1000GENOMES:phase_3:EAS", "1000GENOMES:phase_3:EUR", "1000GENOMES:phase_3:SAS",
+    "1000GENOMES:phase_3:YRI", "1000GENOMES:phase_3:LWK", "1000GENOMES:phase_3:GWD",
+    "1000GENOMES:phase_3:MSL", "1000GENOMES:phase_3:ESN", "1000GENOMES:phase_3:ASW",
+    "1000GENOMES:phase_3:ACB", "1000GENOMES:phase_3:MXL", "1000GENOMES:phase_3:PUR",
+    "1000GENOMES:phase_3:CLM", "1000GENOMES:phase_3:PEL", "1000GENOMES:phase_3:CHB",
+    "1000GENOMES:phase_3:JPT", "1000GENOMES:phase_3:CHS", "1000GENOMES:phase_3:CDX",
+    "1000GENOMES:phase_3:KHV", "1000GENOMES:phase_3:CEU", "1000GENOMES:phase_3:TSI",
+    "1000GENOMES:phase_3:FIN", "1000GENOMES:phase_3:GBR", "1000GENOMES:phase_3:IBS",
+    "1000GENOMES:phase_3:GIH", "1000GENOMES:phase_3:PJL", "1000GENOMES:phase_3:BEB",
+    "1000GENOMES:phase_3:STU", "1000GENOMES:phase_3:ITU",
+    "gnomADg:afr", "gnomADg:ami", "gnomADg:amr", "gnomADg:asj", "gnomADg:eas",
+    "gnomADg:fin", "gnomADg:mid", "gnomADg:nfe", "gnomADg:sas", "gnomADg:remaining",
+    "gnomADe:afr", "gnomADe:amr", "gnomADe:asj", "gnomADe:eas", "gnomADe:fin",
+    "gnomADe:nfe", "gnomADe:sas", "gnomADe:remaining",
+    "ALFA:SAMN10492695", "ALFA:SAMN10492696", "ALFA:SAMN10492697", "ALFA:SAMN10492698",
+    "ALFA:SAMN10492699", "ALFA:SAMN10492700", "ALFA:SAMN10492701", "ALFA:SAMN10492702",
+    "ALFA:SAMN10492703", "ALFA:SAMN10492704", "ALFA:SAMN11605645",
+    "GEM-J", "ALSPAC", "TWINSUK", "TOPMed", "ESP6500:AA", "ESP6500:EA",
+    "GGVP:GWF", "GGVP:GWJ", "GGVP:GWW", "GGVP:GWD",
+]
+
+
+def legacy_get_coords(pop_name):
+    """Implementação original: busca exata seguida de varredura de todas as chaves."""
+    if pop_name in POP_COORDS:
+        return POP_COORDS[pop_name]
+    for key in POP_COORDS:
+        if f":{key}" in pop_name or f"_{key}" in pop_name:
+            return POP_COORDS[key]
+    return {"lat": 0.0, "lon": 0.0, "label": pop_name, "is_region": True}
+
+
+def run(number: int = 2000) -> dict:
+    registry = PopulationRegistry(POP_COORDS)
+
+    def legacy():
+        for name in SAMPLE_NAMES:
+            legacy_get_coords(name)
+
+    def indexed():
+        for name in SAMPLE_NAMES:
+            registry.match(name)
+
+    def memoized():
+        for name in SAMPLE_NAMES:
+            registry.resolve(name)
+
+    results = {}
+    for label, func in (("legacy_scan", legacy), ("token_index", indexed), ("memoized", memoized)):
+        seconds = min(timeit.repeat(func, number=number, repeat=3))
+        results[label] = seconds / (number * len(SAMPLE_NAMES)) * 1e6
+    return results
+
+
+if __name__ == "__main__":
+    results = run()
+    baseline = results["legacy_scan"]
+    print(f"{'estratégia':<14}{'µs/nome':>10}{'speedup':>10}")
+    for label, micros in results.items():
+        print(f"{label:<14}{micros:>10.3f}{baseline / micros:>9.1f}x")
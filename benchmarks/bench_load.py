@@ -0,0 +1,110 @@
+"""
+Benchmark de carga ponta a ponta: GET /api/variant/<rsid> sob concorrência.
+
+A aplicação roda em processo (servidor WSGI com threads) apontada para o
+Ensembl local (tests/ensembl_standin.py) com latência injetada. Mede vazão e
+latências p50/p95/p99 em dois cenários: cache frio (toda consulta vai ao
+Ensembl) e cache quente (mesmos rsIDs novamente).
+
+Uso:
+    python -m benchmarks.bench_load --concurrency 16 --variants 400 --latency 0.02
+"""
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Ambiente isolado antes da importação da aplicação
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="dasa-bench-"))
+os.environ.setdefault("WARMUP_ENABLED", "False")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "False")
+
+import requests
+from werkzeug.serving import make_server
+from tests.ensembl_standin import EnsemblStandin, FixtureRepository
+
+
+def _percentile(samples: list, q: int) -> float:
+    return statistics.quantiles(samples, n=100, method="inclusive")[q - 1]
+
+
+def _load(url: str, rsids: list, concurrency: int) -> dict:
+    """Dispara uma requisição por rsID com `concurrency` clientes simultâneos."""
+    local = threading.local()
+    latencies, failures = [], []
+
+    def fetch(rsid):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        started = time.perf_counter()
+        response = session.get(f"{url}/api/variant/{rsid}", timeout=30)
+        elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            failures.append(rsid)
+        latencies.append(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(fetch, rsids))
+    wall = time.perf_counter() - started
+
+    return {
+        "throughput_rps": len(rsids) / wall,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "errors": len(failures),
+    }
+
+
+def run(concurrency: int = 16, variants: int = 400, latency: float = 0.02) -> dict:
+    """Retorna {métrica: {"value", "unit", "better"}} no formato dos baselines."""
+    from app.main import app
+    from app.routes import async_client, client
+
+    # Sem logs por requisição: não distorcem a medição nem o histórico usado pelo warm-up
+    app.logger.setLevel(logging.WARNING)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    standin = EnsemblStandin(fixtures=FixtureRepository(synthetic=True), seed=0, latency=latency).start()
+    client.base_url = async_client.base_url = standin.url
+    client.limiter = None
+    if client.cache:
+        client.cache.clear()
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+
+    rsids = [f"rs{1000 + i}" for i in range(variants)]
+    metrics = {}
+    try:
+        for scenario in ("cold", "warm"):
+            for name, value in _load(url, rsids, concurrency).items():
+                better = "higher" if name == "throughput_rps" else "lower"
+                unit = "req/s" if name == "throughput_rps" else ("ms" if name.endswith("_ms") else "count")
+                metrics[f"load.{scenario}.{name}"] = {"value": round(value, 3), "unit": unit, "better": better}
+    finally:
+        server.shutdown()
+        standin.stop()
+    return metrics
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de carga de /api/variant/<rsid>")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--variants", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.02, help="Latência injetada no Ensembl local (s)")
+    args = parser.parse_args(argv)
+
+    for name, metric in run(args.concurrency, args.variants, args.latency).items():
+        print(f"{name:<30}{metric['value']:>12.3f} {metric['unit']}")
+
+
+if __name__ == "__main__":
+    main()
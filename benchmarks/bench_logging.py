@@ -0,0 +1,138 @@
+"""
+Custo do logging na latência das requisições.
+
+Mede GET /api/variant/rs699 com o cache quente (cada requisição registra uma
+linha INFO) em quatro modos:
+
+- disabled:   logger acima de INFO (referência sem logs)
+- sync:       RotatingFileHandler direto no logger (configuração anterior)
+- queue_text: pipeline em fila (app/log_pipeline.py), formato texto
+- queue_json: pipeline em fila, formato JSON
+
+Uso:
+    python -m benchmarks.bench_logging --requests 3000 --concurrency 8
+"""
+import argparse
+import logging
+import os
+import queue
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueListener, RotatingFileHandler
+
+# Ambiente isolado antes da importação da aplicação
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="dasa-bench-"))
+os.environ.setdefault("WARMUP_ENABLED", "False")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "False")
+
+from tests.ensembl_standin import EnsemblStandin
+
+MODES = ("disabled", "sync", "queue_text", "queue_json")
+
+
+def _attach(logger: logging.Logger, mode: str, log_file: str):
+    """Configura o logger para o modo e retorna a função que desfaz a configuração."""
+    from app.log_pipeline import TEXT_FORMAT, DeferredQueueHandler, JsonFormatter
+
+    if mode == "disabled":
+        logger.setLevel(logging.WARNING)
+        return lambda: None
+
+    logger.setLevel(logging.INFO)
+    file_handler = RotatingFileHandler(log_file, maxBytes=1024 * 1024, backupCount=5, encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter() if mode == "queue_json" else logging.Formatter(TEXT_FORMAT))
+
+    if mode == "sync":
+        logger.addHandler(file_handler)
+
+        def detach():
+            logger.removeHandler(file_handler)
+            file_handler.close()
+        return detach
+
+    log_queue = queue.SimpleQueue()
+    handler = DeferredQueueHandler(log_queue)
+    listener = QueueListener(log_queue, file_handler)
+    listener.start()
+    logger.addHandler(handler)
+
+    def detach():
+        logger.removeHandler(handler)
+        listener.stop()
+        file_handler.close()
+    return detach
+
+
+def _measure(app, total: int, concurrency: int) -> list:
+    local = threading.local()
+    latencies = []
+
+    def fetch(_):
+        test_client = getattr(local, "client", None)
+        if test_client is None:
+            test_client = local.client = app.test_client()
+        started = time.perf_counter()
+        response = test_client.get("/api/variant/rs699")
+        latencies.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.status_code
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(fetch, range(total)))
+    return latencies
+
+
+def run(total: int = 3000, concurrency: int = 8) -> dict:
+    """Retorna {modo: {"p50_us", "p95_us", "mean_us", "overhead_pct"}}."""
+    from app.log_pipeline import stop_logging
+    from app.main import app
+    from app.routes import async_client, client
+
+    standin = EnsemblStandin(seed=0).start()
+    client.base_url = async_client.base_url = standin.url
+    client.limiter = None
+    # O pipeline da aplicação escreveria em logs/app.log; cada modo usa seu próprio arquivo
+    stop_logging()
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="dasa-bench-logs-") as log_dir:
+        try:
+            app.test_client().get("/api/variant/rs699")  # aquece o cache
+            for mode in MODES:
+                detach = _attach(app.logger, mode, os.path.join(log_dir, f"{mode}.log"))
+                try:
+                    _measure(app, min(total, 200), concurrency)  # aquecimento do modo
+                    latencies = _measure(app, total, concurrency)
+                finally:
+                    detach()
+                results[mode] = {
+                    "p50_us": statistics.median(latencies) * 1e6,
+                    "p95_us": statistics.quantiles(latencies, n=100, method="inclusive")[94] * 1e6,
+                    "mean_us": statistics.fmean(latencies) * 1e6,
+                }
+        finally:
+            standin.stop()
+
+    reference = results["disabled"]["mean_us"]
+    for metrics in results.values():
+        metrics["overhead_pct"] = (metrics["mean_us"] / reference - 1) * 100 if reference else 0.0
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latência das requisições com e sem logging")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    print(f"{'modo':<14}{'p50 (µs)':>12}{'p95 (µs)':>12}{'média (µs)':>12}{'overhead':>10}")
+    for mode, metrics in run(args.requests, args.concurrency).items():
+        print(f"{mode:<14}{metrics['p50_us']:>12.1f}{metrics['p95_us']:>12.1f}"
+              f"{metrics['mean_us']:>12.1f}{metrics['overhead_pct']:>+9.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Micro-benchmarks dos estágios de uma consulta: parsing do payload do Ensembl,
+resolução de populações (get_coords) e serialização da resposta.
+
+Uso:
+    python -m benchmarks.bench_stages
+"""
+import json
+import os
+import timeit
+from app.coordinates import PopulationRegistry, POP_COORDS
+from app.core import collect_genes, parse_variant
+from app.serialization import EncodedPayload
+from benchmarks.bench_coords import SAMPLE_NAMES
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "tests", "fixtures", "ensembl", "variation", "rs699.json")
+
+
+def _best(func, number: int) -> float:
+    """Melhor média (µs por chamada) em 3 repetições."""
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e6
+
+
+def run(number: int = 2000) -> dict:
+    """Retorna {métrica: {"value", "unit", "better"}} no formato dos baselines."""
+    with open(FIXTURE, encoding="utf-8") as handle:
+        data = json.load(handle)
+    registry = PopulationRegistry(POP_COORDS)
+    variant = parse_variant(data, "rs699", collect_genes(data))
+
+    def coords():
+        registry.match(SAMPLE_NAMES[coords.i % len(SAMPLE_NAMES)])
+        coords.i += 1
+    coords.i = 0
+
+    stages = {
+        "parse_variant": lambda: parse_variant(data, "rs699", collect_genes(data)),
+        "get_coords": coords,
+        "serialize": lambda: EncodedPayload.from_model(variant),
+        "serialize_gzip": lambda: EncodedPayload.from_model(variant).encoded("gzip"),
+    }
+    return {
+        f"stage.{name}_us": {"value": round(_best(func, number), 3), "unit": "µs", "better": "lower"}
+        for name, func in stages.items()
+    }
+
+
+if __name__ == "__main__":
+    for name, metric in run().items():
+        print(f"{name:<28}{metric['value']:>10.3f} {metric['unit']}")
@@ -0,0 +1,122 @@
+"""
+Suíte de benchmarks com baseline local.
+
+Executa o benchmark de carga (bench_load), os micro-benchmarks de estágios
+(bench_stages) e a medição de cold start (bench_coldstart), grava os resultados
+em JSON e compara com o baseline: métricas piores que a tolerância encerram a
+execução com código 1.
+
+Os tempos são absolutos e só fazem sentido na máquina em que foram medidos, por
+isso o baseline não é versionado: fica em benchmarks/results/baseline.json
+(ignorado pelo git) e é gravado por `--update` (ou na primeira execução).
+
+Uso:
+    python -m benchmarks.run --update              # grava o baseline desta máquina
+    python -m benchmarks.run                       # compara com o baseline local
+    python -m benchmarks.run --tolerance 0.5 --output resultados.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+# bench_load prepara o ambiente (cache temporário, sem warm-up) antes de importar a aplicação
+from benchmarks import bench_load
+from benchmarks import bench_coldstart
+from benchmarks import bench_stages
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, "results", "baseline.json")
+RESULTS_PATH = os.path.join(BENCH_DIR, "results", "latest.json")
+
+
+def collect(args) -> dict:
+    metrics = {}
+    metrics.update(bench_stages.run(args.number))
+    metrics.update(bench_load.run(args.concurrency, args.variants, args.latency))
+    metrics.update(bench_coldstart.run(args.runs))
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "host": platform.node(),
+        "params": {
+            "number": args.number, "concurrency": args.concurrency,
+            "variants": args.variants, "latency": args.latency, "runs": args.runs
+        },
+        "metrics": metrics,
+    }
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list:
+    """Retorna as linhas do relatório como (métrica, baseline, atual, variação, regressão)."""
+    rows = []
+    for name, metric in current["metrics"].items():
+        reference = baseline["metrics"].get(name)
+        if reference is None:
+            rows.append((name, None, metric["value"], None, False))
+            continue
+        base, value = reference["value"], metric["value"]
+        change = (value - base) / base if base else (0.0 if value == base else float("inf"))
+        if metric["better"] == "higher":
+            regressed = value < base * (1 - tolerance)
+        else:
+            regressed = value > base * (1 + tolerance)
+        rows.append((name, base, value, change, regressed))
+    return rows
+
+
+def write_json(path: str, payload: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle, indent=2, ensure_ascii=False)
+        handle.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks com detecção de regressões")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Piora relativa aceita (0.3 = 30%%)")
+    parser.add_argument("--update", "--update-baseline", dest="update", action="store_true",
+                        help="Grava o resultado como baseline local")
+    parser.add_argument("--number", type=int, default=2000, help="Iterações por micro-benchmark")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--variants", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--runs", type=int, default=5, help="Execuções do cold start (mediana)")
+    args = parser.parse_args(argv)
+
+    current = collect(args)
+    write_json(args.output, current)
+
+    if args.update or not os.path.exists(args.baseline):
+        write_json(args.baseline, current)
+        print(f"Baseline local gravado em {args.baseline}")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    if baseline.get("params") != current["params"]:
+        print("Aviso: parâmetros diferentes dos usados no baseline", file=sys.stderr)
+    if any(baseline.get(key) != current[key] for key in ("host", "machine", "python")):
+        print("Aviso: baseline gravado em outro ambiente; regrave com --update nesta máquina", file=sys.stderr)
+
+    rows = compare(baseline, current, args.tolerance)
+    print(f"{'métrica':<40}{'baseline':>12}{'atual':>12}{'variação':>10}")
+    for name, base, value, change, regressed in rows:
+        base_str = f"{base:>12.3f}" if base is not None else f"{'-':>12}"
+        change_str = f"{change:>+9.1%}" if change is not None else f"{'novo':>9}"
+        print(f"{name:<40}{base_str}{value:>12.3f}{change_str}{'  REGRESSÃO' if regressed else ''}")
+
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"{len(regressions)} regressão(ões) acima de {args.tolerance:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Configuração do Gunicorn (gunicorn -c gunicorn.conf.py app.main:app).
+
+O master abre o LogServer em um socket Unix e exporta LOG_SOCKET para os
+workers: cada worker apenas encaminha seus registros, e a escrita e a rotação
+do logs/app.log acontecem uma única vez, no master.
+
+Ao fim de cada worker, o master consolida os contadores do snapshot de
+métricas dele (ver app.metrics.SnapshotStore.retire).
+
+Com PRELOAD_APP=true a aplicação (cliente Ensembl, validadores, índices) é
+criada uma vez no master e os workers a herdam por copy-on-write; o warm-up do
+cache é disparado após o fork.
+"""
+import gc
+import os
+import tempfile
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("GUNICORN_WORKERS", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+preload_app = os.environ.get("PRELOAD_APP", "False").lower() == "true"
+
+
+def on_starting(server):
+    from app.log_pipeline import forward_to_server, start_log_server
+    from app.metrics import store
+
+    # Snapshots de métricas de uma execução anterior entram no total consolidado
+    store.retire_dead()
+
+    path = os.environ.get("LOG_SOCKET") or os.path.join(tempfile.gettempdir(), f"dasa-log-{os.getpid()}.sock")
+    os.environ["LOG_SOCKET"] = path
+    server.log_server = start_log_server(path)
+    # Com preload_app a aplicação já configurou os logs no master: passa a usar o LogServer
+    forward_to_server()
+    server.log.info("Logs da aplicação centralizados no master via %s", path)
+
+
+def when_ready(server):
+    if preload_app:
+        # Objetos da aplicação pré-carregada saem do GC: as coletas nos workers
+        # não tocam nessas páginas, preservando o compartilhamento copy-on-write
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    from app.config import Config
+
+    if preload_app and Config.WARMUP_ENABLED:
+        from app.routes import get_clients
+        from app.warmup import start_warmup
+        start_warmup(get_clients()[0])
+
+
+def worker_exit(server, worker):
+    from app.metrics import store
+
+    # Últimos valores desde o flush periódico
+    store.flush(force=True)
+
+
+def child_exit(server, worker):
+    from app.metrics import store
+
+    # O PID do worker encerrado pode ser reutilizado: seus contadores vão para o snapshot "retired"
+    store.retire(worker.pid)
+
+
+def on_exit(server):
+    log_server = getattr(server, "log_server", None)
+    if log_server is not None:
+        log_server.stop()
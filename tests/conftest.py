@@ -0,0 +1,39 @@
+import os
+import tempfile
+import pytest
+from tests.ensembl_standin import EnsemblStandin
+
+# Diretório de cache isolado por sessão de testes (antes da importação da app)
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="dasa-cache-"))
+# Sem warm-up automático: os testes controlam as consultas ao Ensembl
+os.environ.setdefault("WARMUP_ENABLED", "False")
+
+# Ensembl local com as fixtures gravadas (ENSEMBL_BASE_URL explícito usa a API real)
+standin = EnsemblStandin(seed=0).start()
+os.environ.setdefault("ENSEMBL_BASE_URL", standin.url)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    standin.stop()
+
+
+@pytest.fixture
+def ensembl():
+    """Servidor substituto do Ensembl, com falhas e contadores zerados ao final do teste."""
+    yield standin
+    standin.reset()
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    """Garante que cada teste parta de um cache vazio."""
+    from app.routes import client
+    if client.cache:
+        client.cache.clear()
+    if client.region_tiles:
+        client.region_tiles.clear()
+    if client.negative:
+        client.negative.clear()
+    if client.breaker:
+        client.breaker.reset()
+    yield
@@ -0,0 +1,320 @@
+"""
+Servidor local que substitui a API REST do Ensembl em testes e benchmarks.
+
+Reproduz fixtures gravadas de /variation/human (GET individual e POST em lote)
+e /overlap/region (feature=gene e feature=variation), com injeção de latência, erros 5xx, respostas 429 e timeouts.
+Aponte a aplicação para ele com ENSEMBL_BASE_URL.
+
+Uso:
+    python -m tests.ensembl_standin --port 8081 --latency 0.05 --rate-limit-rate 0.1 --synthetic
+
+Controle em tempo de execução:
+    POST /__standin__/faults  {"error_rate": 0.2}   (altera a injeção de falhas)
+    GET  /__standin__/stats                          (contadores de requisições)
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "ensembl")
+
+REGION_PATTERN = re.compile(r"^/overlap/region/human/([^:/]+):(\d+)(?:-|\.\.)(\d+)$")
+RSID_PATTERN = re.compile(r"^rs(\d+)$", re.IGNORECASE)
+# Modo sintético: uma variante a cada SYNTHETIC_SPACING bases no /overlap/region (feature=variation)
+SYNTHETIC_SPACING = 1000
+
+
+@dataclass
+class Faults:
+    """Parâmetros de injeção de falhas (taxas entre 0 e 1)."""
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    timeout_rate: float = 0.0
+    timeout_seconds: float = 30.0
+    retry_after: float = 1.0
+
+
+class FixtureRepository:
+    """
+    Fixtures em disco: variation/<rsid>.json e overlap/<cromossomo>.json.
+    No modo sintético, rsIDs sem fixture são gerados a partir do modelo (rs699),
+    alternando variantes com genes próprios e variantes que dependem de Overlap.
+    """
+
+    def __init__(self, directory: str = FIXTURES_DIR, synthetic: bool = False, template: str = "rs699"):
+        self.synthetic = synthetic
+        self.variants = {}
+        self.genes = {}
+        variation_dir = os.path.join(directory, "variation")
+        for name in sorted(os.listdir(variation_dir)):
+            if name.endswith(".json"):
+                with open(os.path.join(variation_dir, name), encoding="utf-8") as handle:
+                    self.variants[name[:-5].lower()] = json.load(handle)
+        overlap_dir = os.path.join(directory, "overlap")
+        for name in sorted(os.listdir(overlap_dir)):
+            if name.endswith(".json"):
+                with open(os.path.join(overlap_dir, name), encoding="utf-8") as handle:
+                    self.genes[name[:-5]] = json.load(handle)
+        self.template = self.variants.get(template)
+
+    def variant(self, rsid: str):
+        rsid = rsid.lower()
+        data = self.variants.get(rsid)
+        if data is not None or not self.synthetic or self.template is None:
+            return data
+
+        match = RSID_PATTERN.match(rsid)
+        if not match:
+            return None
+        number = int(match.group(1))
+        data = copy.deepcopy(self.template)
+        data["name"] = rsid
+        mapping = data["mappings"][0]
+        mapping["start"] = mapping["end"] = 229_600_000 + number % 1_900_000
+        mapping["location"] = f"{mapping['seq_region_name']}:{mapping['start']}-{mapping['end']}"
+        if number % 2:
+            data["phenotypes"] = []
+        return data
+
+    def overlap(self, chrom: str, start: int, end: int) -> list:
+        return [g for g in self.genes.get(chrom, []) if g["start"] <= end and g["end"] >= start]
+
+    def variation_features(self, chrom: str, start: int, end: int) -> list:
+        """Features 'variation' do Overlap: fixtures na janela e, no modo sintético, uma grade regular."""
+        features = []
+        for data in self.variants.values():
+            mapping = (data.get("mappings") or [{}])[0]
+            if str(mapping.get("seq_region_name")) == chrom and mapping["start"] <= end and mapping["end"] >= start:
+                features.append(self._variation_feature(
+                    data["name"], chrom, mapping["start"], mapping["end"],
+                    mapping.get("allele_string", "").split("/"), data.get("most_severe_consequence")
+                ))
+        if self.synthetic:
+            first = -(-start // SYNTHETIC_SPACING) * SYNTHETIC_SPACING
+            for position in range(first, end + 1, SYNTHETIC_SPACING):
+                features.append(self._variation_feature(
+                    f"rs{position}", chrom, position, position, ["C", "T"], "intergenic_variant"
+                ))
+        return features
+
+    @staticmethod
+    def _variation_feature(name, chrom, start, end, alleles, consequence) -> dict:
+        return {
+            "id": name, "seq_region_name": chrom, "start": start, "end": end, "strand": 1,
+            "alleles": alleles, "consequence_type": consequence or "intergenic_variant",
+            "clinical_significance": [], "feature_type": "variation", "source": "dbSNP",
+            "assembly_name": "GRCh38"
+        }
+
+
+class EnsemblStandin:
+    """Servidor HTTP (thread de fundo) com as fixtures e a injeção de falhas configuradas."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, fixtures: FixtureRepository = None,
+                 seed: int = None, **faults):
+        self.fixtures = fixtures or FixtureRepository()
+        self.faults = Faults(**faults)
+        self.random = random.Random(seed)
+        self.counters = {"requests": 0, "errors": 0, "rate_limited": 0, "timeouts": 0}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def configure(self, **faults):
+        """Altera os parâmetros de falha (ex.: configure(error_rate=0.5))."""
+        with self._lock:
+            for name, value in faults.items():
+                if not hasattr(self.faults, name):
+                    raise ValueError(f"Parâmetro de falha desconhecido: {name}")
+                setattr(self.faults, name, float(value))
+
+    def reset(self):
+        with self._lock:
+            self.faults = Faults()
+            for name in self.counters:
+                self.counters[name] = 0
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _draw_fault(self):
+        """Sorteia o comportamento da requisição: None, 'timeout', 'rate_limit' ou 'error'."""
+        with self._lock:
+            faults = Faults(**asdict(self.faults))
+            roll = self.random.random()
+            delay = faults.latency + (self.random.uniform(0, faults.jitter) if faults.jitter else 0)
+        if roll < faults.timeout_rate:
+            return "timeout", faults
+        roll -= faults.timeout_rate
+        if roll < faults.rate_limit_rate:
+            return "rate_limit", faults
+        roll -= faults.rate_limit_rate
+        if roll < faults.error_rate:
+            return "error", faults
+        faults.latency = delay
+        return None, faults
+
+    def start(self) -> "EnsemblStandin":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="ensembl-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, payload, headers: dict = None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _read_body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                try:
+                    return json.loads(raw or b"{}")
+                except json.JSONDecodeError:
+                    return None
+
+            def _control(self, method: str, path: str):
+                if path == "/__standin__/stats":
+                    with standin._lock:
+                        self._send_json(200, {"counters": dict(standin.counters), "faults": asdict(standin.faults)})
+                elif path == "/__standin__/faults" and method == "POST":
+                    try:
+                        standin.configure(**(self._read_body() or {}))
+                    except (TypeError, ValueError) as e:
+                        return self._send_json(400, {"error": str(e)})
+                    self._send_json(200, asdict(standin.faults))
+                elif path == "/__standin__/reset" and method == "POST":
+                    standin.reset()
+                    self._send_json(200, {"ok": True})
+                else:
+                    self._send_json(404, {"error": "Rota de controle desconhecida"})
+
+            def _dispatch(self, method: str):
+                parts = urlsplit(self.path)
+                path = unquote(parts.path)
+                if path.startswith("/__standin__/"):
+                    return self._control(method, path)
+
+                body = self._read_body() if method == "POST" else None
+                standin._count("requests")
+                fault, faults = standin._draw_fault()
+                if fault == "timeout":
+                    standin._count("timeouts")
+                    time.sleep(faults.timeout_seconds)
+                elif fault == "rate_limit":
+                    standin._count("rate_limited")
+                    return self._send_json(429, {"error": "Too many requests"}, {
+                        "Retry-After": str(faults.retry_after), "X-RateLimit-Remaining": "0"
+                    })
+                elif fault == "error":
+                    standin._count("errors")
+                    return self._send_json(503, {"error": "Service unavailable"})
+                elif faults.latency:
+                    time.sleep(faults.latency)
+
+                if method == "POST" and path == "/variation/human":
+                    ids = body.get("ids") if isinstance(body, dict) else None
+                    if not isinstance(ids, list):
+                        return self._send_json(400, {"error": "Key 'ids' is required"})
+                    found = {}
+                    for rsid in ids:
+                        data = standin.fixtures.variant(str(rsid))
+                        if data is not None:
+                            found[str(rsid)] = data
+                    return self._send_json(200, found)
+
+                if method == "GET" and path.startswith("/variation/human/"):
+                    rsid = path.rsplit("/", 1)[-1]
+                    data = standin.fixtures.variant(rsid)
+                    if data is None:
+                        # O Ensembl responde 400 para identificadores inexistentes
+                        return self._send_json(400, {"error": f"{rsid} not found for human"})
+                    return self._send_json(200, data)
+
+                match = REGION_PATTERN.match(path)
+                if method == "GET" and match:
+                    chrom, start, end = match.group(1), int(match.group(2)), int(match.group(3))
+                    # Os parâmetros do Ensembl usam ';' ou '&' como separador
+                    query = parse_qs(parts.query.replace(";", "&"))
+                    if query.get("feature", ["gene"])[0] == "variation":
+                        return self._send_json(200, standin.fixtures.variation_features(chrom, start, end))
+                    return self._send_json(200, standin.fixtures.overlap(chrom, start, end))
+
+                self._send_json(404, {"error": f"page not found: {path}"})
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local substituto da API REST do Ensembl")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Diretório com variation/ e overlap/")
+    parser.add_argument("--synthetic", action="store_true", help="Gera variantes para rsIDs sem fixture")
+    parser.add_argument("--seed", type=int, default=None)
+    for name, default in asdict(Faults()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=float, default=default)
+    args = parser.parse_args(argv)
+
+    faults = {name: getattr(args, name) for name in asdict(Faults())}
+    standin = EnsemblStandin(
+        args.host, args.port, FixtureRepository(args.fixtures, args.synthetic), seed=args.seed, **faults
+    )
+    print(f"Ensembl stand-in em {standin.url} (ENSEMBL_BASE_URL={standin.url})")
+    try:
+        standin.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,145 @@
+import asyncio
+import time
+import pytest
+import requests
+from app.async_core import AsyncEnsemblClient, bridge, request_timeout
+from app.config import Config
+from app.core import EnsemblClient
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self._payload = payload
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.headers = {}
+        self.content = b""
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(str(self.status_code))
+
+
+VARIANT = {
+    "name": "rs1",
+    "mappings": [{"seq_region_name": "7", "start": 500, "end": 500, "allele_string": "C/T"}],
+    "populations": [
+        {"population": "1000GENOMES:phase_3:YRI", "allele": "C", "frequency": 0.6},
+        {"population": "1000GENOMES:phase_3:YRI", "allele": "T", "frequency": 0.4},
+        {"population": "gnomADg:afr", "allele": "C", "frequency": "0.6"},
+        {"population": "gnomADg:afr", "allele": "T", "frequency": "0.4"},
+    ],
+    "most_severe_consequence": "intergenic_variant",
+}
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    """Clientes sem cache/rate limiter, com a camada HTTP substituída."""
+    monkeypatch.setattr(Config, "CACHE_ENABLED", False)
+    monkeypatch.setattr(Config, "RATE_LIMIT_ENABLED", False)
+    sync_client = EnsemblClient()
+
+    def fake_send(method, url, **kwargs):
+        if "/overlap/" in url:
+            return FakeResponse([{"external_name": "GENEX", "start": 1, "end": 1000}])
+        return FakeResponse(VARIANT)
+
+    monkeypatch.setattr(sync_client, "_send", fake_send)
+    return sync_client, AsyncEnsemblClient(sync_client)
+
+
+def test_async_matches_sync(clients):
+    """Ambos os clientes compartilham o mesmo parsing e produzem a mesma saída."""
+    sync_client, async_client = clients
+
+    async def async_send(method, url, **kwargs):
+        return sync_client._send(method, url, **kwargs)
+
+    async_client._send = async_send
+
+    expected = sync_client.get_variant_data("rs1")
+    result = asyncio.run(async_client.get_variant_data("rs1"))
+    assert result == expected
+    assert result.genes == ["GENEX (overlap)"]
+
+
+def test_async_backoff_does_not_block(clients, monkeypatch):
+    """Um retry em backoff não impede outras consultas no mesmo loop."""
+    sync_client, async_client = clients
+    monkeypatch.setattr("app.core.backoff_delay", lambda attempt: 0.5)
+    calls = {"rs_slow": 0}
+
+    async def flaky_send(method, url, **kwargs):
+        if "rs_slow" in url and calls["rs_slow"] == 0:
+            calls["rs_slow"] += 1
+            raise requests.exceptions.ConnectionError("falha simulada")
+        return sync_client._send(method, url, **kwargs)
+
+    async_client._send = flaky_send
+    finished = []
+
+    async def scenario():
+        async def track(rsid):
+            await async_client.get_variant_data(rsid)
+            finished.append(rsid)
+        await asyncio.gather(track("rs_slow"), track("rs1"))
+
+    started = time.monotonic()
+    asyncio.run(scenario())
+    assert finished == ["rs1", "rs_slow"]
+    assert time.monotonic() - started < 1.5
+
+
+def test_bridge_runs_coroutines():
+    """O bridge executa corrotinas a partir de código síncrono."""
+    async def double(x):
+        await asyncio.sleep(0)
+        return x * 2
+
+    assert bridge.run(double(21), timeout=5) == 42
+
+
+def test_bridge_timeout_cancels_coroutine():
+    """Esgotado o limite, o bridge cancela a corrotina no loop em vez de deixá-la rodando."""
+    state = {}
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    with pytest.raises(TimeoutError):
+        bridge.run(slow(), timeout=0.05)
+    time.sleep(0.05)
+    assert state == {"cancelled": True}
+
+
+def test_request_timeout_covers_retries(monkeypatch):
+    single = request_timeout()
+    assert single >= Config.MAX_RETRIES * (Config.HTTP_CONNECT_TIMEOUT + Config.TIMEOUT)
+    monkeypatch.setattr(Config, "ASYNC_MAX_CONCURRENCY", 1)
+    assert request_timeout(Config.BATCH_SIZE * 2) > request_timeout(Config.BATCH_SIZE) > single
+
+
+def test_cache_hit_not_blocked_by_slow_upstream(ensembl, monkeypatch):
+    """Com o pool HTTP ocupado por um Ensembl lento, um acerto de cache continua imediato."""
+    from app.routes import async_client, client
+    monkeypatch.setattr(client, "limiter", None)
+    assert bridge.run(async_client.get_variant_data("rs699"), timeout=5) is not None
+
+    ensembl.configure(latency=1)
+    slow = [bridge.submit(async_client.get_variant_data(f"rs{9000 + i}")) for i in range(Config.ASYNC_MAX_CONCURRENCY)]
+    try:
+        time.sleep(0.1)
+        started = time.monotonic()
+        assert bridge.run(async_client.get_variant_data("rs699"), timeout=5).rsid == "rs699"
+        assert time.monotonic() - started < 0.5
+    finally:
+        for future in slow:
+            future.result(timeout=10)
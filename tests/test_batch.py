@@ -0,0 +1,107 @@
+import pytest
+from app.main import app
+from app.config import Config
+from app.routes import client as ensembl_client, async_client
+from app.core import group_overlap_regions
+
+
+class FakeResponse:
+    """Resposta mínima compatível com requests.Response."""
+    def __init__(self, payload, status_code=200):
+        self._payload = payload
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.headers = {}
+        self.content = b""
+
+    def json(self):
+        return self._payload
+
+
+def make_variant(rsid, start, genes=None):
+    """Payload reduzido no formato de /variation/human."""
+    data = {
+        "name": rsid,
+        "mappings": [{"seq_region_name": "1", "start": start, "end": start, "allele_string": "A/G"}],
+        "populations": [
+            {"population": "1000GENOMES:phase_3:ALL", "allele": "A", "frequency": 0.7},
+            {"population": "1000GENOMES:phase_3:ALL", "allele": "G", "frequency": 0.3},
+        ],
+        "most_severe_consequence": "missense_variant",
+    }
+    if genes:
+        data["transcript_variations"] = [{"gene_symbol": g} for g in genes]
+    return data
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+def test_group_overlap_regions():
+    """Variantes próximas no mesmo cromossomo compartilham uma única janela de Overlap."""
+    mappings = {
+        "rs1": {"seq_region_name": "1", "start": 100, "end": 100},
+        "rs2": {"seq_region_name": "1", "start": 400, "end": 400},
+        "rs3": {"seq_region_name": "1", "start": 9000, "end": 9000},
+        "rs4": {"seq_region_name": "2", "start": 50, "end": 50},
+    }
+    windows = group_overlap_regions(mappings, max_span=1000)
+    assert ("1", 100, 400, ["rs1", "rs2"]) in windows
+    assert ("1", 9000, 9000, ["rs3"]) in windows
+    assert ("2", 50, 50, ["rs4"]) in windows
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_batch_endpoint(client, monkeypatch, use_async):
+    """
+    Resultados e erros individuais retornam em uma única resposta; Overlap é agrupado.
+    Os clientes síncrono e assíncrono devem produzir exatamente a mesma saída.
+    """
+    posts, overlaps = [], []
+
+    def fake_send(method, url, **kwargs):
+        if "/overlap/" in url:
+            chrom, span = url.split("/overlap/region/human/")[1].split("?")[0].split(":")
+            start, end = span.split("-")
+            overlaps.append((chrom, int(start), int(end)))
+            return FakeResponse([{"external_name": "GENEA", "start": 150, "end": 250},
+                                 {"external_name": "GENEB", "start": 250, "end": 350}])
+        posts.append(kwargs["json"]["ids"])
+        payload = {
+            "rs1": make_variant("rs1", 100, genes=["AGT"]),
+            "rs2": make_variant("rs2", 200),
+            "rs3": make_variant("rs3", 300),
+        }
+        return FakeResponse({k: v for k, v in payload.items() if k in kwargs["json"]["ids"]})
+
+    async def async_send(*args, **kwargs):
+        return fake_send(*args, **kwargs)
+
+    monkeypatch.setattr(Config, "ASYNC_CLIENT_ENABLED", use_async)
+    monkeypatch.setattr(ensembl_client, "_send", fake_send)
+    monkeypatch.setattr(async_client, "_send", async_send)
+
+    response = client.post('/api/variants', json={"rsids": ["rs1", "RS2", "rs3", "rs404", "invalido"]})
+    assert response.status_code == 200
+    # Resposta a POST: sem ETag e fora de caches compartilhados
+    assert response.headers["Cache-Control"] == "no-store"
+    assert "ETag" not in response.headers
+    data = response.get_json()
+
+    assert posts == [["rs1", "rs2", "rs3", "rs404"]]
+    assert overlaps == [("1", 200, 300)]
+    assert data["results"]["rs1"]["genes"] == ["AGT"]
+    assert data["results"]["rs2"]["genes"] == ["GENEA (overlap)"]
+    assert data["results"]["rs3"]["genes"] == ["GENEB (overlap)"]
+    assert "rs404" in data["errors"]
+    assert "invalido" in data["errors"]
+
+
+def test_batch_endpoint_invalid_body(client):
+    """Corpo fora do formato esperado retorna 400."""
+    response = client.post('/api/variants', json={"ids": "rs699"})
+    assert response.status_code == 400
@@ -0,0 +1,114 @@
+import time
+import pytest
+from app import routes
+from app.breaker import CircuitBreaker, CircuitOpen
+from app.config import Config
+from app.main import app
+
+
+def make_breaker(**overrides):
+    params = dict(window=60, min_calls=2, error_rate=0.5, slow_call_seconds=5, slow_rate=1.0,
+                  open_seconds=60, half_open_calls=1)
+    params.update(overrides)
+    return CircuitBreaker(**params)
+
+
+@pytest.fixture(params=[True, False], ids=["async", "sync"])
+def http(request, monkeypatch):
+    """Retries sem espera, timeout de leitura curto e um breaker que abre com 2 chamadas."""
+    monkeypatch.setattr(Config, "ASYNC_CLIENT_ENABLED", request.param)
+    monkeypatch.setattr(Config, "RETRY_BACKOFF_BASE", 0)
+    monkeypatch.setattr("app.core.TIMEOUTS", (1, 0.1))
+    monkeypatch.setattr("app.async_core.TIMEOUTS", (1, 0.1))
+    monkeypatch.setattr(routes.client, "breaker", make_breaker())
+    app.config['TESTING'] = True
+    with app.test_client() as http:
+        yield http
+
+
+def test_state_machine():
+    breaker = make_breaker(open_seconds=0.05, half_open_calls=2)
+    breaker.allow()
+    breaker.record(False, 0.01)
+    breaker.allow()
+    breaker.record(True, 0.01)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpen):
+        breaker.allow()
+
+    time.sleep(0.06)
+    breaker.allow()
+    breaker.allow()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpen):
+        breaker.allow()  # vagas de teste esgotadas
+    breaker.record(False, 0.01)
+    breaker.record(False, 0.01)
+    assert breaker.state == "closed"
+
+    # Lentidão também abre o circuito; uma falha no teste o reabre
+    slow = make_breaker(slow_call_seconds=0.5, open_seconds=0)
+    slow.record(False, 1.0)
+    slow.record(False, 1.0)
+    assert slow.state == "open"
+    slow.allow()
+    slow.record(True, 0.01)
+    assert slow.state == "open" and slow.stats()["opened"] == 2
+
+
+def test_open_circuit_fails_fast_with_503(http, ensembl):
+    ensembl.configure(error_rate=1)
+    assert http.get('/api/variant/rs699').status_code == 404
+    assert http.get('/api/variant/rs699').status_code == 404
+
+    response = http.get('/api/variant/rs699')
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) > 0
+    assert "indisponível" in response.get_json()["error"]
+    assert ensembl.counters["errors"] == 2
+
+    batch = http.post('/api/variants', json={"rsids": ["rs699"]}).get_json()
+    assert "indisponível" in batch["errors"]["rs699"]
+    stats = http.get('/api/stats').get_json()["breaker"]
+    assert stats["state"] == "open" and stats["rejected"] == 2
+
+
+def test_timeouts_skip_remaining_retries(http, ensembl, monkeypatch):
+    """Quando a falha abre o circuito, a requisição não espera o backoff das demais tentativas."""
+    monkeypatch.setattr(routes.client, "breaker", make_breaker(min_calls=1))
+    ensembl.configure(timeout_rate=1, timeout_seconds=0.3)
+    assert http.get('/api/variant/rs699').status_code == 503
+    assert ensembl.counters["timeouts"] == 1
+
+
+def test_half_open_trial_closes_circuit(http, ensembl, monkeypatch):
+    breaker = make_breaker(open_seconds=0.05)
+    monkeypatch.setattr(routes.client, "breaker", breaker)
+    ensembl.configure(error_rate=1)
+    http.get('/api/variant/rs699')
+    http.get('/api/variant/rs699')
+    assert breaker.state == "open"
+
+    ensembl.configure(error_rate=0)
+    time.sleep(0.06)
+    assert http.get('/api/variant/rs699').status_code == 200
+    assert breaker.state == "closed"
+
+
+def test_negative_cache_skips_upstream(http, ensembl):
+    """rsIDs inexistentes (400 do Ensembl) não voltam ao upstream dentro do TTL."""
+    assert http.get('/api/variant/rs99999999999999').status_code == 404
+    requests_after_first = ensembl.counters["requests"]
+    assert http.get('/api/variant/rs99999999999999').status_code == 404
+    batch = http.post('/api/variants', json={"rsids": ["rs99999999999999"]}).get_json()
+    assert batch["errors"]["rs99999999999999"] == "Identificador não localizado na base Ensembl"
+    assert ensembl.counters["requests"] == requests_after_first
+
+    stats = http.get('/api/stats').get_json()["negative_cache"]
+    assert stats["sets"] >= 1 and stats["memory_hits"] >= 2
+
+
+def test_batch_misses_are_remembered(http, ensembl):
+    http.post('/api/variants', json={"rsids": ["rs699", "rs1"]})
+    assert routes.client.negative.contains("rs1")
+    assert not routes.client.negative.contains("rs699")
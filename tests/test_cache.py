@@ -0,0 +1,75 @@
+import time
+from app.cache import LRUCache, SQLiteCache, VariantCache, endpoint_version
+from app.config import Config
+from app.models import VariantData
+from app.storage import connect
+
+
+def make_variant(rsid="rs699"):
+    return VariantData(rsid=rsid, chromosome="1", position=230710048, alleles="A/G", consequence="missense variant")
+
+
+def test_lru_eviction_and_ttl():
+    """O nível em memória respeita o limite de entradas e o TTL."""
+    lru = LRUCache(max_entries=2, ttl=60)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.get("a")
+    lru.set("c", 3)
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+
+    lru.set("old", 4, stored_at=time.time() - 120)
+    assert lru.get("old") is None
+
+
+def test_sqlite_prune(tmp_path):
+    """O nível em disco expurga expirados e excedentes."""
+    disk = SQLiteCache(str(tmp_path / "c.sqlite3"), max_entries=2, ttl=60)
+    for key in ("a", "b", "c"):
+        disk.set(key, b"x")
+    assert disk.prune() == 1
+    assert disk.get("a") is None
+    assert disk.get("c")[0] == b"x"
+
+
+def test_variant_cache_tiers():
+    """Acertos no disco (outro worker) são promovidos para a memória."""
+    cache = VariantCache()
+    cache.clear()
+    assert cache.get("rs699") is None
+
+    cache.set("rs699", make_variant())
+    cache.memory.clear()  # Simula um worker com memória fria
+
+    assert cache.get("rs699").position == 230710048
+    assert cache.get("rs699").rsid == "rs699"
+
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["disk_hits"] == 1
+    assert stats["memory_hits"] == 1
+
+
+def test_old_disk_entry_stays_in_memory():
+    """Entrada gravada há mais que CACHE_MEMORY_TTL: promovida uma vez, depois servida da memória."""
+    cache = VariantCache()
+    cache.clear()
+    cache.set("rs699", make_variant())
+    cache.memory.clear()
+    stored_at = time.time() - Config.CACHE_MEMORY_TTL - 3600
+    connect(cache.disk.path).execute("UPDATE entries SET stored_at = ? WHERE key = ?", (stored_at, cache._key("rs699")))
+
+    for _ in range(3):
+        entry, age_from = cache.lookup("rs699")
+        # A idade real (refresh-ahead) continua sendo a do disco
+        assert entry.variant.rsid == "rs699" and age_from == stored_at
+    stats = cache.stats()
+    assert stats["disk_hits"] == 1 and stats["memory_hits"] == 2
+
+
+def test_version_covers_every_variant_template(monkeypatch):
+    """Mudar o template do lote (que também grava no cache) invalida as entradas antigas."""
+    before = endpoint_version()
+    monkeypatch.setitem(Config.ENDPOINTS, "variation_batch", Config.ENDPOINTS["variation_batch"] + ";x=1")
+    assert endpoint_version() != before
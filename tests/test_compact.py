@@ -0,0 +1,122 @@
+import json
+import pytest
+from app.compact import compact_variant
+from app.coordinates import POP_COORDS, PopulationRegistry
+from app.main import app
+from app.models import PopulationFrequency, VariantData
+from app.routes import client
+
+
+@pytest.fixture
+def http():
+    app.config['TESTING'] = True
+    with app.test_client() as http:
+        yield http
+
+
+def expand(compact: dict, dictionary: dict) -> dict:
+    """Mesma reconstrução feita pelo frontend (expandCompact em main.js)."""
+    columns = compact["pop_frequencies"]
+    pops = []
+    for name, pid, allele, frequency in zip(columns["population"], columns["id"], columns["allele"], columns["frequency"]):
+        known = pid >= 0
+        pops.append({
+            "population": name, "allele": allele, "frequency": frequency,
+            "lat": dictionary["lat"][pid] if known else 0.0,
+            "lon": dictionary["lon"][pid] if known else 0.0,
+            "label": dictionary["labels"][pid] if known else name,
+            "is_region": dictionary["is_region"][pid] if known else True,
+        })
+    highest = [pops[row] for row in compact["highest_maf"]]
+    data = {k: v for k, v in compact.items() if k not in ("format", "populations_version", "highest_maf")}
+    data.update(
+        pop_frequencies=pops,
+        highest_maf_lat=[p["lat"] for p in highest],
+        highest_maf_lon=[p["lon"] for p in highest],
+        highest_maf_labels=[p["label"] for p in highest],
+        highest_maf_is_region=[p["is_region"] for p in highest],
+    )
+    return data
+
+
+def test_compact_expands_to_full_response(http, ensembl):
+    full = http.get('/api/variant/rs699')
+    compact = http.get('/api/variant/rs699?format=compact')
+    assert compact.status_code == 200
+    data = compact.get_json()
+    assert data["format"] == "compact" and data["highest_maf"]
+
+    dictionary = http.get(f'/api/populations?v={data["populations_version"]}').get_json()
+    assert dictionary["version"] == data["populations_version"]
+    assert VariantData.model_validate(expand(data, dictionary)) == VariantData.model_validate(full.get_json())
+    assert len(compact.get_data()) < len(full.get_data()) * 0.6
+    # ETag próprio do formato compacto
+    assert compact.headers["ETag"] != full.headers["ETag"]
+
+
+def test_full_format_keys_unchanged(http, ensembl):
+    """Os índices de maior MAF servem só ao formato compacto: a resposta completa mantém seus campos."""
+    keys = {
+        "rsid", "chromosome", "position", "alleles", "minor_allele_freq", "maf_1000g", "pop_frequencies", "genes",
+        "consequence", "highest_maf_lat", "highest_maf_lon", "highest_maf_labels", "highest_maf_is_region",
+    }
+    assert set(http.get('/api/variant/rs699').get_json()) == keys
+    batch = http.post('/api/variants', json={"rsids": ["rs699"]}).get_json()
+    assert set(batch["results"]["rs699"]) == keys
+
+
+def test_compact_rows_survive_disk_cache(http, ensembl):
+    first = http.get('/api/variant/rs699?format=compact').get_json()
+    client.cache.memory.clear()
+    client.cache.compact.clear()
+    again = http.get('/api/variant/rs699?format=compact').get_json()
+    assert again["highest_maf"] == first["highest_maf"] and first["highest_maf"]
+    assert client.cache.stats()["disk_hits"] >= 1
+
+
+def test_unknown_populations_and_ties():
+    pops = [
+        PopulationFrequency(population="gnomADg:afr", allele="G", frequency=0.4, lat=1, lon=2, label="a", is_region=True),
+        PopulationFrequency(population="TOPMed", allele="G", frequency=0.4, lat=0, lon=0, label="TOPMed", is_region=True),
+        PopulationFrequency(population="1000GENOMES:phase_3:YRI", allele="A", frequency=0.1, lat=3, lon=4, label="b", is_region=False),
+    ]
+    variant = VariantData(
+        rsid="rs1", chromosome="1", position=1, alleles="A/G", consequence="N/A", pop_frequencies=pops,
+        highest_maf_lat=[1, 0], highest_maf_lon=[2, 0], highest_maf_labels=["a", "TOPMed"], highest_maf_is_region=[True, True],
+        highest_maf_rows=[0, 1]
+    )
+    data = compact_variant(variant)
+    ids = data["pop_frequencies"]["id"]
+    assert ids[0] >= 0 and ids[1] == -1 and ids[2] >= 0
+    assert data["highest_maf"] == [0, 1]
+
+
+def test_dictionary_version_follows_registry():
+    registry = PopulationRegistry(POP_COORDS)
+    before = registry.dictionary()
+    assert len(before["keys"]) == len(before["labels"]) == len(POP_COORDS)
+    assert registry.population_id("1000GENOMES:phase_3:YRI") == before["keys"].index("YRI")
+    assert registry.population_id("BIOBANK:BRA") == -1
+
+    registry.register({"BRA": {"lat": -15.8, "lon": -47.9, "label": "Brasil", "is_region": True}})
+    after = registry.dictionary()
+    assert after["version"] != before["version"]
+    assert registry.population_id("BIOBANK:BRA") == after["keys"].index("BRA")
+
+
+def test_populations_cache_headers(http):
+    current = http.get('/api/populations')
+    version = current.get_json()["version"]
+    assert "immutable" not in current.headers["Cache-Control"]
+
+    versioned = http.get(f'/api/populations?v={version}')
+    assert versioned.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert http.get(f'/api/populations?v={version}', headers={"If-None-Match": versioned.headers["ETag"]}).status_code == 304
+    assert "immutable" not in http.get('/api/populations?v=antiga').headers["Cache-Control"]
+
+
+def test_compact_in_batch_and_invalid_format(http, ensembl):
+    batch = http.post('/api/variants?format=compact', json={"rsids": ["rs699"]}).get_json()
+    assert batch["results"]["rs699"]["format"] == "compact"
+    assert http.get('/api/variant/rs699?format=xml').status_code == 400
+    assert http.post('/api/variants?format=xml', json={"rsids": ["rs699"]}).status_code == 400
@@ -0,0 +1,40 @@
+import json
+from app.coordinates import POP_COORDS, PopulationRegistry, get_coords
+
+
+def test_get_coords_matches_tokens():
+    """Siglas são reconhecidas como segmentos do nome, nunca no primeiro segmento."""
+    assert get_coords("1000GENOMES:phase_3:YRI")["label"] == "Yoruba in Ibadan, Nigeria"
+    assert get_coords("gnomADg:afr")["label"] == "gnomAD: African/African American"
+    assert get_coords("NHLBI_ESP6500:AA")["label"] == "NHLBI ESP: African American"
+    assert get_coords("TOPMed") == {"lat": 0.0, "lon": 0.0, "label": "TOPMed", "is_region": True}
+    assert get_coords("YRIX:phase")["label"] == "YRIX:phase"
+
+
+def test_priority_is_deterministic():
+    """Mais tokens vence; em seguida, a ocorrência mais à direita."""
+    registry = PopulationRegistry({
+        "AA": {"label": "curta"},
+        "ESP:AA": {"label": "longa"},
+        "EUR": {"label": "europa"},
+        "FIN": {"label": "finlândia"},
+    })
+    assert registry.match("X:ESP:AA") == "ESP:AA"
+    assert registry.match("X:EUR:FIN") == "FIN"
+    assert registry.match("X:FIN:EUR") == "EUR"
+
+
+def test_load_catalog(tmp_path):
+    """Catálogos JSON e TSV adicionam populações e invalidam a memoização."""
+    registry = PopulationRegistry(POP_COORDS)
+    assert registry.resolve("BIOBANK:BRA")["label"] == "BIOBANK:BRA"
+
+    catalog = tmp_path / "extra.json"
+    catalog.write_text(json.dumps({"BRA": {"lat": -15.8, "lon": -47.9, "label": "Brasil", "is_region": True}}))
+    assert registry.load_catalog(str(catalog)) == 1
+    assert registry.resolve("BIOBANK:BRA") == {"lat": -15.8, "lon": -47.9, "label": "Brasil", "is_region": True}
+
+    tsv = tmp_path / "extra.tsv"
+    tsv.write_text("population\tlat\tlon\tlabel\tis_region\nSPO\t-23.5\t-46.6\tSão Paulo\tfalse\n")
+    registry.load_catalog(str(tsv))
+    assert registry.resolve("ABraOM:SPO") == {"lat": -23.5, "lon": -46.6, "label": "São Paulo", "is_region": False}
@@ -0,0 +1,80 @@
+import random
+from app.coordinates import get_coords
+from app.frequencies import compute_frequencies
+from app.models import PopulationFrequency
+
+
+def legacy_frequencies(pops):
+    """Implementação anterior (dicionários + sorted por grupo), usada como referência."""
+    pop_groups = {}
+    for p in pops:
+        pop_groups.setdefault(p['population'], []).append(p)
+
+    all_pop_data, highest_maf_val, highest_allele = [], -1.0, ""
+    h_lats, h_lons, h_names_clean, h_labels, h_is_region = [], [], [], [], []
+    maf_1000g_str = "N/A"
+    for name, entries in pop_groups.items():
+        if len(entries) >= 2:
+            minor_data = sorted(entries, key=lambda x: float(x.get('frequency', 0)), reverse=True)[1]
+            current_maf = float(minor_data.get('frequency', 0))
+            current_allele = minor_data.get('allele', '')
+            geo = get_coords(name)
+            clean_name = name.split(':')[-1]
+            if name == "1000GENOMES:phase_3:ALL":
+                maf_1000g_str = f"{current_allele}: {current_maf:.2f}"
+            all_pop_data.append(PopulationFrequency(
+                population=name, allele=current_allele, frequency=round(current_maf, 4),
+                lat=geo['lat'], lon=geo['lon'], label=geo.get('label', name), is_region=geo.get('is_region', False)
+            ))
+            if current_maf > highest_maf_val:
+                highest_maf_val, highest_allele = current_maf, current_allele
+                h_names_clean, h_lats, h_lons = [clean_name], [geo['lat']], [geo['lon']]
+                h_labels, h_is_region = [geo['label']], [geo['is_region']]
+            elif current_maf == highest_maf_val and highest_maf_val >= 0:
+                h_names_clean.append(clean_name)
+                h_lats.append(geo['lat'])
+                h_lons.append(geo['lon'])
+                h_labels.append(geo['label'])
+                h_is_region.append(geo['is_region'])
+
+    formatted = f"{highest_allele}: {highest_maf_val:.2f} ({', '.join(h_names_clean)})" if h_names_clean else "N/A"
+    return ([p.model_dump() for p in all_pop_data], formatted, maf_1000g_str, h_lats, h_lons, h_labels, h_is_region)
+
+
+def as_tuple(summary):
+    return ([p.model_dump() for p in summary.pop_frequencies], summary.minor_allele_freq, summary.maf_1000g,
+            summary.highest_maf_lat, summary.highest_maf_lon, summary.highest_maf_labels, summary.highest_maf_is_region)
+
+
+NAMES = ["1000GENOMES:phase_3:ALL", "1000GENOMES:phase_3:YRI", "gnomADg:afr", "gnomADe:nfe",
+         "ALFA:SAMN10492695", "TOPMed", "GEM-J", "1000GENOMES:phase_3:FIN"]
+
+
+def test_engine_matches_legacy_randomized():
+    """Saída idêntica à implementação anterior, inclusive em empates e grupos unitários."""
+    rng = random.Random(699)
+    for _ in range(300):
+        pops = []
+        for _ in range(rng.randint(0, 30)):
+            freq = rng.choice([0.0, 0.25, 0.5, 0.75, 1.0, round(rng.random(), 3)])
+            entry = {"population": rng.choice(NAMES), "allele": rng.choice("ACGT")}
+            if rng.random() > 0.05:
+                entry["frequency"] = str(freq) if rng.random() < 0.2 else freq
+            pops.append(entry)
+        summary = compute_frequencies(pops)
+        assert as_tuple(summary) == legacy_frequencies(pops)
+        # Os índices de maior MAF apontam para as mesmas populações das listas highest_maf_*
+        rows = [summary.pop_frequencies[row] for row in summary.highest_maf_rows]
+        assert [p.label for p in rows] == summary.highest_maf_labels
+        assert [p.lat for p in rows] == summary.highest_maf_lat
+
+
+def test_minor_allele_tie_keeps_original_order():
+    """Em empate de frequência, o alelo menor é o segundo na ordem original."""
+    pops = [
+        {"population": "1000GENOMES:phase_3:ALL", "allele": "A", "frequency": 0.5},
+        {"population": "1000GENOMES:phase_3:ALL", "allele": "G", "frequency": 0.5},
+    ]
+    summary = compute_frequencies(pops)
+    assert summary.maf_1000g == "G: 0.50"
+    assert summary.minor_allele_freq == "G: 0.50 (ALL)"
@@ -0,0 +1,43 @@
+from app.gene_index import GeneIndex, main, parse_annotation
+
+GTF = (
+    '#!genome-build GRCh38\n'
+    '1\tensembl\tgene\t230702523\t230745583\t.\t-\t.\tgene_id "ENSG00000135744"; gene_name "AGT";\n'
+    '1\tensembl\ttranscript\t230702523\t230745583\t.\t-\t.\tgene_id "ENSG00000135744"; gene_name "AGT";\n'
+    '1\tensembl\tgene\t100\t200\t.\t+\t.\tgene_id "ENSG1"; gene_name "SHORT";\n'
+    '1\tensembl\tgene\t50\t5000\t.\t+\t.\tgene_id "ENSG2"; gene_name "LONG";\n'
+    'X\tensembl\tgene\t10\t20\t.\t+\t.\tgene_id "ENSG3";\n'
+)
+
+
+def test_parse_formats(tmp_path):
+    """GTF ignora não-genes e genes sem símbolo; BED é convertido para 1-based."""
+    gtf = tmp_path / "genes.gtf"
+    gtf.write_text(GTF)
+    assert [r[3] for r in parse_annotation(str(gtf))] == ["AGT", "SHORT", "LONG"]
+
+    bed = tmp_path / "genes.bed"
+    bed.write_text("chr2\t99\t200\tBEDGENE\n")
+    assert list(parse_annotation(str(bed))) == [("2", 100, 200, "BEDGENE")]
+
+    gff = tmp_path / "genes.gff3"
+    gff.write_text("chr3\t.\tgene\t5\t9\t.\t+\t.\tID=gene:1;Name=GFFGENE\n")
+    assert list(parse_annotation(str(gff))) == [("3", 5, 9, "GFFGENE")]
+
+
+def test_query_and_binary_roundtrip(tmp_path):
+    """Consultas de sobreposição são idênticas após serialização binária."""
+    gtf = tmp_path / "genes.gtf"
+    gtf.write_text(GTF)
+    output = tmp_path / "genes.gix"
+    assert main(["build", str(gtf), str(output)]) == 0
+
+    index = GeneIndex.load(str(output))
+    assert len(index) == 3
+    assert [g[0] for g in index.query("1", 150, 150)] == ["LONG", "SHORT"]
+    assert [g[0] for g in index.query("chr1", 4000, 4000)] == ["LONG"]
+    assert index.query("1", 6000, 7000) == []
+    assert index.overlap_features("1", 230710048, 230710048) == [
+        {"external_name": "AGT", "start": 230702523, "end": 230745583, "feature_type": "gene"}
+    ]
+    assert index.query("1", 1, 10000) == GeneIndex.load(str(gtf)).query("1", 1, 10000)
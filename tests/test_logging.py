@@ -0,0 +1,117 @@
+import json
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+from logging.handlers import QueueListener
+from app import log_pipeline, warmup
+from app.log_pipeline import DeferredQueueHandler, JsonFormatter, LogServer, SocketForwardHandler
+
+
+class Lazy:
+    """Registra em qual thread a mensagem foi formatada."""
+
+    def __init__(self):
+        self.threads = []
+
+    def __str__(self):
+        self.threads.append(threading.current_thread().name)
+        return "valor"
+
+
+def isolated_logger(name: str) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def test_queue_handler_defers_formatting():
+    """A thread chamadora só enfileira; a interpolação acontece no ouvinte."""
+    log_queue = queue.SimpleQueue()
+    logger = isolated_logger("test.deferred")
+    logger.addHandler(DeferredQueueHandler(log_queue))
+
+    lazy = Lazy()
+    logger.info("consulta de %s", lazy)
+    assert lazy.threads == []
+
+    received = []
+
+    class Collect(logging.Handler):
+        def emit(self, record):
+            received.append(self.format(record))
+
+    listener = QueueListener(log_queue, Collect())
+    listener.start()
+    listener.stop()
+    assert received == ["consulta de valor"]
+    assert lazy.threads and lazy.threads[0] != threading.current_thread().name
+
+
+def test_json_formatter_keeps_accents():
+    record = logging.makeLogRecord({
+        "name": "app.core", "levelname": "INFO", "levelno": logging.INFO, "module": "core",
+        "msg": "Iniciando integração de dados para: %s", "args": ("rs699",)
+    })
+    line = JsonFormatter().format(record)
+    data = json.loads(line)
+    assert data["message"] == "Iniciando integração de dados para: rs699"
+    assert data["level"] == "INFO" and data["module"] == "core"
+    assert "integração" in line
+
+
+def wait_for(predicate, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condição não atingida")
+        time.sleep(0.01)
+
+
+def test_socket_forwarding_writes_once_in_server(tmp_path):
+    """Workers encaminham pelo socket; o servidor formata e grava no arquivo."""
+    log_file = tmp_path / "app.log"
+    # Caminhos de socket Unix têm limite de tamanho: usa um diretório curto
+    socket_dir = tempfile.mkdtemp(prefix="dasa-")
+    path = os.path.join(socket_dir, "log.sock")
+    server = LogServer(path, log_pipeline.build_handlers(str(log_file), "json")[:1]).start()
+    try:
+        assert oct(os.stat(path).st_mode & 0o777) == oct(0o600)
+        logger = isolated_logger("test.forward")
+        forward = SocketForwardHandler(path)
+        logger.addHandler(forward)
+        logger.info("Iniciando integração de dados para: %s", "rs42")
+        logger.debug("ignorado pelo nível do logger")
+        try:
+            raise ValueError("falhou")
+        except ValueError:
+            logger.exception("Erro ao processar %s", "rs43")
+        forward.close()
+
+        wait_for(lambda: server.received == 2)
+    finally:
+        server.stop()
+        os.rmdir(socket_dir)
+
+    lines = [json.loads(line) for line in log_file.read_text(encoding="utf-8").splitlines()]
+    assert [line["message"] for line in lines] == ["Iniciando integração de dados para: rs42", "Erro ao processar rs43"]
+    assert lines[0]["pid"] == os.getpid()
+    assert "ValueError: falhou" in lines[1]["exc"]
+    assert not os.path.exists(path)
+
+
+def test_warmup_reads_json_logs(tmp_path):
+    log = tmp_path / "app.log"
+    formatter = JsonFormatter()
+    lines = [
+        formatter.format(logging.makeLogRecord({
+            "levelname": "INFO", "msg": "Iniciando integração de dados para: %s", "args": (rsid,)
+        }))
+        for rsid in ("rs5", "rs7", "rs7")
+    ]
+    log.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    assert warmup.top_requested(str(log), 10) == ["rs7", "rs5"]
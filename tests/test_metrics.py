@@ -0,0 +1,134 @@
+import json
+import os
+import time
+import pytest
+from flask import Flask
+from app import metrics, profiler
+from app.config import Config
+from app.main import app
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+def sample(text: str, line_prefix: str) -> float:
+    """Valor da primeira linha da exposição que começa com o prefixo (0 se ausente)."""
+    for line in text.splitlines():
+        if line.startswith(line_prefix):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_merge_and_render_across_workers():
+    """Contadores e histogramas somam entre workers; gauges de processos encerrados são ignorados."""
+    registry = metrics.MetricsRegistry()
+    hist = registry.register(metrics.Histogram("t_seconds", "h", ("stage",), buckets=(0.1, 1)))
+    counter = registry.register(metrics.Counter("t_total", "c", ("status",)))
+    gauge = registry.register(metrics.Gauge("t_in_flight", "g"))
+
+    hist.observe(0.05, "parse")
+    hist.observe(0.5, "parse")
+    counter.inc('5"03')
+    gauge.inc()
+    alive = registry.snapshot()
+    dead = registry.snapshot()
+    dead["pid"] = 2 ** 22 + 1
+
+    text = metrics.render(metrics.merge([alive, dead]))
+    assert 't_seconds_bucket{stage="parse",le="0.1"} 2' in text
+    assert 't_seconds_bucket{stage="parse",le="1"} 4' in text
+    assert 't_seconds_bucket{stage="parse",le="+Inf"} 4' in text
+    assert 't_seconds_count{stage="parse"} 4' in text
+    assert 't_total{status="5\\"03"} 2' in text
+    assert "t_in_flight 1" in text
+    assert "# TYPE t_seconds histogram" in text
+
+
+def test_retired_worker_counters_survive_pid_reuse(tmp_path):
+    """Contadores de um worker encerrado vão para o snapshot "retired"; o PID reutilizado parte do zero."""
+    registry = metrics.MetricsRegistry()
+    counter = registry.register(metrics.Counter("t_total", "c"))
+    gauge = registry.register(metrics.Gauge("t_in_flight", "g"))
+    store = metrics.SnapshotStore(str(tmp_path), interval=0)
+    pid = 2 ** 22 + 1
+
+    def write(pid):
+        snapshot = registry.snapshot()
+        snapshot["pid"] = pid
+        with open(store.path_for(pid), "w", encoding="utf-8") as handle:
+            json.dump(snapshot, handle)
+
+    counter.inc(amount=5)
+    gauge.inc()
+    write(pid)
+    store.retire(pid)
+    assert not os.path.exists(store.path_for(pid))
+    with open(store.retired_path, encoding="utf-8") as handle:
+        assert list(json.load(handle)["metrics"]) == ["t_total"]
+
+    # Novo worker com o mesmo PID: começa do zero, e o total não volta atrás
+    registry.reset()
+    counter.inc(amount=2)
+    write(pid)
+    text = metrics.render(metrics.merge(store.collect()))
+    assert "t_total 7" in text
+
+    store.retire_dead()
+    assert os.listdir(tmp_path) == ["metrics-retired.json"]
+    assert "t_total 7" in metrics.render(metrics.merge(store.collect()))
+
+
+def test_metrics_endpoint(client, ensembl, monkeypatch):
+    """Etapas, status upstream, retries e tamanhos aparecem no /metrics."""
+    monkeypatch.setattr(Config, "RETRY_BACKOFF_BASE", 0)
+    before = client.get('/metrics').data.decode()
+
+    assert client.get('/api/variant/rs699').status_code == 200
+    ensembl.configure(rate_limit_rate=1, retry_after=0.01)
+    client.get('/api/variant/rs700')
+
+    response = client.get('/metrics')
+    assert response.mimetype == "text/plain"
+    text = response.data.decode()
+
+    def delta(prefix):
+        return sample(text, prefix) - sample(before, prefix)
+
+    assert delta('dasa_upstream_responses_total{endpoint="variation",status="200"}') == 1
+    assert delta('dasa_upstream_responses_total{endpoint="variation",status="429"}') == Config.MAX_RETRIES
+    assert delta('dasa_upstream_retries_total{reason="429"}') == Config.MAX_RETRIES - 1
+    for stage in ("upstream_fetch", "parse", "populations", "serialize", "cache_lookup"):
+        assert delta(f'dasa_stage_seconds_count{{stage="{stage}"}}') >= 1
+    assert delta('dasa_http_requests_total{endpoint="/api/variant/<rsid>",status="200"}') == 1
+    assert delta('dasa_response_payload_bytes_count{endpoint="/api/variant/<rsid>"}') == 2
+    assert "dasa_http_requests_in_flight 1" in text
+    assert os.path.exists(metrics.store.path_for(os.getpid()))
+
+
+def test_profiler_header(tmp_path, monkeypatch):
+    """Somente requisições com o header (e o token) são amostradas."""
+    monkeypatch.setattr(Config, "PROFILER_ENABLED", True)
+    monkeypatch.setattr(Config, "PROFILER_TOKEN", "segredo")
+    monkeypatch.setattr(Config, "PROFILER_INTERVAL", 0.001)
+    monkeypatch.setattr(Config, "PROFILER_DIR", str(tmp_path))
+
+    profiled = Flask(__name__)
+    profiler.install(profiled)
+
+    @profiled.route('/lento')
+    def slow_route():
+        time.sleep(0.05)
+        return "ok"
+
+    http = profiled.test_client()
+    assert "X-Profile-File" not in http.get('/lento').headers
+    assert "X-Profile-File" not in http.get('/lento', headers={"X-Profile": "errado"}).headers
+
+    response = http.get('/lento', headers={"X-Profile": "segredo"})
+    assert int(response.headers["X-Profile-Samples"]) > 0
+    folded = (tmp_path / response.headers["X-Profile-File"]).read_text()
+    assert "slow_route (test_metrics.py" in folded
@@ -0,0 +1,44 @@
+from app.ratelimit import RateLimiter, backoff_delay
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def test_token_bucket_paces_requests(tmp_path):
+    """Após esgotar o burst, cada reserva espera 1/rate segundos a mais."""
+    limiter = RateLimiter(str(tmp_path / "rl.sqlite3"), rate=10, burst=1)
+    assert limiter.reserve(max_wait=5) == 0
+    assert 0.09 < limiter.reserve(max_wait=5) <= 0.1
+    assert 0.19 < limiter.reserve(max_wait=5) <= 0.2
+
+
+def test_bucket_shared_between_instances(tmp_path):
+    """Instâncias distintas (workers) enxergam o mesmo bucket."""
+    path = str(tmp_path / "rl.sqlite3")
+    worker_a, worker_b = RateLimiter(path, rate=10, burst=1), RateLimiter(path, rate=10, burst=1)
+    assert worker_a.reserve(max_wait=5) == 0
+    assert worker_b.reserve(max_wait=5) > 0
+
+
+def test_retry_after_blocks_all_workers(tmp_path):
+    """Um 429 com Retry-After bloqueia o bucket; esperas longas são recusadas."""
+    limiter = RateLimiter(str(tmp_path / "rl.sqlite3"), rate=10, burst=5)
+    limiter.observe(FakeResponse(429, {"Retry-After": "3"}), elapsed=0.05)
+    assert limiter.reserve(max_wait=1) > 2.5
+    assert limiter.stats()["throttled"] == 1
+
+
+def test_remaining_quota_caps_tokens(tmp_path):
+    """X-RateLimit-Remaining no limite da reserva pausa até o X-RateLimit-Reset."""
+    limiter = RateLimiter(str(tmp_path / "rl.sqlite3"), rate=10, burst=5)
+    limiter.observe(FakeResponse(200, {"X-RateLimit-Remaining": "5", "X-RateLimit-Reset": "30"}), elapsed=0.05)
+    assert limiter.reserve(max_wait=60) > 29
+
+
+def test_backoff_is_jittered_and_bounded():
+    delays = [backoff_delay(5) for _ in range(50)]
+    assert all(0 <= d <= 8 for d in delays)
+    assert len(set(delays)) > 1
@@ -0,0 +1,105 @@
+import time
+import pytest
+from app.config import Config
+from app.core import EnsemblClient
+from app.effects import Call
+from app.main import app
+from app import warmup
+from app.storage import connect
+from tests.test_cache import make_variant
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Cliente com cache real e busca upstream substituída (conta as chamadas)."""
+    client = EnsemblClient()
+    client.cache.clear()
+    client.calls = []
+
+    def fetch(rsid):
+        yield Call(client.calls.append, (rsid,))
+        return make_variant(rsid).model_copy(update={"consequence": "atualizada"})
+
+    monkeypatch.setattr(client, "_fetch_variant_plan", fetch)
+    return client
+
+
+def age_entry(client, rsid, age):
+    """Grava a variante no cache com idade artificial (somente no disco)."""
+    client.cache.set(rsid, make_variant(rsid))
+    client.cache.memory.clear()
+    connect(client.cache.disk.path).execute(
+        "UPDATE entries SET stored_at = ? WHERE key = ?", (time.time() - age, client.cache._key(rsid))
+    )
+
+
+def wait_refresh(client):
+    deadline = time.time() + 2
+    while client.refresher.stats()["pending"] and time.time() < deadline:
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize("age_fraction", [0.9, 1.01])
+def test_refresh_ahead_serves_old_entry(client, age_fraction):
+    """Entradas próximas do vencimento (ou obsoletas) são servidas e atualizadas em segundo plano."""
+    age_entry(client, "rs1", Config.CACHE_DISK_TTL * age_fraction)
+
+    assert client.get_variant_data("rs1").consequence == "missense variant"
+    wait_refresh(client)
+
+    assert client.calls == ["rs1"]
+    assert client.get_variant_data("rs1").consequence == "atualizada"
+    assert client.refresher.stats()["completed"] == 1
+
+
+def test_fresh_and_expired_entries(client):
+    """Entradas novas não disparam atualização; além da janela de graça, é um miss."""
+    client.cache.set("rs2", make_variant("rs2"))
+    client.get_variant_data("rs2")
+    assert client.refresher.stats()["scheduled"] == 0
+
+    age_entry(client, "rs3", Config.CACHE_DISK_TTL + Config.CACHE_STALE_GRACE + 10)
+    assert client.get_variant_data("rs3").consequence == "atualizada"
+    assert client.refresher.stats()["scheduled"] == 0
+
+
+def test_top_requested_and_seeds(tmp_path, monkeypatch):
+    """Histórico do log (incluindo arquivos rotacionados) ordenado por frequência; sementes primeiro."""
+    log = tmp_path / "app.log"
+    log.write_text(
+        "[x] INFO - core: Iniciando integração de dados para: rs2\n"
+        "[x] INFO - core: Iniciando integração de dados para: rs2\n"
+        "[x] INFO - core: Iniciando integração em lote para 3 variantes\n"
+    )
+    (tmp_path / "app.log.1").write_text("[x] INFO - core: Iniciando integração de dados para: rs1\n" * 3)
+    assert warmup.top_requested(str(log), 10) == ["rs1", "rs2"]
+
+    monkeypatch.setattr(Config, "LOG_FILE", str(log))
+    monkeypatch.setattr(Config, "WARMUP_RSIDS", "rs9, invalido,RS2")
+    monkeypatch.setattr(Config, "WARMUP_TOP_N", 3)
+    assert warmup.warmup_candidates() == ["rs9", "rs2", "rs1"]
+
+
+def test_warmup_is_bounded(client, ensembl, monkeypatch):
+    """O warm-up carrega o cache em blocos e para no prazo, mesmo com o Ensembl lento."""
+    monkeypatch.setattr(Config, "BATCH_SIZE", 2)
+    assert warmup.run_warmup(client, ["rs699", "rs1", "rs2"], timeout=5) == 1
+    assert warmup.status["state"] == "done"
+    assert client.cache.get("rs699") is not None
+
+    client.cache.clear()
+    ensembl.configure(latency=2)
+    started = time.monotonic()
+    assert warmup.run_warmup(client, ["rs699", "rs1", "rs2"], timeout=0.2) == 0
+    assert time.monotonic() - started < 1
+    assert warmup.status["state"] == "timeout"
+
+
+def test_health_does_not_wait_for_warmup():
+    app.config['TESTING'] = True
+    with app.test_client() as http:
+        started = time.monotonic()
+        response = http.get('/health')
+    assert response.status_code == 200
+    assert response.get_json()["status"] == "ok"
+    assert time.monotonic() - started < 1
@@ -0,0 +1,113 @@
+import time
+import pytest
+from app.config import Config
+from app.main import app
+from app.regions import RegionTileCache, build_tile, tile_bounds, tile_range
+from app.routes import client as ensembl_client
+from app.storage import connect
+from app.utils import parse_region
+from tests.ensembl_standin import EnsemblStandin, FixtureRepository
+
+
+@pytest.fixture
+def http():
+    app.config['TESTING'] = True
+    with app.test_client() as http:
+        yield http
+
+
+@pytest.fixture
+def synthetic(monkeypatch):
+    """Ensembl local com uma variante a cada 1000 bases (rs<posição>)."""
+    with EnsemblStandin(fixtures=FixtureRepository(synthetic=True), seed=0) as standin:
+        monkeypatch.setattr(ensembl_client, "base_url", standin.url)
+        yield standin
+
+
+def test_parse_region_and_tiles():
+    assert parse_region("chr1:230,700,000-230,800,000") == ("1", 230700000, 230800000)
+    assert parse_region("x:10..20") == ("X", 10, 20)
+    for invalid in ("1:20-10", "1:0-5", "rs699", "1:a-b"):
+        with pytest.raises(ValueError):
+            parse_region(invalid)
+
+    assert tile_bounds(0, 100) == (1, 100)
+    assert list(tile_range(100, 101, 100)) == [0, 1]
+    features = [
+        {"id": "rs2", "start": 150, "end": 150, "feature_type": "variation"},
+        {"id": "rs1", "start": 99, "end": 120, "feature_type": "variation"},  # começa no bloco anterior
+        {"id": "rs3", "start": 101, "end": 101, "feature_type": "variation"},
+    ]
+    assert [v["id"] for v in build_tile(features, "1", 1, 100)] == ["rs3", "rs2"]
+
+
+def test_old_tile_stays_in_memory():
+    """Bloco gravado há mais que CACHE_MEMORY_TTL: lido do disco uma vez, depois da memória."""
+    tiles = RegionTileCache()
+    tiles.clear()
+    tiles.set("1", 0, [{"id": "rs1", "start": 10}])
+    tiles.memory.clear()
+    connect(tiles.disk.path).execute(
+        "UPDATE entries SET stored_at = ? WHERE key = ?", (time.time() - Config.CACHE_MEMORY_TTL - 3600, tiles._key("1", 0))
+    )
+
+    for _ in range(3):
+        assert tiles.get("1", 0) == [{"id": "rs1", "start": 10}]
+    stats = tiles.stats()
+    assert stats["disk_hits"] == 1 and stats["memory_hits"] == 2
+
+
+def test_region_with_recorded_variant(http, ensembl):
+    response = http.get('/api/region/1:230700000-230720000')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["count"] == 1 and data["next_cursor"] is None
+    variant = data["variants"][0]
+    assert variant["id"] == "rs699" and variant["start"] == 230710048
+    assert variant["alleles"] == ["A", "G"] and variant["consequence"] == "missense variant"
+
+
+def test_overlapping_windows_reuse_tiles(http, synthetic):
+    size = Config.REGION_TILE_SIZE
+    before = dict(ensembl_client.region_tiles.counters)
+    first = http.get(f'/api/region/1:1-{2 * size}?limit=5000').get_json()
+    assert first["count"] == 2 * size // 1000
+    assert synthetic.counters["requests"] == 2
+
+    # Janela deslocada: apenas o bloco novo é buscado
+    panned = http.get(f'/api/region/1:{size + 1}-{3 * size}?limit=5000').get_json()
+    assert synthetic.counters["requests"] == 3
+    positions = [v["start"] for v in panned["variants"]]
+    assert positions == sorted(positions) and positions[0] == size + 1000 and positions[-1] == 3 * size
+
+    stats = http.get('/api/stats').get_json()["regions"]
+    assert stats["misses"] - before["misses"] == 3
+    assert stats["memory_hits"] - before["memory_hits"] == 1
+
+
+def test_pagination_follows_cursor(http, synthetic):
+    url = f'/api/region/2:1-{int(2.5 * Config.REGION_TILE_SIZE)}'
+    seen, cursor, pages = [], None, 0
+    while True:
+        data = http.get(url, query_string={"limit": 30, **({"cursor": cursor} if cursor else {})}).get_json()
+        seen.extend(v["id"] for v in data["variants"])
+        pages += 1
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    total = int(2.5 * Config.REGION_TILE_SIZE) // 1000
+    assert len(seen) == len(set(seen)) == total
+    assert pages == -(-total // 30)
+
+
+def test_region_limits_and_errors(http, synthetic):
+    too_wide = http.get(f'/api/region/1:1-{Config.REGION_MAX_SPAN + 1}')
+    assert too_wide.status_code == 400
+    assert http.get('/api/region/chr1:abc').status_code == 400
+    assert http.get('/api/region/1:1-1000?cursor=invalido').status_code == 400
+
+    synthetic.configure(error_rate=1.0)
+    assert http.get('/api/region/3:1-1000').status_code == 502
+    synthetic.configure(error_rate=0.0)
+    # Falhas não ficam em cache
+    assert http.get('/api/region/3:1-1000').get_json()["count"] == 1
@@ -0,0 +1,55 @@
+import gzip
+import json
+import pytest
+from app import routes
+from app.main import app
+from app.models import PopulationFrequency, VariantData
+
+
+def make_variant():
+    pops = [
+        PopulationFrequency(population=f"1000GENOMES:phase_3:POP{i}", allele="G", frequency=0.3,
+                            lat=1.0, lon=2.0, label=f"Population {i}", is_region=False)
+        for i in range(20)
+    ]
+    return VariantData(rsid="rs699", chromosome="1", position=230710048, alleles="A/G",
+                       consequence="missense variant", pop_frequencies=pops, genes=["AGT"])
+
+
+@pytest.fixture
+def client(monkeypatch):
+    app.config['TESTING'] = True
+    routes.client.cache.set("rs699", make_variant())
+    monkeypatch.setattr(routes, "fetch_variant", lambda rsid: routes.client.cache.get(rsid))
+    with app.test_client() as client:
+        yield client
+
+
+def test_body_matches_model_and_reuses_cached_payload(client):
+    """O corpo é o JSON do modelo e o hash armazenado no cache vira o ETag."""
+    response = client.get('/api/variant/rs699')
+    assert response.status_code == 200
+    assert response.get_json() == make_variant().model_dump()
+
+    cached = routes.client.cache.get_entry("rs699")
+    assert response.headers["ETag"] == f'W/"{cached.payload.etag}"'
+    assert "max-age" in response.headers["Cache-Control"]
+
+
+def test_conditional_get_returns_304(client):
+    etag = client.get('/api/variant/rs699').headers["ETag"]
+    response = client.get('/api/variant/rs699', headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+
+
+def test_gzip_when_accepted(client):
+    response = client.get('/api/variant/rs699', headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert json.loads(gzip.decompress(response.data))["rsid"] == "rs699"
+
+    plain = client.get('/api/variant/rs699')
+    assert "Content-Encoding" not in plain.headers
+    assert len(response.data) < len(plain.data)
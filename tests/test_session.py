@@ -0,0 +1,44 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from app import session
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Servidor HTTP/1.1 mínimo que mantém a conexão aberta."""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"[]"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_session_reuses_connections(server):
+    """Requisições sequenciais compartilham a mesma conexão TCP."""
+    session.stats.reset()
+    http = session.get_session()
+    assert http is session.get_session()
+
+    for _ in range(5):
+        assert http.get(f"{server}/overlap").ok
+
+    snapshot = session.stats.snapshot()
+    assert snapshot["requests"] == 5
+    assert snapshot["new_connections"] == 1
+    assert snapshot["reused_connections"] == 4
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from app.async_core import AsyncEnsemblClient
+from app.core import EnsemblClient
+from app.effects import Sleep
+from app.singleflight import ABSENT, FlightLock, SingleFlight
+from tests.test_cache import make_variant
+
+
+def slow_client(monkeypatch, calls):
+    """Cliente cuja busca upstream demora e registra cada chamada."""
+    client = EnsemblClient()
+    client.cache.clear()
+
+    def fetch(rsid):
+        calls.append(rsid)
+        yield Sleep(0.1)
+        return make_variant(rsid)
+
+    monkeypatch.setattr(client, "_fetch_variant_plan", fetch)
+    return client
+
+
+def test_local_coalescing(monkeypatch):
+    """Threads do mesmo worker aguardam a resolução em andamento."""
+    calls = []
+    client = slow_client(monkeypatch, calls)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(client.get_variant_data, ["rs1"] * 8))
+
+    assert calls == ["rs1"]
+    assert all(r == results[0] for r in results)
+    stats = client.flights.stats()
+    assert stats["leaders"] + stats["coalesced_local"] == 8
+    assert stats["coalesced_local"] >= 1 and stats["in_flight"] == 0
+
+
+def test_async_coalescing(monkeypatch):
+    calls = []
+    client = slow_client(monkeypatch, calls)
+    async_client = AsyncEnsemblClient(client)
+
+    async def main():
+        return await asyncio.gather(*(async_client.get_variant_data("rs2") for _ in range(5)))
+
+    assert len(asyncio.run(main())) == 5
+    assert calls == ["rs2"]
+    assert client.flights.stats()["coalesced_local"] == 4
+
+
+def test_cross_worker_waits_for_shared_result(tmp_path):
+    """Outro worker detém a chave: o resultado vem do armazenamento compartilhado."""
+    lock = FlightLock(str(tmp_path / "flights.sqlite3"), lease=60)
+    other_worker = SingleFlight(FlightLock(lock.path, lease=60), poll_interval=0.01)
+    shared = {}
+
+    token = lock.acquire("rs3")
+    assert token and lock.acquire("rs3") is None
+
+    def finish():
+        time.sleep(0.05)
+        shared["rs3"] = "pronto"
+        lock.release("rs3", token)
+
+    threading.Thread(target=finish).start()
+    result = other_worker.run("rs3", lambda: "upstream", lambda: shared.get("rs3"))
+
+    assert result == "pronto"
+    assert other_worker.stats()["coalesced_remote"] == 1
+
+
+def test_expired_lease_is_taken_over(tmp_path):
+    """Chave de um worker que morreu expira e não bloqueia os demais."""
+    lock = FlightLock(str(tmp_path / "flights.sqlite3"), lease=0.05)
+    assert lock.acquire("rs4")
+    flights = SingleFlight(lock, poll_interval=0.01)
+    assert flights.run("rs4", lambda: "upstream", lambda: None) == "upstream"
+
+
+def test_cancelled_leader_hands_over_to_follower():
+    """Cancelar o líder (cliente desconectado) não cancela quem aguarda a mesma chave."""
+    flights = SingleFlight(poll_interval=0.01)
+    calls = []
+
+    async def resolve():
+        calls.append("upstream")
+        await asyncio.sleep(0.2 if len(calls) == 1 else 0)
+        return "pronto"
+
+    async def main():
+        leader = asyncio.create_task(flights.run_async("rs5", resolve, lambda: None))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flights.run_async("rs5", resolve, lambda: None))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == "pronto"
+    assert calls == ["upstream", "upstream"]
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_remote_not_found_is_not_refetched(tmp_path):
+    """Líder de outro worker deu o rsID como inexistente: o seguidor não repete a consulta."""
+    lock = FlightLock(str(tmp_path / "flights.sqlite3"), lease=60)
+    other_worker = SingleFlight(FlightLock(lock.path, lease=60), poll_interval=0.01)
+    negative = set()
+
+    token = lock.acquire("rs6")
+
+    def finish():
+        time.sleep(0.05)
+        negative.add("rs6")
+        lock.release("rs6", token)
+
+    def lookup():
+        return ABSENT if "rs6" in negative else None
+
+    threading.Thread(target=finish).start()
+    assert other_worker.run("rs6", lambda: "upstream", lookup) is None
+
+
+def test_client_lookup_consults_negative_cache():
+    client = EnsemblClient()
+    client.negative.add("rs99999999999999")
+    assert client.shared_variant("rs99999999999999") is ABSENT
+    assert client.shared_variant("rs699") is None
@@ -0,0 +1,53 @@
+import time
+import pytest
+from app.config import Config
+from app.main import app
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Retries sem espera e timeout de leitura curto para as falhas injetadas."""
+    monkeypatch.setattr(Config, "RETRY_BACKOFF_BASE", 0)
+    monkeypatch.setattr("app.core.TIMEOUTS", (1, 0.1))
+    monkeypatch.setattr("app.async_core.TIMEOUTS", (1, 0.1))
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+def test_replays_fixture_and_batch(client, ensembl):
+    response = client.get('/api/variant/rs699')
+    assert response.get_json()["genes"] == ["AGT"]
+
+    response = client.post('/api/variants', json={"rsids": ["rs699", "rs1"]})
+    data = response.get_json()
+    assert list(data["results"]) == ["rs699"] and "rs1" in data["errors"]
+
+
+def test_synthetic_variant_uses_overlap(client, ensembl, monkeypatch):
+    """Variantes sintéticas sem fenótipos exercitam o fallback de Overlap via HTTP."""
+    monkeypatch.setattr(ensembl.fixtures, "synthetic", True)
+    data = client.get('/api/variant/rs26321').get_json()
+    assert data["position"] == 229_626_321
+    assert data["genes"] == ["URB2 (overlap)"]
+
+
+@pytest.mark.parametrize("faults, counter, expected", [
+    ({"error_rate": 1}, "errors", 1),
+    ({"rate_limit_rate": 1, "retry_after": 0.01}, "rate_limited", Config.MAX_RETRIES),
+    ({"timeout_rate": 1, "timeout_seconds": 0.3}, "timeouts", Config.MAX_RETRIES),
+])
+def test_injected_faults(client, ensembl, faults, counter, expected):
+    """Falhas persistentes são retentadas conforme a política e não derrubam a rota."""
+    ensembl.configure(**faults)
+    response = client.get('/api/variant/rs699')
+    assert response.status_code == 404
+    assert ensembl.counters[counter] == expected
+
+
+def test_injected_latency(client, ensembl):
+    """Latência abaixo do timeout de leitura (0.1s) atrasa, mas não falha a consulta."""
+    ensembl.configure(latency=0.05)
+    started = time.monotonic()
+    assert client.get('/api/variant/rs699').status_code == 200
+    assert time.monotonic() - started >= 0.05
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+import time
+from app import create_app, startup, warmup
+from app.config import Config
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code: str, **env) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT_DIR, env={**os.environ, **env},
+        capture_output=True, text=True, timeout=60
+    )
+
+
+def test_imports_are_lazy_and_side_effect_free(tmp_path):
+    """Importar o pacote e as rotas não traz requests/Pydantic nem cria diretórios."""
+    cache_dir = tmp_path / "cache"
+    result = run_python(
+        "import sys, app.config, app.routes\n"
+        "heavy = [m for m in ('requests', 'pydantic', 'asyncio', 'app.core') if m in sys.modules]\n"
+        "print(','.join(heavy))",
+        CACHE_DIR=str(cache_dir), LOG_DIR=str(tmp_path / "logs")
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+    assert not cache_dir.exists() and not (tmp_path / "logs").exists()
+
+
+def test_fast_profile_prepares_in_background(monkeypatch):
+    monkeypatch.setattr(Config, "STARTUP_PROFILE", "fast")
+    monkeypatch.setitem(startup.status, "state", "idle")
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.test_client() as http:
+        health = http.get('/health').get_json()
+        assert health["status"] == "ok" and health["startup"]["state"] in ("idle", "preparing", "ready")
+
+        deadline = time.monotonic() + 10
+        while startup.status["state"] != "ready":
+            assert time.monotonic() < deadline and startup.status["state"] != "error"
+            time.sleep(0.01)
+        assert http.get('/api/variant/rs699').status_code == 200
+
+
+def test_preload_defers_warmup_to_workers(monkeypatch):
+    """Com preload_app, create_app (no master) prepara o cliente mas não inicia o warm-up."""
+    started = []
+    monkeypatch.setattr(Config, "PRELOAD_APP", True)
+    monkeypatch.setattr(Config, "WARMUP_ENABLED", True)
+    monkeypatch.setattr(warmup, "start_warmup", started.append)
+    create_app()
+    assert started == []
+    assert startup.status["state"] == "ready"
@@ -0,0 +1,81 @@
+import io
+import json
+import threading
+import time
+import pytest
+from app.main import app
+from app.config import Config
+from app.routes import client as ensembl_client
+from app.core import parse_variant
+from app.effects import Call
+from tests.test_batch import make_variant
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture(params=[False, True], ids=["sync", "async"])
+def fake_fetch(request, monkeypatch):
+    """Substitui a busca no Ensembl e registra o pico de consultas simultâneas."""
+    state = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def fetch(rsid):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.01)
+        with lock:
+            state["active"] -= 1
+        if rsid == "rs404":
+            return None
+        return parse_variant(make_variant(rsid, 100, genes=["AGT"]), rsid, {"AGT"})
+
+    def fetch_plan(rsid):
+        # Call roda em uma thread no cliente assíncrono, como o I/O real
+        return (yield Call(fetch, (rsid,)))
+
+    monkeypatch.setattr(Config, "ASYNC_CLIENT_ENABLED", request.param)
+    monkeypatch.setattr(ensembl_client, "_fetch_variant_plan", fetch_plan)
+    return state
+
+
+def read_lines(response):
+    return [json.loads(line) for line in response.data.decode().splitlines()]
+
+
+def test_stream_text_upload(client, fake_fetch, monkeypatch):
+    """Texto com um rsID por linha: resultados e erros chegam como linhas NDJSON."""
+    monkeypatch.setattr(Config, "STREAM_CONCURRENCY", 3)
+    body = "\n".join(["rs1", "invalido", "", "RS404"] + [f"rs{i}" for i in range(2, 12)]) + "\n"
+    response = client.post('/api/variants/stream', data=body, content_type="text/plain")
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert response.headers["Cache-Control"] == "no-store" and "ETag" not in response.headers
+    lines = read_lines(response)
+    assert len(lines) == 13
+    errors = {line["rsid"]: line["error"] for line in lines if "error" in line}
+    assert set(errors) == {"invalido", "rs404"}
+    assert sorted(line["rsid"] for line in lines if "error" not in line) == sorted(f"rs{i}" for i in range(1, 12))
+    assert all(line["genes"] == ["AGT"] for line in lines if "error" not in line)
+    assert fake_fetch["peak"] <= 3
+
+
+def test_stream_json_and_concurrency_param(client, fake_fetch):
+    response = client.post('/api/variants/stream?concurrency=1', json={"rsids": ["rs1", "rs2"]})
+    assert [line["rsid"] for line in read_lines(response)] == ["rs1", "rs2"]
+    assert fake_fetch["peak"] == 1
+
+    response = client.post('/api/variants/stream', json={"ids": "rs1"})
+    assert read_lines(response) == [{"error": "Corpo inválido. Envie {\"rsids\": [...]} ou um rsID por linha"}]
+
+
+def test_stream_multipart_upload(client, fake_fetch):
+    data = {"file": (io.BytesIO(b"rs7\r\nrs8\r\n"), "ids.txt")}
+    response = client.post('/api/variants/stream', data=data, content_type="multipart/form-data")
+    assert sorted(line["rsid"] for line in read_lines(response)) == ["rs7", "rs8"]
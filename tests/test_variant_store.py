@@ -0,0 +1,70 @@
+import gzip
+import json
+import pytest
+from app.routes import client as ensembl_client, async_client
+from app.async_core import bridge
+from app.variant_store import VariantStore, build_store, main
+from tests.test_batch import make_variant
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Armazenamento com linhas individuais, uma linha em lote, duplicata e lixo."""
+    source = tmp_path / "variants.ndjson.gz"
+    lines = [
+        json.dumps(make_variant("rs699", 230710048, genes=["AGT"])),
+        "não é json",
+        json.dumps({"rs10": make_variant("rs10", 10), "rs5": make_variant("rs5", 5, genes=["OLD"])}),
+        json.dumps(make_variant("rs5", 5, genes=["NEW"])),
+        json.dumps(make_variant("sem_rs", 1)),
+    ]
+    with gzip.open(source, "wt") as handle:
+        handle.write("\n".join(lines) + "\n")
+    assert build_store(str(source), str(tmp_path / "store")) == 3
+    return VariantStore(str(tmp_path / "store"))
+
+
+def test_lookup(store):
+    """Busca binária por número do rsID; em duplicatas prevalece o último registro."""
+    assert len(store) == 3
+    assert store.get("RS699")["mappings"][0]["start"] == 230710048
+    assert store.get("rs5")["transcript_variations"] == [{"gene_symbol": "NEW"}]
+    assert "rs10" in store
+    assert store.get("rs11") is None and store.get("rs1") is None
+    assert store.get("abc") is None
+    assert isinstance(store.get_raw("rs10"), memoryview)
+
+
+def test_cli(store, capsys):
+    assert main(["get", store.directory, "rs10"]) == 0
+    assert json.loads(capsys.readouterr().out)["name"] == "rs10"
+    assert main(["get", store.directory, "rs42"]) == 1
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_client_prefers_store(store, monkeypatch, use_async):
+    """Acertos do armazenamento não chamam a API; faltas seguem para o REST."""
+    calls = []
+
+    def fake_send(method, url, **kwargs):
+        calls.append(kwargs.get("json", {}).get("ids", url))
+        return None
+
+    async def async_send(*args, **kwargs):
+        return fake_send(*args, **kwargs)
+
+    monkeypatch.setattr(ensembl_client, "store", store)
+    monkeypatch.setattr(ensembl_client, "_send", fake_send)
+    monkeypatch.setattr(async_client, "_send", async_send)
+
+    if use_async:
+        variant = bridge.run(async_client.get_variant_data("rs699"))
+        results, errors = bridge.run(async_client.get_variants_data(["rs5", "rs42"]))
+    else:
+        variant = ensembl_client.get_variant_data("rs699")
+        results, errors = ensembl_client.get_variants_data(["rs5", "rs42"])
+
+    assert variant.genes == ["AGT"] and variant.position == 230710048
+    assert results["rs5"].genes == ["NEW"]
+    assert list(errors) == ["rs42"]
+    assert calls == [["rs42"]]